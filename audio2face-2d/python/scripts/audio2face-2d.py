@@ -19,11 +19,22 @@
 # DEALINGS IN THE SOFTWARE.
 
 import argparse
+import io
+import json
 import os
+import shutil
+import stat
+import struct
+import subprocess
 import sys
+import tempfile
 import time
-import io
+import wave
 import grpc
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Iterable, Iterator, List, Optional
 
 sys.path.append(os.path.join(os.getcwd(), "../interfaces"))
 # Importing gRPC compiler auto-generated maxine audio2face-2d library
@@ -31,14 +42,25 @@ import audio2face2d_pb2  # noqa: E402
 import audio2face2d_pb2_grpc  # noqa: E402
 from audio2face2d_pb2 import (  # noqa: E402
     QuaternionStream,
-    Quaternion,
     Vector3fStream,
-    Vector3f,
     ModelSelection,
     AnimationCroppingMode,
     HeadPoseMode,
 )
 
+# Size of each audio_file_data message sent to the server
+AUDIO_CHUNK_SIZE = 1024 * 1024
+# Interval at which per-avatar progress is reported while receiving video data
+PROGRESS_REPORT_BYTES = 5 * 1024 * 1024
+# Frame rate of generated head pose animations, one rotation/translation value per frame
+HEAD_POSE_FRAME_RATE = 30
+# Window used for the RMS energy scan when looking for silent segment boundaries
+SILENCE_WINDOW_SECONDS = 0.02
+# How far from the requested segment length a boundary may move to land on silence
+SILENCE_SEARCH_SECONDS = 5.0
+# Interval at which a growing input file is checked for new audio data
+FOLLOW_POLL_SECONDS = 0.05
+
 
 def parse_args() -> None:
     """
@@ -76,8 +98,10 @@ def parse_args() -> None:
     parser.add_argument(
         "--target",
         type=str,
-        default="127.0.0.1:8001",
-        help="IP:port of gRPC service, when hosted locally.",
+        nargs="+",
+        default=["127.0.0.1:8001"],
+        help="IP:port of gRPC service, when hosted locally. Several targets can be given "
+        "to spread segments or portraits across replicas.",
     )
     parser.add_argument(
         "--audio-input",
@@ -85,17 +109,72 @@ def parse_args() -> None:
         default="../../assets/sample_audio.wav",
         help="The path to the input audio file.",
     )
+    parser.add_argument(
+        "--audio-format",
+        type=str,
+        default="wav",
+        choices=["wav", "pcm"],
+        help="Format of the input audio. Raw pcm input is wrapped in a streaming wav header "
+        "built from --pcm-sample-rate, --pcm-channels and --pcm-bit-depth.",
+    )
+    parser.add_argument(
+        "--pcm-sample-rate",
+        type=int,
+        default=48000,
+        help="Sample rate of raw pcm input.",
+    )
+    parser.add_argument(
+        "--pcm-channels",
+        type=int,
+        default=1,
+        help="Number of channels of raw pcm input.",
+    )
+    parser.add_argument(
+        "--pcm-bit-depth",
+        type=int,
+        default=16,
+        choices=[8, 16, 24, 32],
+        help="Bit depth of raw pcm input.",
+    )
+    parser.add_argument(
+        "--follow-timeout",
+        type=float,
+        default=None,
+        help="Treat --audio-input as a file that is still being written, e.g. by a TTS "
+        "engine, and stream it until no new data arrives for this many seconds. "
+        "Pipes, FIFOs and '-' for stdin are always streamed until they are closed.",
+    )
     parser.add_argument(
         "--portrait-input",
         type=str,
-        default="../../assets/sample_portrait_image.png",
-        help="The path to the input portrait file.",
+        nargs="+",
+        default=["../../assets/sample_portrait_image.png"],
+        help="The path to the input portrait file. Pass several paths to render the same "
+        "audio onto multiple portraits concurrently (fan-out mode).",
     )
     parser.add_argument(
         "--output",
         type=str,
-        default="output.mp4",
-        help="The path for the output video file.",
+        nargs="+",
+        default=["output.mp4"],
+        help="The path for the output video file. In fan-out mode, pass one path per portrait "
+        "or a single path which is suffixed with each portrait name.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of concurrent Animate streams in fan-out mode. "
+        "Defaults to the number of portraits. Also limits concurrent segments in "
+        "segmented mode, where it defaults to the number of segments.",
+    )
+    parser.add_argument(
+        "--segment-duration",
+        type=float,
+        default=None,
+        help="Enables segmented mode. The audio is split near every N seconds at the "
+        "quietest point, segments are rendered concurrently and the videos are "
+        "concatenated with ffmpeg.",
     )
     parser.add_argument(
         "--head-rotation-animation-filepath",
@@ -111,6 +190,14 @@ def parse_args() -> None:
         help="The path for the head_translation_animation.csv file. "
         "Only required for HEAD_POSE_MODE_USER_DEFINED_ANIMATION",
     )
+    parser.add_argument(
+        "--head-pose-keyframes",
+        type=str,
+        default=None,
+        help="The path to a JSON head pose keyframe spec. When set, dense head rotation and "
+        "translation streams are generated from the keyframes and "
+        "HEAD_POSE_MODE_USER_DEFINED_ANIMATION is used instead of the animation CSV files.",
+    )
     return parser.parse_args()
 
 
@@ -124,109 +211,776 @@ def read_file_content(file_path: os.PathLike) -> None:
         return file.read()
 
 
-def generate_request_for_inference(audio_filepath: str, params: dict):
+def read_audio_chunks(audio_filepath: os.PathLike) -> List[bytes]:
+    """Function to read the input audio once and split it into request sized chunks.
+
+    The returned chunks can be shared between several concurrent Animate streams.
+
+    Args:
+      audio_filepath: Path to input file
+    """
+    audio_data = read_file_content(audio_filepath)
+    return [
+        audio_data[i : i + AUDIO_CHUNK_SIZE] for i in range(0, len(audio_data), AUDIO_CHUNK_SIZE)
+    ]
+
+
+def build_streaming_wav_header(sample_rate: int, channels: int, bit_depth: int) -> bytes:
+    """Function to build a wav header for audio of unknown length.
+
+    The RIFF and data chunk sizes are set to the maximum value, as done by
+    streaming wav writers, since the total length is not known up front.
+
+    Args:
+      sample_rate: Sample rate of the pcm data
+      channels: Number of interleaved channels
+      bit_depth: Bits per sample
+    """
+    block_align = channels * bit_depth // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        0xFFFFFFFF,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        bit_depth,
+        b"data",
+        0xFFFFFFFF,
+    )
+
+
+def stream_pcm_as_wav(
+    pcm_blocks: Iterable[bytes], sample_rate: int = 48000, channels: int = 1, bit_depth: int = 16
+) -> Iterator[bytes]:
+    """Generator to turn raw pcm blocks into a wav byte stream as they are produced.
+
+    Blocks can be anything exposing the buffer protocol, e.g. bytes or int16 NumPy
+    arrays from a TTS engine.
+
+    Args:
+      pcm_blocks: Iterable of raw interleaved pcm blocks
+      sample_rate: Sample rate of the pcm data
+      channels: Number of interleaved channels
+      bit_depth: Bits per sample
+    """
+    yield build_streaming_wav_header(sample_rate, channels, bit_depth)
+    for block in pcm_blocks:
+        block = bytes(block)
+        if block:
+            yield block
+
+
+def read_audio_stream(
+    audio_filepath: os.PathLike, follow_timeout: Optional[float] = None
+) -> Iterator[bytes]:
+    """Generator to read audio bytes as soon as they are available.
+
+    Pipes, FIFOs and stdin ("-") are read until the writer closes them. A regular
+    file is read to its end, or, with follow_timeout, polled for appended data
+    until nothing new arrives for follow_timeout seconds.
+
+    Args:
+      audio_filepath: Path to input file, or "-" for stdin
+      follow_timeout: Seconds without new data after which a growing file is complete
+    """
+    file = sys.stdin.buffer if audio_filepath == "-" else open(audio_filepath, "rb")
+    growing = follow_timeout is not None and stat.S_ISREG(os.fstat(file.fileno()).st_mode)
+    try:
+        last_data_time = time.time()
+        while True:
+            # read1 returns whatever is available instead of waiting for a full chunk
+            buffer = file.read1(AUDIO_CHUNK_SIZE)
+            if buffer:
+                last_data_time = time.time()
+                yield buffer
+            elif growing and time.time() - last_data_time < follow_timeout:
+                time.sleep(FOLLOW_POLL_SECONDS)
+            else:
+                break
+    finally:
+        if file is not sys.stdin.buffer:
+            file.close()
+
+
+def is_streaming_audio_input(audio_filepath: os.PathLike, audio_format: str, follow_timeout):
+    """Function to check whether the input audio has to be read as a live stream.
+
+    Args:
+      audio_filepath: Path to input file, or "-" for stdin
+      audio_format: Format of the input audio, wav or pcm
+      follow_timeout: Seconds without new data after which a growing file is complete
+    """
+    return (
+        audio_filepath == "-"
+        or audio_format == "pcm"
+        or follow_timeout is not None
+        or not os.path.isfile(audio_filepath)
+    )
+
+
+def generate_request_for_inference(
+    audio_filepath: str, params: dict, audio_chunks: Optional[Iterable[bytes]] = None
+):
     """Generator to produce the request data stream
 
     Args:
       audio_filepath: Path to input file
       params: Parameters for the feature
+      audio_chunks: Pre-read or live audio chunks, the file is read when not provided
     """
     yield audio2face2d_pb2.AnimateRequest(config=audio2face2d_pb2.AnimateConfig(**params))
-    file = open(audio_filepath, "rb")
-    while True:
-        buffer = file.read(1024 * 1024)
-        if buffer == b"":
-            break
-        yield audio2face2d_pb2.AnimateRequest(audio_file_data=buffer)
+    if audio_chunks is not None:
+        for buffer in audio_chunks:
+            yield audio2face2d_pb2.AnimateRequest(audio_file_data=buffer)
+    else:
+        with open(audio_filepath, "rb") as file:
+            while True:
+                buffer = file.read(AUDIO_CHUNK_SIZE)
+                if buffer == b"":
+                    break
+                yield audio2face2d_pb2.AnimateRequest(audio_file_data=buffer)
     print("Data sending done")
 
 
-def process_head_pose_data(head_rotation_path, head_translation_path):
+def load_head_pose_array(csv_path: os.PathLike, num_columns: int) -> np.ndarray:
+    """Function to load a head pose animation CSV as a float32 array.
+
+    Rows without exactly num_columns values are skipped. The parsed array is cached
+    next to the CSV as a binary .npy file. The cache carries the modification time
+    of the CSV and is rebuilt whenever it differs.
+
+    Args:
+      csv_path: Path to the head pose animation CSV file
+      num_columns: Number of values per row, 4 for rotation and 3 for translation
+    """
+    cache_path = f"{csv_path}.npy"
+    csv_mtime = os.stat(csv_path).st_mtime_ns
+    if os.path.isfile(cache_path) and os.stat(cache_path).st_mtime_ns == csv_mtime:
+        data = np.load(cache_path)
+    else:
+        with open(csv_path, "r", encoding="utf-8") as file:
+            rows = [line for line in file if len(line.strip().split(",")) == num_columns]
+        assert rows, f"Head pose data in {csv_path} is empty"
+        data = np.loadtxt(rows, delimiter=",", dtype=np.float32, ndmin=2)
+        try:
+            np.save(cache_path, data)
+            os.utime(cache_path, ns=(csv_mtime, csv_mtime))
+        except OSError as e:
+            print(f"Could not write head pose cache {cache_path}: {e}")
+
+    assert data.shape[0] > 0, f"Head pose data in {csv_path} is empty"
+    assert data.shape[1] == num_columns, f"Each row must have {num_columns} values"
+    return data
+
+
+def _pack_repeated_messages(values: np.ndarray) -> bytes:
+    """Function to serialize rows of floats as a repeated message field in one pass.
+
+    Each row is encoded as field 1 of the stream message, holding one fixed32
+    float field per column. This matches the wire format of QuaternionStream and
+    Vector3fStream, so the result can be parsed without building messages one by one.
+
+    Args:
+      values: Array of shape (rows, columns) with the per-frame values
     """
-    Process head rotation and translation data.
+    num_columns = values.shape[1]
+    fields = [("tag", "u1"), ("length", "u1")]
+    for column in range(num_columns):
+        fields += [(f"key{column}", "u1"), (f"value{column}", "<f4")]
+    packed = np.empty(values.shape[0], dtype=np.dtype(fields))
+    packed["tag"] = 0x0A  # field 1, length delimited
+    packed["length"] = num_columns * 5
+    for column in range(num_columns):
+        packed[f"key{column}"] = ((column + 1) << 3) | 5  # field column + 1, fixed32
+        packed[f"value{column}"] = values[:, column]
+    return packed.tobytes()
+
+
+def build_head_pose_streams(rotation: np.ndarray, translation: np.ndarray):
+    """Function to build the head pose streams from per-frame arrays.
 
     Args:
-        head_rotation_path (str): Path to the head rotation animation file.
-        head_translation_path (str): Path to the head translation animation file.
+      rotation: Array of shape (frames, 4) with x, y, z, w quaternion values
+      translation: Array of shape (frames, 3) with x, y, z translation values
 
     Returns:
-        Tuple[QuaternionStream, Vector3fStream]: Processed rotation and translation data streams.
+        Tuple[QuaternionStream, Vector3fStream]: Rotation and translation data streams.
     """
-    # Read the head rotation data
-    with io.StringIO(open(head_rotation_path, "rb").read().decode("utf-8")) as file:
-        head_rotation_data = []
-        for line in file:
-            values = line.strip().split(",")
-            if len(values) == 4:
-                head_rotation_data.append([float(val) for val in values])
-
-    # Validate the data
-    assert len(head_rotation_data) > 0, "Head rotation data is empty"
-    assert all(len(row) == 4 for row in head_rotation_data), "Each row must have 4 values"
-
-    # Create the QuaternionStream
-    rotation_data_stream = QuaternionStream()
-    for x in head_rotation_data:
-        q = Quaternion()
-        q.x, q.y, q.z, q.w = x
-        rotation_data_stream.values.append(q)
-
-    # Read the head translation data
-    with io.StringIO(open(head_translation_path, "rb").read().decode("utf-8")) as file:
-        head_translation_data = []
-        for line in file:
-            values = line.strip().split(",")
-            if len(values) == 3:
-                head_translation_data.append([float(val) for val in values])
-
-    # Validate the data
-    assert len(head_translation_data) > 0, "Head translation data is empty"
-    assert all(len(row) == 3 for row in head_translation_data), "Each row must have 3 values"
-
-    # Create the Vector3fStream
-    translation_data_stream = Vector3fStream()
-    for x in head_translation_data:
-        v = Vector3f()
-        v.x, v.y, v.z = x
-        translation_data_stream.values.append(v)
-
+    rotation_data_stream = QuaternionStream.FromString(_pack_repeated_messages(rotation))
+    translation_data_stream = Vector3fStream.FromString(_pack_repeated_messages(translation))
     return rotation_data_stream, translation_data_stream
 
 
+def get_audio_duration(audio_filepath: os.PathLike) -> float:
+    """Function to get the duration of a PCM wav file in seconds.
+
+    Args:
+      audio_filepath: Path to input file
+    """
+    with wave.open(str(audio_filepath), "rb") as wav_file:
+        return wav_file.getnframes() / wav_file.getframerate()
+
+
+def slerp(q0: np.ndarray, q1: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Function to spherically interpolate between rows of two quaternion arrays.
+
+    Args:
+      q0: Start quaternions of shape (frames, 4)
+      q1: End quaternions of shape (frames, 4)
+      t: Interpolation weights in [0, 1] of shape (frames,)
+    """
+    dot = np.sum(q0 * q1, axis=1)
+    # Take the shorter arc
+    q1 = np.where(dot[:, None] < 0.0, -q1, q1)
+    dot = np.clip(np.abs(dot), 0.0, 1.0)
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    # Fall back to linear interpolation for nearly identical quaternions
+    linear = sin_theta < 1e-6
+    sin_theta = np.where(linear, 1.0, sin_theta)
+    w0 = np.where(linear, 1.0 - t, np.sin((1.0 - t) * theta) / sin_theta)
+    w1 = np.where(linear, t, np.sin(t * theta) / sin_theta)
+    q = w0[:, None] * q0 + w1[:, None] * q1
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def hermite_spline(
+    key_times: np.ndarray, key_values: np.ndarray, frame_times: np.ndarray
+) -> np.ndarray:
+    """Function to evaluate a Catmull-Rom style cubic Hermite spline through keyframes.
+
+    Tangents are finite differences of the neighbouring keyframes, so the curve
+    passes through every keyframe with a continuous velocity. Values are held
+    before the first and after the last keyframe.
+
+    Args:
+      key_times: Sorted keyframe times of shape (keys,)
+      key_values: Keyframe values of shape (keys, columns)
+      frame_times: Output frame times of shape (frames,)
+    """
+    if len(key_times) == 1:
+        return np.repeat(key_values, len(frame_times), axis=0)
+    tangents = np.gradient(key_values, key_times, axis=0)
+    index = np.clip(np.searchsorted(key_times, frame_times, side="right") - 1, 0, len(key_times) - 2)
+    h = key_times[index + 1] - key_times[index]
+    s = np.clip((frame_times - key_times[index]) / h, 0.0, 1.0)[:, None]
+    s2 = s * s
+    s3 = s2 * s
+    h = h[:, None]
+    return (
+        (2 * s3 - 3 * s2 + 1) * key_values[index]
+        + (s3 - 2 * s2 + s) * h * tangents[index]
+        + (-2 * s3 + 3 * s2) * key_values[index + 1]
+        + (s3 - s2) * h * tangents[index + 1]
+    )
+
+
+def generate_head_pose_animation(
+    keyframes: List[dict], duration: float, frame_rate: float = HEAD_POSE_FRAME_RATE
+):
+    """Function to generate dense per-frame head pose values from sparse keyframes.
+
+    Each keyframe is a dict with "time" in seconds, "rotation" as an [x, y, z, w]
+    quaternion and "translation" as an [x, y, z] vector. Rotations are slerped and
+    translations follow a cubic Hermite spline between keyframes.
+
+    Args:
+      keyframes: Sparse keyframes, in any order
+      duration: Length of the animation in seconds
+      frame_rate: Number of generated values per second
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Rotation (frames, 4) and translation (frames, 3) arrays.
+    """
+    if not keyframes:
+        raise ValueError("At least one head pose keyframe is required.")
+    keyframes = sorted(keyframes, key=lambda keyframe: keyframe["time"])
+    key_times = np.array([keyframe["time"] for keyframe in keyframes], dtype=np.float64)
+    if np.any(np.diff(key_times) <= 0):
+        raise ValueError("Head pose keyframe times must be unique.")
+    key_rotations = np.array([keyframe["rotation"] for keyframe in keyframes], dtype=np.float64)
+    key_translations = np.array(
+        [keyframe["translation"] for keyframe in keyframes], dtype=np.float64
+    )
+    if key_rotations.shape[1] != 4 or key_translations.shape[1] != 3:
+        raise ValueError("Keyframe rotation needs 4 values and translation needs 3 values.")
+    key_rotations /= np.linalg.norm(key_rotations, axis=1, keepdims=True)
+
+    num_frames = max(1, int(np.ceil(duration * frame_rate)))
+    frame_times = np.arange(num_frames, dtype=np.float64) / frame_rate
+
+    if len(keyframes) == 1:
+        rotation = np.repeat(key_rotations, num_frames, axis=0)
+    else:
+        index = np.clip(
+            np.searchsorted(key_times, frame_times, side="right") - 1, 0, len(key_times) - 2
+        )
+        t = (frame_times - key_times[index]) / (key_times[index + 1] - key_times[index])
+        rotation = slerp(key_rotations[index], key_rotations[index + 1], np.clip(t, 0.0, 1.0))
+    translation = hermite_spline(key_times, key_translations, frame_times)
+    return rotation.astype(np.float32), translation.astype(np.float32)
+
+
+def generate_head_pose_arrays(keyframes_path: os.PathLike, audio_filepath: os.PathLike):
+    """Function to build per-frame head pose values from a JSON keyframe spec.
+
+    The spec holds a "keyframes" list and optionally "frame_rate" and "duration".
+    The duration defaults to the length of the input audio, and is required when
+    the audio is streamed.
+
+    Args:
+      keyframes_path: Path to the JSON keyframe spec
+      audio_filepath: Path to input audio file, None for streamed audio
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, float]: Rotation (frames, 4) and translation (frames, 3)
+        arrays, and the number of values per second.
+    """
+    with open(keyframes_path, "r") as file:
+        spec = json.load(file)
+    duration = spec.get("duration")
+    if not duration:
+        if audio_filepath is None:
+            raise ValueError("The keyframe spec needs a duration when the audio is streamed.")
+        duration = get_audio_duration(audio_filepath)
+    frame_rate = spec.get("frame_rate", HEAD_POSE_FRAME_RATE)
+    start_time = time.time()
+    rotation, translation = generate_head_pose_animation(spec["keyframes"], duration, frame_rate)
+    print(
+        f"Generated {len(rotation)} head pose frames from {len(spec['keyframes'])} keyframes "
+        f"in {(time.time()-start_time)*1000:.1f}ms"
+    )
+    return rotation, translation, frame_rate
+
+
+def read_wav(audio_filepath: os.PathLike):
+    """Function to read a PCM wav file.
+
+    Args:
+      audio_filepath: Path to input file
+
+    Returns:
+        Tuple[wave._wave_params, bytes]: Wav parameters and the raw interleaved frames.
+    """
+    with wave.open(str(audio_filepath), "rb") as wav_file:
+        return wav_file.getparams(), wav_file.readframes(wav_file.getnframes())
+
+
+def compute_rms_envelope(frames: bytes, sample_width: int, channels: int, window: int):
+    """Function to compute the RMS energy of consecutive windows of PCM audio.
+
+    Args:
+      frames: Raw interleaved PCM frames
+      sample_width: Bytes per sample
+      channels: Number of interleaved channels
+      window: Number of frames per RMS window
+    """
+    if sample_width == 1:
+        samples = np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) << 8 >> 8).astype(
+            np.float32
+        )
+    else:
+        samples = np.frombuffer(frames, dtype=f"<i{sample_width}").astype(np.float32)
+    num_windows = len(samples) // (window * channels)
+    samples = samples[: num_windows * window * channels].reshape(num_windows, window * channels)
+    return np.sqrt(np.mean(samples * samples, axis=1))
+
+
+def find_silence_boundaries(
+    rms: np.ndarray, window: int, total_frames: int, segment_frames: int, search_frames: int
+) -> List[int]:
+    """Function to pick segment boundaries at the quietest window near each nominal cut.
+
+    Args:
+      rms: RMS energy per window
+      window: Number of frames per RMS window
+      total_frames: Total number of audio frames
+      segment_frames: Requested segment length in frames
+      search_frames: Maximum distance in frames a boundary may move from its nominal position
+
+    Returns:
+        List[int]: Frame offsets of the segment starts, followed by total_frames.
+    """
+    boundaries = [0]
+    while total_frames - boundaries[-1] > segment_frames + search_frames:
+        nominal = boundaries[-1] + segment_frames
+        first = max((nominal - search_frames) // window, boundaries[-1] // window + 1)
+        last = min((nominal + search_frames) // window + 1, len(rms))
+        if first >= last:
+            boundaries.append(nominal)
+            continue
+        quietest = first + int(np.argmin(rms[first:last]))
+        boundaries.append(quietest * window + window // 2)
+    boundaries.append(total_frames)
+    return boundaries
+
+
+def encode_wav_chunks(params, frames: bytes) -> List[bytes]:
+    """Function to wrap raw PCM frames in a wav container split into request sized chunks.
+
+    Args:
+      params: Wav parameters of the source file
+      frames: Raw interleaved PCM frames
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(params.nchannels)
+        wav_file.setsampwidth(params.sampwidth)
+        wav_file.setframerate(params.framerate)
+        wav_file.writeframes(frames)
+    data = buffer.getvalue()
+    return [data[i : i + AUDIO_CHUNK_SIZE] for i in range(0, len(data), AUDIO_CHUNK_SIZE)]
+
+
+def slice_head_pose_arrays(
+    head_pose_arrays, start_seconds: float, duration: float, frame_rate: float
+):
+    """Function to cut the head pose values for one segment out of the full animation.
+
+    The animation is indexed by absolute time so consecutive segments continue the
+    same motion. Animations shorter than the audio wrap around.
+
+    Args:
+      head_pose_arrays: Rotation (frames, 4) and translation (frames, 3) arrays
+      start_seconds: Start of the segment in seconds
+      duration: Length of the segment in seconds
+      frame_rate: Number of head pose values per second
+    """
+    rotation, translation = head_pose_arrays
+    start_frame = int(round(start_seconds * frame_rate))
+    indices = start_frame + np.arange(max(1, int(np.ceil(duration * frame_rate))))
+    return (
+        np.take(rotation, indices, axis=0, mode="wrap"),
+        np.take(translation, indices, axis=0, mode="wrap"),
+    )
+
+
+def concatenate_videos(video_filepaths: List[str], output_filepath: os.PathLike) -> None:
+    """Function to join mp4 segments into one file without re-encoding.
+
+    Args:
+      video_filepaths: Paths to the segment videos, in playback order
+      output_filepath: Path to output file
+    """
+    list_filepath = os.path.join(os.path.dirname(video_filepaths[0]), "segments.txt")
+    with open(list_filepath, "w") as file:
+        for video_filepath in video_filepaths:
+            file.write(f"file '{os.path.abspath(video_filepath)}'\n")
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_filepath,
+            "-c",
+            "copy",
+            str(output_filepath),
+        ],
+        check=True,
+    )
+
+
+def process_segmented_request(
+    channels: List[any],
+    audio_filepath: os.PathLike,
+    params: dict,
+    output_filepath: os.PathLike,
+    segment_duration: float,
+    max_concurrency: Optional[int] = None,
+    head_pose_arrays=None,
+    head_pose_frame_rate: float = HEAD_POSE_FRAME_RATE,
+) -> None:
+    """Function to render long audio as concurrent segments split at silent points.
+
+    Segments are assigned to the channels round robin, so several NIM replicas
+    can share the work. The segment videos are concatenated with ffmpeg.
+
+    Args:
+      channels: gRPC channels, one per target
+      audio_filepath: Path to input file
+      params: Parameters to control the feature
+      output_filepath: Path to output file
+      segment_duration: Requested segment length in seconds
+      max_concurrency: Maximum number of concurrent Animate streams
+      head_pose_arrays: Rotation and translation arrays for HEAD_POSE_MODE_USER_DEFINED_ANIMATION
+      head_pose_frame_rate: Number of head pose values per second
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("Segmented mode requires ffmpeg to concatenate the output videos.")
+
+    start_time = time.time()
+    wav_params, frames = read_wav(audio_filepath)
+    frame_size = wav_params.sampwidth * wav_params.nchannels
+    sample_rate = wav_params.framerate
+    window = max(1, int(SILENCE_WINDOW_SECONDS * sample_rate))
+    rms = compute_rms_envelope(frames, wav_params.sampwidth, wav_params.nchannels, window)
+    boundaries = find_silence_boundaries(
+        rms,
+        window=window,
+        total_frames=wav_params.nframes,
+        segment_frames=int(segment_duration * sample_rate),
+        search_frames=int(min(SILENCE_SEARCH_SECONDS, segment_duration / 2) * sample_rate),
+    )
+    num_segments = len(boundaries) - 1
+    print(
+        f"Split {wav_params.nframes / sample_rate:.1f}s of audio into {num_segments} segments "
+        f"across {len(channels)} targets in {time.time()-start_time:.2f}s"
+    )
+
+    temp_dir = tempfile.mkdtemp(prefix="audio2face_2d_segments_")
+    try:
+        segment_filepaths = []
+        requests = []
+        for index, (start, end) in enumerate(zip(boundaries[:-1], boundaries[1:])):
+            segment_params = params
+            if head_pose_arrays is not None:
+                rotation, translation = slice_head_pose_arrays(
+                    head_pose_arrays,
+                    start_seconds=start / sample_rate,
+                    duration=(end - start) / sample_rate,
+                    frame_rate=head_pose_frame_rate,
+                )
+                rotation_data_stream, translation_data_stream = build_head_pose_streams(
+                    rotation, translation
+                )
+                segment_params = {
+                    **params,
+                    "input_head_rotation": rotation_data_stream,
+                    "input_head_translation": translation_data_stream,
+                }
+            segment_filepath = os.path.join(temp_dir, f"segment_{index:04d}.mp4")
+            segment_filepaths.append(segment_filepath)
+            requests.append(
+                dict(
+                    channel=channels[index % len(channels)],
+                    audio_filepath=audio_filepath,
+                    params=segment_params,
+                    output_filepath=segment_filepath,
+                    audio_chunks=encode_wav_chunks(
+                        wav_params, frames[start * frame_size : end * frame_size]
+                    ),
+                    label=f"segment {index + 1}/{num_segments} "
+                    f"{start / sample_rate:.1f}s-{end / sample_rate:.1f}s",
+                )
+            )
+
+        with ThreadPoolExecutor(max_workers=max_concurrency or num_segments) as executor:
+            results = list(executor.map(lambda request: process_request(**request), requests))
+
+        if not all(results):
+            print(f"{results.count(False)}/{num_segments} segments failed, no output written.")
+            return
+        concatenate_videos(segment_filepaths, output_filepath)
+        print(
+            f"Segmented rendering completed in {time.time()-start_time:.2f}s, "
+            f"{output_filepath} file is generated."
+        )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
 def process_request(
     channel: any,
     audio_filepath: os.PathLike,
     params: dict,
     output_filepath: os.PathLike,
-) -> None:
+    audio_chunks: Optional[Iterable[bytes]] = None,
+    label: str = "",
+) -> bool:
     """Function to process gRPC request
 
     Args:
       channel: gRPC channel for server client communication
-      input_filepath: Path to input file
+      audio_filepath: Path to input file
       params: Parameters to control the feature
       output_filepath: Path to output file
-      request_metadata: Credentials to process preview request
+      audio_chunks: Pre-read audio chunks shared between concurrent requests, or a live stream
+      label: Prefix for progress messages, used to tell avatars apart in fan-out mode
     """
+    prefix = f"[{label}] " if label else ""
     try:
         stub = audio2face2d_pb2_grpc.Audio2Face2DServiceStub(channel)
         start_time = time.time()
         responses = stub.Animate(
-            generate_request_for_inference(audio_filepath=audio_filepath, params=params)
+            generate_request_for_inference(
+                audio_filepath=audio_filepath, params=params, audio_chunks=audio_chunks
+            )
         )
         next(responses)
-        file = open(output_filepath, "wb")
-        print(f"Writing output in {output_filepath}")
-        for response in responses:
-            if response.HasField("video_file_data"):
-                file.write(response.video_file_data)
+        print(f"{prefix}Writing output in {output_filepath}")
+        bytes_written = 0
+        next_report = PROGRESS_REPORT_BYTES
+        first_data_time = None
+        with open(output_filepath, "wb") as file:
+            for response in responses:
+                if response.HasField("video_file_data"):
+                    if first_data_time is None:
+                        first_data_time = time.time()
+                        print(
+                            f"{prefix}First video data received after "
+                            f"{first_data_time-start_time:.2f}s"
+                        )
+                    file.write(response.video_file_data)
+                    bytes_written += len(response.video_file_data)
+                    if label and bytes_written >= next_report:
+                        print(f"{prefix}Received {bytes_written / (1024 * 1024):.1f}MB")
+                        next_report += PROGRESS_REPORT_BYTES
         end_time = time.time()
         print(
-            f"Function invocation completed in {end_time-start_time:.2f}s, "
+            f"{prefix}Function invocation completed in {end_time-start_time:.2f}s, "
             f"{output_filepath} file is generated."
         )
+        return True
     except Exception as e:
-        print(f"An error occurred: {e}")
+        print(f"{prefix}An error occurred: {e}")
+        return False
+
+
+def get_fan_out_output_paths(
+    portrait_filepaths: List[str], output_filepaths: List[str]
+) -> List[str]:
+    """Function to pick one output path per portrait.
+
+    Args:
+      portrait_filepaths: Paths to the input portrait files
+      output_filepaths: Output paths given on the command line
+    """
+    if len(output_filepaths) == len(portrait_filepaths):
+        return output_filepaths
+    if len(output_filepaths) != 1:
+        raise ValueError(
+            f"Expected 1 or {len(portrait_filepaths)} output paths, got {len(output_filepaths)}."
+        )
+    root, ext = os.path.splitext(output_filepaths[0])
+    output_paths = []
+    for index, portrait_filepath in enumerate(portrait_filepaths):
+        portrait_name = os.path.splitext(os.path.basename(portrait_filepath))[0]
+        output_paths.append(f"{root}_{index}_{portrait_name}{ext or '.mp4'}")
+    return output_paths
+
+
+def process_fan_out_requests(
+    channels: List[any],
+    audio_filepath: os.PathLike,
+    avatar_params: List[dict],
+    output_filepaths: List[os.PathLike],
+    max_concurrency: Optional[int] = None,
+) -> None:
+    """Function to render the same audio onto several portraits concurrently.
+
+    The audio is read once and shared between all Animate streams. The streams are
+    assigned to the channels round robin and multiplexed over each channel.
+
+    Args:
+      channels: gRPC channels, one per target
+      audio_filepath: Path to input file
+      avatar_params: Parameters to control the feature, one entry per portrait
+      output_filepaths: Paths to output files, one entry per portrait
+      max_concurrency: Maximum number of concurrent Animate streams
+    """
+    audio_chunks = read_audio_chunks(audio_filepath)
+    print(
+        f"Rendering {len(avatar_params)} avatars from {sum(len(c) for c in audio_chunks)} "
+        f"bytes of audio in {len(audio_chunks)} chunks"
+    )
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max_concurrency or len(avatar_params)) as executor:
+        futures = [
+            executor.submit(
+                process_request,
+                channel=channels[index % len(channels)],
+                audio_filepath=audio_filepath,
+                params=params,
+                output_filepath=output_filepath,
+                audio_chunks=audio_chunks,
+                label=f"avatar {index + 1}/{len(avatar_params)}",
+            )
+            for index, (params, output_filepath) in enumerate(zip(avatar_params, output_filepaths))
+        ]
+        results = [future.result() for future in futures]
+    print(
+        f"Fan-out completed in {time.time()-start_time:.2f}s, "
+        f"{sum(results)}/{len(results)} avatars rendered."
+    )
+
+
+def process_requests(
+    channels: List[any],
+    audio_filepath: os.PathLike,
+    avatar_params: List[dict],
+    output_filepaths: List[os.PathLike],
+    max_concurrency: Optional[int] = None,
+    segment_duration: Optional[float] = None,
+    head_pose_arrays=None,
+    audio_chunks: Optional[Iterable[bytes]] = None,
+    head_pose_frame_rate: float = HEAD_POSE_FRAME_RATE,
+) -> None:
+    """Function to process a single request, or fan out when several portraits are given.
+
+    Args:
+      channels: gRPC channels, one per target
+      audio_filepath: Path to input file
+      avatar_params: Parameters to control the feature, one entry per portrait
+      output_filepaths: Paths to output files, one entry per portrait
+      max_concurrency: Maximum number of concurrent Animate streams
+      segment_duration: Enables segmented mode with segments of about this many seconds
+      head_pose_arrays: Rotation and translation arrays for HEAD_POSE_MODE_USER_DEFINED_ANIMATION
+      audio_chunks: Live audio stream, only supported for a single non-segmented request
+      head_pose_frame_rate: Number of head pose values per second
+    """
+    if audio_chunks is not None and (segment_duration or len(avatar_params) != 1):
+        raise ValueError(
+            "Streaming audio input supports a single portrait without segmented mode only."
+        )
+    if segment_duration:
+        if len(avatar_params) != 1:
+            raise ValueError("Segmented mode supports a single portrait only.")
+        process_segmented_request(
+            channels=channels,
+            audio_filepath=audio_filepath,
+            params=avatar_params[0],
+            output_filepath=output_filepaths[0],
+            segment_duration=segment_duration,
+            max_concurrency=max_concurrency,
+            head_pose_arrays=head_pose_arrays,
+            head_pose_frame_rate=head_pose_frame_rate,
+        )
+    elif len(avatar_params) == 1:
+        if len(channels) != 1:
+            raise ValueError(
+                "A single portrait is rendered on one target, several targets need "
+                "segmented mode or several portraits."
+            )
+        process_request(
+            channel=channels[0],
+            audio_filepath=audio_filepath,
+            params=avatar_params[0],
+            output_filepath=output_filepaths[0],
+            audio_chunks=audio_chunks,
+        )
+    else:
+        process_fan_out_requests(
+            channels=channels,
+            audio_filepath=audio_filepath,
+            avatar_params=avatar_params,
+            output_filepaths=output_filepaths,
+            max_concurrency=max_concurrency,
+        )
 
 
 def main():
@@ -234,35 +988,58 @@ def main():
     Main client function
     """
     args = parse_args()
-    portrait_filepath = args.portrait_input
+    portrait_filepaths = args.portrait_input
     audio_filepath = args.audio_input
-    output_filepath = args.output
+    output_filepaths = get_fan_out_output_paths(portrait_filepaths, args.output)
 
     # Check file path
-    if os.path.isfile(portrait_filepath):
-        print(f"The image file '{portrait_filepath}' exists. Checking for audio file.")
-    else:
-        raise FileNotFoundError(f"The image file '{portrait_filepath}' does not exist. Exiting.")
-    if os.path.isfile(audio_filepath):
+    for portrait_filepath in portrait_filepaths:
+        if os.path.isfile(portrait_filepath):
+            print(f"The image file '{portrait_filepath}' exists. Checking for audio file.")
+        else:
+            raise FileNotFoundError(
+                f"The image file '{portrait_filepath}' does not exist. Exiting."
+            )
+    if audio_filepath == "-" or os.path.exists(audio_filepath):
         print(f"The audio file '{audio_filepath}' exists. Proceeding with processing.")
     else:
         raise FileNotFoundError(f"The audio file '{audio_filepath}' does not exist. Exiting.")
 
-    portrait_image_encoded = open(portrait_filepath, "rb").read()
+    # Stream stdin, FIFOs, growing files and raw pcm as the audio is produced
+    audio_chunks = None
+    if is_streaming_audio_input(audio_filepath, args.audio_format, args.follow_timeout):
+        audio_chunks = read_audio_stream(audio_filepath, follow_timeout=args.follow_timeout)
+        if args.audio_format == "pcm":
+            audio_chunks = stream_pcm_as_wav(
+                audio_chunks,
+                sample_rate=args.pcm_sample_rate,
+                channels=args.pcm_channels,
+                bit_depth=args.pcm_bit_depth,
+            )
 
     # Configure head pose mode
     head_pose_mode = HeadPoseMode.HEAD_POSE_MODE_RETAIN_FROM_PORTRAIT_IMAGE
+    if args.head_pose_keyframes:
+        head_pose_mode = HeadPoseMode.HEAD_POSE_MODE_USER_DEFINED_ANIMATION
 
     # Provide head pose animation values for head pose mode HEAD_POSE_MODE_USER_DEFINED_ANIMATION
+    head_pose_arrays = None
+    head_pose_frame_rate = HEAD_POSE_FRAME_RATE
     if head_pose_mode == HeadPoseMode.HEAD_POSE_MODE_USER_DEFINED_ANIMATION:
-        rotation_data_stream, translation_data_stream = process_head_pose_data(
-            args.head_rotation_animation_filepath,
-            args.head_translation_animation_filepath,
-        )
+        if args.head_pose_keyframes:
+            rotation, translation, head_pose_frame_rate = generate_head_pose_arrays(
+                args.head_pose_keyframes, None if audio_chunks is not None else audio_filepath
+            )
+            head_pose_arrays = (rotation, translation)
+        else:
+            head_pose_arrays = (
+                load_head_pose_array(args.head_rotation_animation_filepath, 4),
+                load_head_pose_array(args.head_translation_animation_filepath, 3),
+            )
+        rotation_data_stream, translation_data_stream = build_head_pose_streams(*head_pose_arrays)
 
     # Supply params as shown below, refer to the docs for more info.
     feature_params = {
-        "portrait_image": portrait_image_encoded,
         "model_selection": ModelSelection.MODEL_SELECTION_QUALITY,
         "animation_crop_mode": AnimationCroppingMode.ANIMATION_CROPPING_MODE_REGISTRATION_BLENDING,
         "enable_lookaway": 1,  # can be 0 or 1
@@ -274,9 +1051,16 @@ def main():
         "mouth_expression_multiplier": 1.4,  # value in [1.0, 2.0]
         "head_pose_mode": head_pose_mode,
         "head_pose_multiplier": 1.0,  # value in [0.0, 1.0]
-        # "input_head_rotation": rotation_data_stream,  # HEAD_POSE_MODE_USER_DEFINED_ANIMATION
-        # "input_head_translation": translation_data_stream, # HEAD_POSE_MODE_USER_DEFINED_ANIMATION
     }
+    if head_pose_mode == HeadPoseMode.HEAD_POSE_MODE_USER_DEFINED_ANIMATION:
+        feature_params["input_head_rotation"] = rotation_data_stream
+        feature_params["input_head_translation"] = translation_data_stream
+
+    # One set of params per portrait, only the portrait image differs between avatars
+    avatar_params = [
+        {**feature_params, "portrait_image": read_file_content(portrait_filepath)}
+        for portrait_filepath in portrait_filepaths
+    ]
 
     # Check ssl-mode and create channel_credentials for that mode
     if args.ssl_mode != "DISABLED":
@@ -300,23 +1084,30 @@ def main():
             root_certificates = read_file_content(args.ssl_root_cert)
             channel_credentials = grpc.ssl_channel_credentials(root_certificates=root_certificates)
 
-        # Establish secure channel when ssl-mode is MTLS/TLS
-        with grpc.secure_channel(target=args.target, credentials=channel_credentials) as channel:
-            process_request(
-                channel=channel,
-                audio_filepath=audio_filepath,
-                params=feature_params,
-                output_filepath=output_filepath,
-            )
     else:
-        # Establish insecure channel when ssl-mode is DISABLED
-        with grpc.insecure_channel(target=args.target) as channel:
-            process_request(
-                channel=channel,
-                audio_filepath=audio_filepath,
-                params=feature_params,
-                output_filepath=output_filepath,
-            )
+        channel_credentials = None
+
+    with ExitStack() as stack:
+        channels = []
+        for target in args.target:
+            if channel_credentials is not None:
+                # Establish secure channel when ssl-mode is MTLS/TLS
+                channel = grpc.secure_channel(target=target, credentials=channel_credentials)
+            else:
+                # Establish insecure channel when ssl-mode is DISABLED
+                channel = grpc.insecure_channel(target=target)
+            channels.append(stack.enter_context(channel))
+        process_requests(
+            channels=channels,
+            audio_filepath=audio_filepath,
+            avatar_params=avatar_params,
+            output_filepaths=output_filepaths,
+            max_concurrency=args.max_concurrency,
+            segment_duration=args.segment_duration,
+            head_pose_arrays=head_pose_arrays,
+            audio_chunks=audio_chunks,
+            head_pose_frame_rate=head_pose_frame_rate,
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test generating head pose animations from sparse keyframes in the Audio2Face-2D client
+"""
+
+import importlib.util
+import os
+import sys
+
+import numpy as np
+
+# The client script has a hyphen in its name and finds the interfaces relative to the cwd
+python_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(python_dir, 'interfaces'))
+spec = importlib.util.spec_from_file_location(
+    'audio2face_2d', os.path.join(python_dir, 'scripts', 'audio2face-2d.py')
+)
+a2f = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(a2f)
+
+def test_head_pose_interpolation():
+    """Test slerp and the Hermite spline between keyframes"""
+    print("🔬 Testing Head Pose Interpolation")
+    print("=" * 50)
+
+    identity = np.array([[0.0, 0.0, 0.0, 1.0]])
+    # 90 degrees about z
+    turned = np.array([[0.0, 0.0, np.sin(np.pi / 4), np.cos(np.pi / 4)]])
+    halfway = a2f.slerp(identity, turned, np.array([0.5]))[0]
+    expected = [0.0, 0.0, np.sin(np.pi / 8), np.cos(np.pi / 8)]
+    if not np.allclose(halfway, expected):
+        print(f"❌ Slerp halfway is {halfway}, expected {expected}")
+        return False
+    # The opposite sign of the same rotation takes the short way round
+    if not np.allclose(a2f.slerp(identity, -identity, np.array([0.5]))[0], identity[0]):
+        print("❌ Slerp did not take the shorter arc")
+        return False
+    print("✅ Slerp follows the shorter arc at constant speed")
+
+    key_times = np.array([0.0, 1.0, 2.0])
+    key_values = np.array([[0.0], [1.0], [0.0]])
+    values = a2f.hermite_spline(key_times, key_values, np.array([-1.0, 0.0, 0.5, 1.0, 2.0, 3.0]))
+    if not np.allclose(values[[1, 3, 4], 0], [0.0, 1.0, 0.0]):
+        print(f"❌ Spline misses its keyframes: {values[:, 0]}")
+        return False
+    if values[0, 0] != 0.0 or values[5, 0] != 0.0 or not 0.0 < values[2, 0] < 1.0:
+        print(f"❌ Spline not held outside the keyframes: {values[:, 0]}")
+        return False
+    print("✅ Spline passes through keyframes and holds outside them")
+    return True
+
+def test_head_pose_animation():
+    """Test dense frames generated from a keyframe spec"""
+    print("🔬 Testing Head Pose Animation")
+    print("=" * 50)
+
+    turned = [0.0, 0.0, float(np.sin(np.pi / 4)), float(np.cos(np.pi / 4))]
+    keyframes = [
+        {'time': 1.0, 'rotation': turned, 'translation': [1, 0, 0]},
+        {'time': 0.0, 'rotation': [0, 0, 0, 2], 'translation': [0, 0, 0]},
+    ]
+    rotation, translation = a2f.generate_head_pose_animation(keyframes, duration=2.0, frame_rate=10)
+    if rotation.shape != (20, 4) or translation.shape != (20, 3) or rotation.dtype != np.float32:
+        print(f"❌ Unexpected shapes {rotation.shape} and {translation.shape}")
+        return False
+    if not np.allclose(np.linalg.norm(rotation, axis=1), 1.0, atol=1e-6):
+        print("❌ Generated rotations are not unit quaternions")
+        return False
+    if not np.allclose(rotation[0], [0, 0, 0, 1]) or not np.allclose(rotation[10:], turned, atol=1e-6):
+        print("❌ Rotation does not reach and hold its keyframes")
+        return False
+    if not np.allclose(translation[10, 0], 1.0) or not 0.0 < translation[5, 0] < 1.0:
+        print(f"❌ Translation does not follow its keyframes: {translation[:, 0]}")
+        return False
+    print("✅ Unsorted keyframes give dense normalized frames through every keyframe")
+
+    try:
+        a2f.generate_head_pose_animation(keyframes + [dict(keyframes[0])], duration=1.0)
+        print("❌ Duplicate keyframe times were accepted")
+        return False
+    except ValueError:
+        print("✅ Duplicate keyframe times are rejected")
+    return True
+
+if __name__ == "__main__":
+    results = [test_head_pose_interpolation(), test_head_pose_animation()]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test the cached head pose CSV loader and the packed head pose streams of the Audio2Face-2D client
+"""
+
+import importlib.util
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# The client script has a hyphen in its name and finds the interfaces relative to the cwd
+python_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(python_dir, 'interfaces'))
+spec = importlib.util.spec_from_file_location(
+    'audio2face_2d', os.path.join(python_dir, 'scripts', 'audio2face-2d.py')
+)
+a2f = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(a2f)
+
+def test_head_pose_loader():
+    """Test parsing, skipped rows and the .npy cache"""
+    print("🔬 Testing Head Pose Loader")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_path = os.path.join(temp_dir, 'rotation.csv')
+        with open(csv_path, 'w') as f:
+            f.write("0,0,0,1\n0.1,0.2,0.3,0.9\n\n0.5,0.5\n0,0,0.7,0.7\n")
+        data = a2f.load_head_pose_array(csv_path, 4)
+        if data.dtype != np.float32 or data.shape != (3, 4) or not np.allclose(data[1], [0.1, 0.2, 0.3, 0.9]):
+            print(f"❌ Unexpected rotation data: {data}")
+            return False
+        print("✅ Rows with the wrong number of values are skipped")
+
+        if not os.path.exists(f"{csv_path}.npy"):
+            print("❌ No .npy cache written")
+            return False
+        # A cache stamped with the CSV's mtime is used instead of the CSV
+        np.save(f"{csv_path}.npy", np.zeros((1, 4), dtype=np.float32))
+        mtime = os.stat(csv_path).st_mtime_ns
+        os.utime(f"{csv_path}.npy", ns=(mtime, mtime))
+        if a2f.load_head_pose_array(csv_path, 4).shape != (1, 4):
+            print("❌ Cache was not used")
+            return False
+        # Editing the CSV invalidates it
+        os.utime(csv_path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+        if a2f.load_head_pose_array(csv_path, 4).shape != (3, 4):
+            print("❌ Stale cache was used after the CSV changed")
+            return False
+        print("✅ The .npy cache is used until the CSV changes")
+
+        empty_path = os.path.join(temp_dir, 'empty.csv')
+        with open(empty_path, 'w') as f:
+            f.write("1,2\n")
+        try:
+            a2f.load_head_pose_array(empty_path, 3)
+            print("❌ CSV without valid rows was accepted")
+            return False
+        except AssertionError:
+            print("✅ CSVs without valid rows are rejected")
+    return True
+
+def test_head_pose_streams():
+    """Test that the packed streams match the protobuf encoding"""
+    print("🔬 Testing Head Pose Streams")
+    print("=" * 50)
+
+    rotation = np.random.rand(5, 4).astype(np.float32)
+    translation = np.random.rand(5, 3).astype(np.float32)
+    rotation_stream, translation_stream = a2f.build_head_pose_streams(rotation, translation)
+    expected = a2f.QuaternionStream(
+        values=[a2f.audio2face2d_pb2.Quaternion(x=x, y=y, z=z, w=w) for x, y, z, w in rotation]
+    )
+    if rotation_stream.SerializeToString() != expected.SerializeToString():
+        print("❌ Packed rotation stream differs from the one built message by message")
+        return False
+    values = [[v.x, v.y, v.z] for v in translation_stream.values]
+    if not np.array_equal(np.array(values, dtype=np.float32), translation):
+        print("❌ Packed translation stream does not round trip")
+        return False
+    print("✅ Packed head pose streams match the protobuf encoding")
+    return True
+
+if __name__ == "__main__":
+    results = [test_head_pose_loader(), test_head_pose_streams()]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test segmented rendering and multiple targets in the Audio2Face-2D client
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# The client script has a hyphen in its name and finds the interfaces relative to the cwd
+python_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(python_dir, 'interfaces'))
+spec = importlib.util.spec_from_file_location(
+    'audio2face_2d', os.path.join(python_dir, 'scripts', 'audio2face-2d.py')
+)
+a2f = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(a2f)
+
+def test_head_pose_frame_rate():
+    """Test that a keyframe spec's frame rate reaches the segment slicing"""
+    print("🔬 Testing Head Pose Frame Rate")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        keyframes_path = os.path.join(temp_dir, 'keyframes.json')
+        with open(keyframes_path, 'w') as f:
+            json.dump({
+                'frame_rate': 60,
+                'duration': 4.0,
+                'keyframes': [
+                    {'time': 0.0, 'rotation': [0, 0, 0, 1], 'translation': [0, 0, 0]},
+                    {'time': 4.0, 'rotation': [0, 0, 0, 1], 'translation': [4, 0, 0]},
+                ],
+            }, f)
+        rotation, translation, frame_rate = a2f.generate_head_pose_arrays(keyframes_path, None)
+
+    if frame_rate != 60 or len(rotation) != 240:
+        print(f"❌ Got {len(rotation)} frames at {frame_rate} fps, expected 240 at 60")
+        return False
+
+    # The segment starting at 2s must start with the pose at 2s of the animation
+    segment_rotation, segment_translation = a2f.slice_head_pose_arrays(
+        (rotation, translation), start_seconds=2.0, duration=1.0, frame_rate=frame_rate
+    )
+    if len(segment_translation) != 60 or not np.allclose(segment_translation[0], translation[120]):
+        print(f"❌ Segment starts at translation {segment_translation[0]}, expected {translation[120]}")
+        return False
+
+    # Animations shorter than the audio wrap around
+    wrapped, _ = a2f.slice_head_pose_arrays(
+        (np.arange(10).reshape(10, 1), np.zeros((10, 3))), start_seconds=0.25, duration=0.5, frame_rate=20
+    )
+    if wrapped[:, 0].tolist() != [5, 6, 7, 8, 9, 0, 1, 2, 3, 4]:
+        print(f"❌ Short animation did not wrap: {wrapped[:, 0].tolist()}")
+        return False
+    print("✅ Segments are sliced at the spec's frame rate and wrap around")
+    return True
+
+def test_silence_boundaries():
+    """Test that segment boundaries land on the quietest window near each cut"""
+    print("🔬 Testing Silence Boundaries")
+    print("=" * 50)
+
+    window = 10
+    rms = np.ones(100)
+    rms[32] = 0.0  # silence just after the nominal cut at frame 300
+    boundaries = a2f.find_silence_boundaries(
+        rms, window, total_frames=1000, segment_frames=300, search_frames=50
+    )
+    if boundaries[0] != 0 or boundaries[1] != 32 * window + window // 2 or boundaries[-1] != 1000:
+        print(f"❌ Unexpected boundaries: {boundaries}")
+        return False
+    if boundaries != sorted(set(boundaries)):
+        print(f"❌ Boundaries are not increasing: {boundaries}")
+        return False
+
+    # Short audio is a single segment
+    if a2f.find_silence_boundaries(rms, window, 200, 300, 50) != [0, 200]:
+        print("❌ Short audio was split")
+        return False
+    print("✅ Boundaries move to silence within the search distance")
+    return True
+
+def test_targets():
+    """Test that several targets are used for portraits and rejected for a single request"""
+    print("🔬 Testing Targets")
+    print("=" * 50)
+
+    used = {}
+    process_request = a2f.process_request
+    read_audio_chunks = a2f.read_audio_chunks
+
+    def record_request(channel, output_filepath, **kwargs):
+        used[output_filepath] = channel
+        return True
+
+    a2f.process_request = record_request
+    a2f.read_audio_chunks = lambda audio_filepath: [b'audio']
+    try:
+        a2f.process_requests(['a', 'b'], 'audio.wav', [{}, {}, {}], ['0.mp4', '1.mp4', '2.mp4'])
+        if used != {'0.mp4': 'a', '1.mp4': 'b', '2.mp4': 'a'}:
+            print(f"❌ Portraits were not spread across the targets: {used}")
+            return False
+        print("✅ Portraits are spread across the targets round robin")
+
+        try:
+            a2f.process_requests(['a', 'b'], 'audio.wav', [{}], ['out.mp4'])
+            print("❌ Extra targets were silently ignored")
+            return False
+        except ValueError:
+            print("✅ Several targets for a single request are rejected")
+    finally:
+        a2f.process_request = process_request
+        a2f.read_audio_chunks = read_audio_chunks
+    return True
+
+if __name__ == "__main__":
+    results = [test_head_pose_frame_rate(), test_silence_boundaries(), test_targets()]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test streaming input audio from growing files and raw pcm in the Audio2Face-2D client
+"""
+
+import importlib.util
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+# The client script has a hyphen in its name and finds the interfaces relative to the cwd
+python_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(python_dir, 'interfaces'))
+spec = importlib.util.spec_from_file_location(
+    'audio2face_2d', os.path.join(python_dir, 'scripts', 'audio2face-2d.py')
+)
+a2f = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(a2f)
+
+def test_streaming_wav_header():
+    """Test the wav header and stream synthesized for raw pcm"""
+    print("🔬 Testing Streaming WAV Header")
+    print("=" * 50)
+
+    header = a2f.build_streaming_wav_header(16000, 2, 16)
+    fields = struct.unpack('<4sI4s4sIHHIIHH4sI', header)
+    if len(header) != 44 or fields[0] != b'RIFF' or fields[12] != 0xFFFFFFFF:
+        print(f"❌ Bad streaming header: {fields}")
+        return False
+    if fields[6:11] != (2, 16000, 64000, 4, 16):
+        print(f"❌ Bad format fields: {fields[6:11]}")
+        return False
+    print("✅ Streaming wav header declares an unknown length")
+
+    blocks = list(a2f.stream_pcm_as_wav([np.arange(4, dtype=np.int16), b'', b'\x01\x00'], 16000))
+    if blocks[0] != a2f.build_streaming_wav_header(16000, 1, 16) or blocks[1:] != [
+        np.arange(4, dtype=np.int16).tobytes(), b'\x01\x00'
+    ]:
+        print(f"❌ Unexpected pcm stream: {blocks}")
+        return False
+    print("✅ Pcm blocks follow the header as they are produced, empty blocks are dropped")
+    return True
+
+def test_growing_file():
+    """Test that a growing file is read as it is written until it stops growing"""
+    print("🔬 Testing Growing File")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'speech.wav')
+        open(path, 'wb').close()
+
+        def write_blocks():
+            for index in range(5):
+                time.sleep(0.05)
+                with open(path, 'ab') as f:
+                    f.write(bytes([index]) * 100)
+
+        writer = threading.Thread(target=write_blocks)
+        writer.start()
+        started = time.monotonic()
+        data = b''.join(a2f.read_audio_stream(path, follow_timeout=0.5))
+        writer.join()
+        if data != b''.join(bytes([index]) * 100 for index in range(5)):
+            print(f"❌ Read {len(data)} bytes of the growing file")
+            return False
+        if time.monotonic() - started > 3:
+            print("❌ Reading did not stop after the file stopped growing")
+            return False
+        print("✅ Growing files are read until they stop growing")
+
+        if not a2f.is_streaming_audio_input(path, 'wav', 0.5) or a2f.is_streaming_audio_input(path, 'wav', None):
+            print("❌ Wrong streaming input detection for a regular file")
+            return False
+        if not a2f.is_streaming_audio_input('-', 'wav', None) or not a2f.is_streaming_audio_input(path, 'pcm', None):
+            print("❌ Stdin or pcm input not read as a stream")
+            return False
+        print("✅ Stdin, pcm and followed files are read as streams")
+    return True
+
+if __name__ == "__main__":
+    results = [test_streaming_wav_header(), test_growing_file()]
+    sys.exit(0 if all(results) else 1)
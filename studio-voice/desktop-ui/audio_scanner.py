@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Audio Library Scanner
+Fast, parallel discovery of audio files shared by the desktop, web and CLI interfaces
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+AUDIO_EXTENSIONS = frozenset({'.wav', '.mp3', '.flac', '.m4a'})
+
+# Directories listed at the same time, network shares benefit from more
+DEFAULT_SCAN_WORKERS = 8
+
+# Default location of the cached directory index
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.studio_voice', 'audio_index.json')
+
+class AudioLibraryIndex:
+    """Cached directory listings revalidated by directory mtime
+
+    A directory's mtime changes whenever an entry is added, removed or renamed in it,
+    so an unchanged mtime means the cached listing is still valid and the directory
+    does not have to be listed again.
+    """
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH):
+        self.index_path = index_path
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def lookup(self, directory: str, mtime_ns: int) -> Optional[Tuple[List[str], List[str]]]:
+        """Return the cached (files, subdirectories) names if the directory is unchanged"""
+        with self._lock:
+            entry = self._entries.get(directory)
+        if entry and entry['mtime_ns'] == mtime_ns:
+            return entry['files'], entry['dirs']
+        return None
+
+    def store(self, directory: str, mtime_ns: int, files: List[str], dirs: List[str]):
+        """Remember the listing of a directory"""
+        with self._lock:
+            self._entries[directory] = {'mtime_ns': mtime_ns, 'files': files, 'dirs': dirs}
+            self._dirty = True
+
+    def save(self):
+        """Write the index atomically if it changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        temp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(temp_path, self.index_path)
+
+def _list_directory(directory: str,
+                    index: Optional[AudioLibraryIndex]) -> Tuple[List[str], List[str]]:
+    """List one directory, returning full paths of matching files and of subdirectories"""
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except OSError:
+        return [], []
+
+    cached = index.lookup(directory, mtime_ns) if index else None
+    if cached:
+        file_names, dir_names = cached
+    else:
+        file_names, dir_names = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dir_names.append(entry.name)
+                        elif os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                            file_names.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return [], []
+
+        if index:
+            index.store(directory, mtime_ns, file_names, dir_names)
+
+    files = [os.path.join(directory, name) for name in file_names]
+    dirs = [os.path.join(directory, name) for name in dir_names]
+    return files, dirs
+
+def iter_audio_files(folder: str, max_workers: int = DEFAULT_SCAN_WORKERS,
+                     index: Optional[AudioLibraryIndex] = None) -> Iterator[str]:
+    """Yield audio files under folder as soon as their directory has been listed
+
+    Directories are listed with os.scandir on a thread pool, so slow network shares
+    are traversed in parallel. Files come out in directory completion order.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="audio-scan") as executor:
+        pending = {executor.submit(_list_directory, folder, index)}
+
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    files, dirs = future.result()
+                    for directory in dirs:
+                        pending.add(executor.submit(_list_directory, directory, index))
+                    yield from files
+        finally:
+            for future in pending:
+                future.cancel()
+
+    if index:
+        index.save()
+
+def scan_audio_files(folder: str, max_workers: int = DEFAULT_SCAN_WORKERS,
+                     index: Optional[AudioLibraryIndex] = None) -> List[str]:
+    """Return every audio file under folder, sorted by path"""
+    return sorted(iter_audio_files(folder, max_workers, index))
+
+class FolderScan:
+    """Scans a folder in a background thread so results can be read page by page"""
+
+    def __init__(self, folder: str, index: Optional[AudioLibraryIndex] = None):
+        self.folder = folder
+        self.files = []
+        self.complete = False
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(index,), daemon=True)
+        self._thread.start()
+
+    def _run(self, index):
+        try:
+            for path in iter_audio_files(self.folder, index=index):
+                self.files.append(path)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.complete = True
+
+    def page(self, offset: int = 0, limit: int = 500) -> Dict:
+        """Return the files found so far in [offset, offset + limit)"""
+        # Read the completion flag first so a complete page includes every file
+        complete = self.complete
+        files = self.files[offset:offset + limit]
+        return {
+            'files': files,
+            'offset': offset,
+            'next_offset': offset + len(files),
+            'count': len(self.files),
+            'complete': complete and offset + len(files) >= len(self.files),
+            'error': self.error
+        }
@@ -4,43 +4,138 @@ Studio Voice Large File Handler
 Utility for processing audio files that exceed the NIM server size limit
 """
 
+import io
 import os
+import struct
 import tempfile
 import subprocess
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import soundfile as sf
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import Any, Callable, Iterable, Iterator, List, Set, Tuple, Optional
 
 # Default server file size limit (can be overridden)
 DEFAULT_FILE_SIZE_LIMIT = 36700160  # ~35MB
 
+# Chunks sent to the server at the same time
+DEFAULT_CHUNK_WORKERS = 4
+
+# Frames copied per read/write when merging chunks
+MERGE_BLOCK_FRAMES = 64 * 1024
+
+# Bytes per sample on the wire: float32 when streaming, 16-bit PCM WAV chunks otherwise
+STREAMING_SAMPLE_BYTES = 4
+CHUNK_SAMPLE_BYTES = 2
+
+def wav_header_size(sample_rate: int, channels: int) -> int:
+    """Size of the WAV header soundfile writes for 16-bit PCM chunks"""
+    buffer = io.BytesIO()
+    with sf.SoundFile(buffer, 'w', samplerate=sample_rate, channels=channels,
+                      format='WAV', subtype='PCM_16'):
+        pass
+    return len(buffer.getvalue())
+
 class LargeFileProcessor:
     """Handles processing of audio files larger than server limits"""
     
     def __init__(self, file_size_limit: int = DEFAULT_FILE_SIZE_LIMIT):
         self.file_size_limit = file_size_limit
         
-    def needs_chunking(self, file_path: str) -> bool:
-        """Check if file exceeds size limit and needs chunking"""
-        return os.path.getsize(file_path) > self.file_size_limit
+    def needs_chunking(self, file_path: str, model_type: Optional[str] = None,
+                       streaming: bool = False) -> bool:
+        """Check if the request for a file exceeds size limit and needs chunking
+        
+        Without a model type the file size is compared, which is what non-streaming
+        mode sends.
+        """
+        if model_type is None:
+            return os.path.getsize(file_path) > self.file_size_limit
+        return self.request_payload_size(file_path, model_type, streaming) > self.file_size_limit
     
-    def estimate_chunk_duration(self, file_path: str, target_size: Optional[int] = None) -> float:
-        """Estimate duration per chunk to stay under size limit"""
+    def model_frame_size(self, model_type: str, sample_rate: int) -> int:
+        """Samples per model input frame: 10ms for low latency, 6s for high quality models"""
+        frame_ms = 10 if model_type == "48k-ll" else 6000
+        return frame_ms * (sample_rate // 1000)
+    
+    def request_payload_size(self, file_path: str, model_type: str, streaming: bool) -> int:
+        """Exact number of audio bytes sent to the server for a whole file"""
+        if not streaming:
+            # Non-streaming mode sends the raw file bytes
+            return os.path.getsize(file_path)
+        return self.payload_size_from_info(sf.info(file_path), 0, model_type, streaming)
+    
+    def payload_size_from_info(self, info, file_size: int, model_type: str, streaming: bool) -> int:
+        """Request size from an already parsed header, e.g. of an upload held in memory"""
+        if not streaming:
+            return file_size
+        
+        frame_size = self.model_frame_size(model_type, info.samplerate)
+        padded_frames = -(-info.frames // frame_size) * frame_size
+        return padded_frames * info.channels * STREAMING_SAMPLE_BYTES
+    
+    def plan_chunk_frames(self, sample_rate: int, channels: int, model_type: str = "48k-hq",
+                          streaming: bool = False, target_size: Optional[int] = None) -> int:
+        """Largest chunk in samples whose request fits the size limit
+        
+        Streaming mode sends float32 samples, non-streaming mode sends each chunk as a
+        16-bit PCM WAV file. Chunks are aligned to the model frame so only the last
+        one is padded.
+        """
         if target_size is None:
-            target_size = int(self.file_size_limit * 0.8)  # 80% of limit for safety
-            
-        file_size = os.path.getsize(file_path)
+            target_size = self.file_size_limit
         
-        # Get audio info
-        info = sf.info(file_path)
-        duration = info.duration
+        if streaming:
+            header_bytes = 0
+            frame_bytes = channels * STREAMING_SAMPLE_BYTES
+        else:
+            header_bytes = wav_header_size(sample_rate, channels)
+            frame_bytes = channels * CHUNK_SAMPLE_BYTES
         
-        # Calculate target duration to achieve target size
-        bytes_per_second = file_size / duration
-        target_duration = target_size / bytes_per_second
+        frame_size = self.model_frame_size(model_type, sample_rate)
+        max_frames = (target_size - header_bytes) // frame_bytes
+        return max(frame_size, max_frames // frame_size * frame_size)
+    
+    def plan_chunk_duration(self, file_path: str, model_type: str = "48k-hq",
+                            streaming: bool = False, target_size: Optional[int] = None) -> float:
+        """Duration per chunk for the largest request that fits the size limit"""
+        info = sf.info(file_path)
+        chunk_frames = self.plan_chunk_frames(info.samplerate, info.channels, model_type,
+                                              streaming, target_size)
+        return chunk_frames / info.samplerate
+    
+    def estimate_chunk_duration(self, file_path: str, target_size: Optional[int] = None) -> float:
+        """Estimate duration per chunk to stay under size limit in non-streaming mode"""
+        return self.plan_chunk_duration(file_path, target_size=target_size)
+    
+    def plan_chunk_ranges(self, frames: int, sample_rate: int,
+                          chunk_duration: float) -> List[Tuple[int, int]]:
+        """(start_frame, frames) of every chunk iter_audio_chunks yields for this input"""
+        chunk_frames = max(1, int(round(chunk_duration * sample_rate)))
+        return [(start_frame, min(chunk_frames, frames - start_frame))
+                for start_frame in range(0, frames, chunk_frames)]
+    
+    def iter_audio_chunks(self, input_file: str, chunk_duration: float, dtype: str = 'float64',
+                          skip_chunks: Optional[Set[int]] = None) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """Yield (chunk_index, start_frame, data) for consecutive chunks of the input file
         
-        # Round down to nearest 10 seconds for clean chunks
-        return max(10.0, int(target_duration / 10) * 10)
+        The file is opened once and read sequentially, so chunks can be fed straight
+        into a request generator without writing anything to disk. Chunks in
+        skip_chunks, e.g. those finished by an interrupted run, are not read.
+        """
+        with sf.SoundFile(input_file) as audio_file:
+            chunk_ranges = self.plan_chunk_ranges(audio_file.frames, audio_file.samplerate,
+                                                  chunk_duration)
+            for chunk_index, (start_frame, frames) in enumerate(chunk_ranges):
+                if skip_chunks and chunk_index in skip_chunks:
+                    continue
+                audio_file.seek(start_frame)
+                data = audio_file.read(frames, dtype=dtype)
+                if len(data) == 0:
+                    break
+                
+                yield chunk_index, start_frame, data
     
     def split_audio_file(self, input_file: str, chunk_duration: float) -> List[str]:
         """Split audio file into chunks of specified duration"""
@@ -49,51 +144,70 @@ class LargeFileProcessor:
         
         # Get audio info
         info = sf.info(input_file)
-        total_duration = info.duration
         
-        chunk_index = 0
-        start_time = 0.0
-        
-        while start_time < total_duration:
-            end_time = min(start_time + chunk_duration, total_duration)
-            
+        for chunk_index, _, data in self.iter_audio_chunks(input_file, chunk_duration):
             # Create chunk filename
             chunk_file = os.path.join(temp_dir, f"chunk_{chunk_index:04d}.wav")
             
-            # Extract chunk using soundfile
-            data, sample_rate = sf.read(input_file, 
-                                      start=int(start_time * info.samplerate),
-                                      stop=int(end_time * info.samplerate))
-            
-            sf.write(chunk_file, data, sample_rate)
+            sf.write(chunk_file, data, info.samplerate)
             chunk_files.append(chunk_file)
-            
-            start_time = end_time
-            chunk_index += 1
         
         return chunk_files
     
+    def process_chunks(self, chunks: Iterable[Any], process_chunk: Callable[[Any], Any],
+                       max_workers: int = DEFAULT_CHUNK_WORKERS) -> Iterator[Any]:
+        """Run process_chunk over chunks on a bounded worker pool, yielding results in chunk order
+        
+        At most max_workers chunks are in flight, so several chunks are enhanced at
+        once while the merge still receives them in order.
+        """
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for chunk in chunks:
+                    pending.append(executor.submit(process_chunk, chunk))
+                    if len(pending) >= max_workers:
+                        yield pending.popleft().result()
+                
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                # Don't start queued chunks once the caller stopped consuming
+                for future in pending:
+                    future.cancel()
+    
     def merge_audio_files(self, chunk_files: List[str], output_file: str) -> bool:
         """Merge processed audio chunks back into single file"""
+        if not chunk_files:
+            return False
+        
+        # Read first chunk to get format info
+        try:
+            info = sf.info(chunk_files[0])
+        except Exception as e:
+            print(f"Error merging audio files: {e}")
+            return False
+        
+        # Copy each chunk block by block so memory stays bounded by one block
+        chunk_streams = (sf.blocks(chunk_file, blocksize=MERGE_BLOCK_FRAMES)
+                         for chunk_file in chunk_files)
+        
+        return self.merge_audio_streams(chunk_streams, output_file, info.samplerate, info.channels)
+    
+    def merge_audio_streams(self, chunk_streams: Iterable[Iterable[np.ndarray]], output_file: str,
+                            sample_rate: int, channels: int = 1) -> bool:
+        """Merge chunks given as streams of audio blocks into a single file
+        
+        The output file is opened once and every block is appended as it arrives,
+        so enhanced chunks can be merged straight from the server responses.
+        """
         try:
-            if not chunk_files:
-                return False
-            
-            # Read first chunk to get format info
-            first_data, sample_rate = sf.read(chunk_files[0])
-            
-            # Collect all audio data
-            all_data = [first_data]
-            
-            for chunk_file in chunk_files[1:]:
-                data, _ = sf.read(chunk_file)
-                all_data.append(data)
-            
-            # Concatenate all chunks
-            merged_data = np.concatenate(all_data, axis=0)
-            
             # Write merged file with explicit format
-            sf.write(output_file, merged_data, sample_rate, format='WAV')
+            with sf.SoundFile(output_file, 'w', samplerate=sample_rate, channels=channels,
+                              format='WAV') as output:
+                for chunk_stream in chunk_streams:
+                    for block in chunk_stream:
+                        output.write(block)
             
             return True
             
@@ -133,3 +247,128 @@ class LargeFileProcessor:
             'sample_rate': info.samplerate,
             'channels': info.channels
         }
+
+
+class PositionalWavWriter:
+    """Writes segments of a preallocated 16-bit PCM WAV file at their sample offsets
+    
+    The final size is known up front, so the header is written once and segments are
+    copied straight into a memory map of the data chunk in whatever order they finish.
+    The file is written next to the output and moved into place on finalize.
+    
+    With resume=True the partial file has a fixed name and is kept by close(), so an
+    interrupted job can reopen it and only write the segments that are missing.
+    
+    The RIFF sizes are 32-bit, so outputs past 4GiB get an RF64 header whose ds64
+    chunk holds the 64-bit sizes. header_size is where the samples start.
+    """
+    
+    HEADER_SIZE = 44
+    RF64_HEADER_SIZE = 80
+    
+    def __init__(self, output_file: str, sample_rate: int, channels: int, frames: int,
+                 resume: bool = False):
+        self.output_file = output_file
+        self.frames = frames
+        self.channels = channels
+        self.resumed = False
+        
+        data_size = frames * channels * CHUNK_SAMPLE_BYTES
+        self.rf64 = 36 + data_size > 0xFFFFFFFF
+        self.header_size = self.RF64_HEADER_SIZE if self.rf64 else self.HEADER_SIZE
+        
+        if resume:
+            self.temp_file = f"{output_file}.partial"
+            self.resumed = (os.path.exists(self.temp_file) and
+                            os.path.getsize(self.temp_file) == self.header_size + data_size)
+        else:
+            self.temp_file = f"{output_file}.{uuid.uuid4().hex[:8]}.partial"
+        
+        if not self.resumed:
+            self._create(sample_rate, data_size, exclusive=not resume)
+        
+        self._samples = None
+        if frames > 0:
+            self._samples = np.memmap(self.temp_file, dtype='<i2', mode='r+',
+                                      offset=self.header_size, shape=(frames, channels))
+    
+    def _create(self, sample_rate: int, data_size: int, exclusive: bool):
+        """Write the header and preallocate the data chunk"""
+        fmt_chunk = struct.pack(
+            '<4sIHHIIHH',
+            b'fmt ', 16, 1, self.channels, sample_rate,
+            sample_rate * self.channels * CHUNK_SAMPLE_BYTES,
+            self.channels * CHUNK_SAMPLE_BYTES, CHUNK_SAMPLE_BYTES * 8
+        )
+        with open(self.temp_file, 'xb' if exclusive else 'wb') as temp:
+            if self.rf64:
+                # 0xFFFFFFFF in the 32-bit sizes means "see ds64"
+                temp.write(struct.pack('<4sI4s', b'RF64', 0xFFFFFFFF, b'WAVE'))
+                temp.write(struct.pack('<4sIQQQI', b'ds64', 28, self.RF64_HEADER_SIZE - 8 + data_size,
+                                       data_size, self.frames, 0))
+                temp.write(fmt_chunk)
+                temp.write(struct.pack('<4sI', b'data', 0xFFFFFFFF))
+            else:
+                temp.write(struct.pack('<4sI4s', b'RIFF', 36 + data_size, b'WAVE'))
+                temp.write(fmt_chunk)
+                temp.write(struct.pack('<4sI', b'data', data_size))
+            temp.truncate(self.header_size + data_size)
+    
+    def write(self, start_frame: int, data: np.ndarray) -> int:
+        """Write float samples at start_frame, dropping anything past the end of the file
+        
+        Returns the number of frames written. Writes to disjoint ranges may come from
+        several threads at once.
+        """
+        end_frame = min(start_frame + len(data), self.frames)
+        if end_frame <= start_frame:
+            return 0
+        
+        data = np.asarray(data[:end_frame - start_frame]).reshape(end_frame - start_frame, -1)
+        self._samples[start_frame:end_frame] = np.clip(np.round(data * 32767), -32768, 32767)
+        return end_frame - start_frame
+    
+    def write_blocks(self, start_frame: int, blocks: Iterable[np.ndarray],
+                     frames: Optional[int] = None) -> int:
+        """Write consecutive blocks starting at start_frame, returning the frames written
+        
+        When frames is given, samples beyond it (e.g. model padding) are dropped so a
+        segment never overwrites the one after it.
+        """
+        position = start_frame
+        for block in blocks:
+            if frames is not None:
+                block = block[:start_frame + frames - position]
+            position += self.write(position, block)
+        return position - start_frame
+    
+    def finalize(self):
+        """Flush the samples and atomically move the file to the output path"""
+        if self._samples is not None:
+            self._samples.flush()
+            self._samples = None
+        os.replace(self.temp_file, self.output_file)
+    
+    def close(self):
+        """Flush the samples and keep the partial file so the job can be resumed"""
+        if self._samples is not None:
+            self._samples.flush()
+            self._samples = None
+    
+    def abort(self):
+        """Discard the partially written file"""
+        self._samples = None
+        try:
+            os.remove(self.temp_file)
+        except OSError:
+            pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.finalize()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Processing Manifest
+SQLite record of finished files and large-file chunks so batch re-runs skip completed work
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+MANIFEST_FILENAME = '.studio_voice_manifest.sqlite'
+
+# Bytes read at a time when hashing file content
+HASH_BLOCK_SIZE = 1024 * 1024
+
+def file_content_hash(path: str) -> str:
+    """SHA-256 of the file content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def params_key(params: Dict) -> str:
+    """Stable key for the model and processing parameters"""
+    return json.dumps(params, sort_keys=True)
+
+class ProcessingManifest:
+    """Remembers which files were processed with which parameters
+
+    Files are keyed by path and parameters and identified by size, mtime and content
+    hash. Size and mtime are checked first; the hash is only computed when the mtime
+    changed but the size did not, e.g. after a copy that did not preserve timestamps.
+    Completed chunks of large files are recorded against the source size and mtime so
+    an interrupted job can resume at the first missing chunk.
+    """
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(manifest_path, check_same_thread=False)
+        with self._db:
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS files ('
+                'path TEXT, params TEXT, size INTEGER, mtime_ns INTEGER, sha256 TEXT, '
+                'output_path TEXT, completed_at REAL, PRIMARY KEY (path, params))'
+            )
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS chunks ('
+                'path TEXT, params TEXT, source_size INTEGER, source_mtime_ns INTEGER, '
+                'chunk_index INTEGER, PRIMARY KEY (path, params, chunk_index))'
+            )
+
+    @classmethod
+    def for_tree(cls, paths) -> 'ProcessingManifest':
+        """Open the manifest at the root directory shared by paths
+
+        Paths on different Windows drives have no shared root, so each drive gets a
+        manifest at the root shared by its own paths.
+        """
+        directories = [os.path.dirname(os.path.abspath(path)) for path in paths]
+        try:
+            return cls(os.path.join(os.path.commonpath(directories), MANIFEST_FILENAME))
+        except ValueError:
+            pass
+
+        drives: Dict[str, List[str]] = {}
+        for directory in directories:
+            drives.setdefault(os.path.splitdrive(directory)[0], []).append(directory)
+        return ProcessingManifestGroup({
+            drive: cls(os.path.join(os.path.commonpath(drive_directories), MANIFEST_FILENAME))
+            for drive, drive_directories in drives.items()
+        })
+
+    def is_processed(self, path: str, params: Dict) -> bool:
+        """True if path still matches the file recorded for params and its output exists"""
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT size, mtime_ns, sha256, output_path FROM files WHERE path = ? AND params = ?',
+                (path, params_key(params))
+            ).fetchone()
+        if row is None:
+            return False
+
+        size, mtime_ns, sha256, output_path = row
+        if output_path and not os.path.exists(output_path):
+            return False
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns == mtime_ns:
+            return True
+        return file_content_hash(path) == sha256
+
+    def mark_processed(self, path: str, params: Dict, output_path: Optional[str] = None):
+        """Record the file currently at path as finished for params"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        sha256 = file_content_hash(path)
+        key = params_key(params)
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (path, key, stat.st_size, stat.st_mtime_ns, sha256,
+                 os.path.abspath(output_path) if output_path else None, time.time())
+            )
+            self._db.execute('DELETE FROM chunks WHERE path = ? AND params = ?', (path, key))
+
+    def completed_chunks(self, path: str, params: Dict) -> Set[int]:
+        """Indexes of the chunks of path already processed with params"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT chunk_index FROM chunks WHERE path = ? AND params = ? '
+                'AND source_size = ? AND source_mtime_ns = ?',
+                (path, params_key(params), stat.st_size, stat.st_mtime_ns)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_chunk_completed(self, path: str, params: Dict, chunk_index: int):
+        """Record one finished chunk of path"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)',
+                (path, params_key(params), stat.st_size, stat.st_mtime_ns, chunk_index)
+            )
+
+    def clear_chunks(self, path: str, params: Dict):
+        """Forget the recorded chunks of path, e.g. when the partial output is gone"""
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM chunks WHERE path = ? AND params = ?',
+                             (os.path.abspath(path), params_key(params)))
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
+
+class ProcessingManifestGroup:
+    """Manifests of a tree spread over several drives, each path uses its drive's manifest"""
+
+    def __init__(self, manifests: Dict[str, ProcessingManifest]):
+        self.manifests = manifests
+
+    def _manifest(self, path: str) -> ProcessingManifest:
+        return self.manifests[os.path.splitdrive(os.path.abspath(path))[0]]
+
+    def is_processed(self, path: str, params: Dict) -> bool:
+        return self._manifest(path).is_processed(path, params)
+
+    def mark_processed(self, path: str, params: Dict, output_path: Optional[str] = None):
+        self._manifest(path).mark_processed(path, params, output_path)
+
+    def completed_chunks(self, path: str, params: Dict) -> Set[int]:
+        return self._manifest(path).completed_chunks(path, params)
+
+    def mark_chunk_completed(self, path: str, params: Dict, chunk_index: int):
+        self._manifest(path).mark_chunk_completed(path, params, chunk_index)
+
+    def clear_chunks(self, path: str, params: Dict):
+        self._manifest(path).clear_chunks(path, params)
+
+    def close(self):
+        for manifest in self.manifests.values():
+            manifest.close()
@@ -10,14 +10,23 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import queue
-from pathlib import Path
+from concurrent.futures import as_completed
 from datetime import datetime
-import subprocess
 import shutil
 
 # Add the parent directory to the path to import studio_voice
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
+# Import the in-process worker pool
+try:
+    from studio_voice_worker_pool import StudioVoiceWorkerPool, DEFAULT_WORKERS, MAX_WORKERS
+except ImportError:
+    StudioVoiceWorkerPool = None
+    DEFAULT_WORKERS, MAX_WORKERS = 4, 16
+
+from ui_updates import BoundedLogView, UIUpdateQueue
+from audio_scanner import AudioLibraryIndex, iter_audio_files
+
 class StudioVoiceDesktopApp:
     def __init__(self, root):
         self.root = root
@@ -33,7 +42,14 @@ class StudioVoiceDesktopApp:
         self.processing_queue = queue.Queue()
         self.is_processing = False
         
+        # Persistent workers that process files in-process over a shared channel
+        self.worker_pool = StudioVoiceWorkerPool() if StudioVoiceWorkerPool else None
+        self.file_progress = {}
+        self.progress_total = 0.0
+        self.progress_lock = threading.Lock()
+        
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def setup_ui(self):
         """Setup the user interface"""
@@ -82,6 +98,12 @@ class StudioVoiceDesktopApp:
         ttk.Checkbutton(settings_frame, text="Streaming Mode", 
                        variable=self.streaming_var).grid(row=0, column=2, sticky=tk.W)
         
+        # Number of files processed at the same time
+        ttk.Label(settings_frame, text="Parallel Files:").grid(row=0, column=3, padx=(20, 10), sticky=tk.W)
+        self.workers_var = tk.IntVar(value=DEFAULT_WORKERS)
+        ttk.Spinbox(settings_frame, from_=1, to=MAX_WORKERS, textvariable=self.workers_var,
+                    width=5, state="readonly").grid(row=0, column=4, sticky=tk.W)
+        
         # Processing info
         ttk.Label(settings_frame, text="Processing Mode:", 
                  font=('Arial', 9, 'bold')).grid(row=1, column=0, padx=(0, 10), sticky=tk.W)
@@ -126,12 +148,15 @@ class StudioVoiceDesktopApp:
         log_frame.rowconfigure(0, weight=1)
         
         self.log_text = tk.Text(log_frame, height=15, wrap=tk.WORD)
-        scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL, command=self.log_text.yview)
-        self.log_text.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL)
         
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
+        # Bounded log and batched UI updates, safe to use from worker threads
+        self.log_view = BoundedLogView(self.log_text, scrollbar)
+        self.ui_updates = UIUpdateQueue(self.root, self.log_view, self.progress, self.progress_label)
+        
         # Initial log message
         self.log("Studio Voice Desktop UI initialized")
         self.log("Select audio files and configure settings to begin processing")
@@ -159,21 +184,31 @@ class StudioVoiceDesktopApp:
         folder = filedialog.askdirectory(title="Select Folder with Audio Files")
         
         if folder:
-            # Find all audio files in the folder and subfolders
-            audio_extensions = {'.wav', '.mp3', '.flac', '.m4a'}
-            files = []
-            
-            for root, dirs, filenames in os.walk(folder):
-                for filename in filenames:
-                    if Path(filename).suffix.lower() in audio_extensions:
-                        files.append(os.path.join(root, filename))
+            # Scan in the background so large libraries don't block the UI
+            self.files_label.config(text="Scanning...")
+            self.start_btn.config(state=tk.DISABLED)
+            threading.Thread(target=self.scan_folder, args=(folder,), daemon=True).start()
             
-            if files:
-                self.selected_files = files
-                self.update_files_display()
-                self.log(f"Found {len(files)} audio files in {folder}")
-            else:
-                messagebox.showwarning("No Files", "No audio files found in the selected folder")
+    def scan_folder(self, folder):
+        """Find all audio files in the folder and subfolders (runs in background thread)"""
+        files = []
+        
+        for path in iter_audio_files(folder, index=AudioLibraryIndex()):
+            files.append(path)
+            if len(files) % 1000 == 0:
+                self.ui_updates.call(self.files_label.config, text=f"Scanning... {len(files)} files found")
+        
+        self.ui_updates.call(self.finish_folder_scan, folder, sorted(files))
+        
+    def finish_folder_scan(self, folder, files):
+        """Show the files found by a folder scan"""
+        if files:
+            self.selected_files = files
+            self.update_files_display()
+            self.log(f"Found {len(files)} audio files in {folder}")
+        else:
+            self.update_files_display()
+            messagebox.showwarning("No Files", "No audio files found in the selected folder")
             
     def update_files_display(self):
         """Update the files display and enable/disable start button"""
@@ -186,14 +221,13 @@ class StudioVoiceDesktopApp:
             self.start_btn.config(state=tk.DISABLED)
             
     def log(self, message):
-        """Add a message to the log"""
+        """Add a message to the log (safe to call from any thread)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
+        self.ui_updates.log(f"[{timestamp}] {message}")
         
     def clear_log(self):
         """Clear the log text"""
-        self.log_text.delete(1.0, tk.END)
+        self.log_view.clear()
         
     def start_processing(self):
         """Start processing the selected files"""
@@ -201,6 +235,12 @@ class StudioVoiceDesktopApp:
             messagebox.showwarning("No Files", "Please select audio files to process")
             return
         
+        if not self.worker_pool:
+            messagebox.showerror("Missing Dependencies",
+                                 "Studio Voice modules could not be loaded.\n\n"
+                                 "Install the packages in requirements.txt and restart.")
+            return
+        
         # Confirm in-place processing
         result = messagebox.askyesno(
             "Confirm Processing", 
@@ -232,32 +272,33 @@ class StudioVoiceDesktopApp:
         self.log("Processing stopped by user")
         
     def process_files(self):
-        """Process the selected files (runs in background thread)"""
+        """Process the selected files on the worker pool (runs in background thread)"""
         total_files = len(self.selected_files)
         successful = 0
         failed = 0
         
+        self.worker_pool.set_max_workers(self.workers_var.get())
+        with self.progress_lock:
+            self.file_progress = {}
+            self.progress_total = 0.0
+        
         self.log(f"Starting processing of {total_files} files...")
-        self.log(f"Model: {self.model_var.get()}, Streaming: {self.streaming_var.get()}")
+        self.log(f"Model: {self.model_var.get()}, Streaming: {self.streaming_var.get()}, "
+                 f"Parallel files: {self.worker_pool.max_workers}")
         self.log(f"Files will be enhanced in place with originals backed up")
         
-        for i, input_file in enumerate(self.selected_files):
-            if not self.is_processing:
-                break
-                
-            # Update progress
-            progress = (i / total_files) * 100
-            self.progress['value'] = progress
-            self.progress_label.config(text=f"Processing {i+1}/{total_files}")
-            
-            filename = os.path.basename(input_file)
-            self.log(f"Processing: {filename}")
+        futures = {self.worker_pool.submit(self.run_file, input_file): input_file
+                   for input_file in self.selected_files}
+        
+        for future in as_completed(futures):
+            filename = os.path.basename(futures[future])
             
             try:
-                # Process file in place (no separate output file needed)
-                result = self.process_single_file(input_file, None)
+                result = future.result()
                 
-                if result:
+                if result is None:
+                    continue  # Skipped after the user stopped processing
+                elif result:
                     successful += 1
                     self.log(f"✅ Completed: {filename}")
                 else:
@@ -267,129 +308,119 @@ class StudioVoiceDesktopApp:
             except Exception as e:
                 failed += 1
                 self.log(f"❌ Error processing {filename}: {str(e)}")
+            
+            self.ui_updates.set_progress(text=f"Processed {successful + failed}/{total_files}")
         
         # Final update
-        self.progress['value'] = 100
-        self.progress_label.config(text="Complete")
-        self.start_btn.config(state=tk.NORMAL)
-        self.stop_btn.config(state=tk.DISABLED)
+        self.ui_updates.set_progress(100, "Complete")
+        self.ui_updates.call(self.start_btn.config, state=tk.NORMAL)
+        self.ui_updates.call(self.stop_btn.config, state=tk.DISABLED)
         
         self.log(f"Processing complete! ✅ {successful} successful, ❌ {failed} failed")
         self.log("Enhanced files have replaced the originals")
         self.log("Original files have been moved to '../original audio/' folders")
         
         if successful > 0:
-            messagebox.showinfo("Processing Complete", 
+            self.ui_updates.call(messagebox.showinfo, "Processing Complete", 
                               f"Successfully processed {successful} files!\n\n"
                               f"Enhanced files have replaced the originals.\n"
                               f"Original files backed up to '../original audio/' folders.")
         
         
-    def process_single_file(self, input_file, output_file):
-        """Process a single audio file using the existing Python script and manage files properly"""
+    def run_file(self, input_file):
+        """Process one file on a pool worker, returns None if processing was stopped"""
+        if not self.is_processing:
+            return None
+        
+        self.log(f"Processing: {os.path.basename(input_file)}")
+        
+        def progress_callback(fraction):
+            self.update_file_progress(input_file, fraction)
+        
+        result = self.process_single_file(input_file, progress_callback)
+        self.update_file_progress(input_file, 1.0)
+        return result
+    
+    def update_file_progress(self, input_file, fraction):
+        """Record the progress of one file and queue an overall progress update"""
+        with self.progress_lock:
+            self.progress_total += fraction - self.file_progress.get(input_file, 0.0)
+            self.file_progress[input_file] = fraction
+            value = self.progress_total / len(self.selected_files) * 100
+        self.ui_updates.set_progress(value)
+    
+    def process_single_file(self, input_file, progress_callback=None):
+        """Process a single audio file in-process and manage files properly"""
+        # Get the directory of the input file
+        input_dir = os.path.dirname(input_file)
+        filename = os.path.basename(input_file)
+        
+        # Create backup directory one level up from the audio file
+        backup_dir = os.path.join(input_dir, '..', 'original audio')
+        os.makedirs(backup_dir, exist_ok=True)
+        backup_file = os.path.join(backup_dir, filename)
+        
+        # Process to a temporary output file first
+        temp_output = input_file.replace('.wav', '_temp_enhanced.wav')
+        
+        # Ensure temp file has .wav extension even for non-wav inputs
+        if not temp_output.endswith('.wav'):
+            temp_output = input_file + '_temp_enhanced.wav'
+        
         try:
-            # Get the directory of the input file
-            input_dir = os.path.dirname(input_file)
-            filename = os.path.basename(input_file)
-            
-            # Create backup directory one level up from the audio file
-            backup_dir = os.path.join(input_dir, '..', 'original audio')
-            os.makedirs(backup_dir, exist_ok=True)
-            backup_file = os.path.join(backup_dir, filename)
-            
-            # Find the studio_voice.py script
-            script_path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'studio_voice.py')
-            
-            if not os.path.exists(script_path):
-                self.log(f"Error: studio_voice.py not found at {script_path}")
-                return False
-            
-            # Process to a temporary output file first
-            temp_output = input_file.replace('.wav', '_temp_enhanced.wav')
-            
-            # Ensure temp file has .wav extension even for non-wav inputs
-            if not temp_output.endswith('.wav'):
-                temp_output = input_file + '_temp_enhanced.wav'
-            
-            # Build command to process to temp file
-            cmd = [
-                'python', script_path,
-                '--input', input_file,
-                '--output', temp_output,
-                '--model-type', self.model_var.get()
-            ]
+            self.worker_pool.enhance_file(input_file, temp_output, self.model_var.get(),
+                                          self.streaming_var.get(), progress_callback)
+        except Exception as e:
+            self.log(f"❌ Processing failed: {str(e)}")
+            # Clean up temp file if it exists
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+            return False
+        
+        # Check if processing was actually successful
+        if not os.path.exists(temp_output) or os.path.getsize(temp_output) == 0:
+            self.log(f"❌ Processing failed: Output file is empty (0 bytes)")
+            self.log(f"This usually indicates a server connection issue")
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+            return False
+        
+        # Processing successful - now do the file management
+        try:
+            # Move original file to backup location
+            if os.path.exists(backup_file):
+                # If backup already exists, remove it first
+                os.remove(backup_file)
+            shutil.move(input_file, backup_file)
             
-            if self.streaming_var.get():
-                cmd.append('--streaming')
+            # Move enhanced file to replace original
+            shutil.move(temp_output, input_file)
             
-            # Log the command being executed for debugging
-            self.log(f"Executing command: {' '.join(cmd)}")
+            self.log(f"✅ File management complete:")
+            self.log(f"   Enhanced: {input_file}")
+            self.log(f"   Backup: {backup_file}")
             
-            # Run the processing command
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            return True
             
-            # Check if processing was actually successful
-            if result.returncode == 0 and os.path.exists(temp_output) and os.path.getsize(temp_output) > 0:
-                # Processing successful - now do the file management
-                try:
-                    # Move original file to backup location
-                    if os.path.exists(backup_file):
-                        # If backup already exists, remove it first
-                        os.remove(backup_file)
-                    shutil.move(input_file, backup_file)
-                    
-                    # Move enhanced file to replace original
-                    shutil.move(temp_output, input_file)
-                    
-                    self.log(f"✅ File management complete:")
-                    self.log(f"   Enhanced: {input_file}")
-                    self.log(f"   Backup: {backup_file}")
-                    
-                    return True
-                    
-                except Exception as e:
-                    self.log(f"Error during file management: {str(e)}")
-                    # Try to restore original file if it was moved
-                    try:
-                        if os.path.exists(backup_file) and not os.path.exists(input_file):
-                            shutil.move(backup_file, input_file)
-                    except:
-                        pass
-                    # Clean up temp file if it exists
-                    if os.path.exists(temp_output):
-                        os.remove(temp_output)
-                    return False
-            else:
-                # Log detailed error information
-                if result.returncode != 0:
-                    self.log(f"❌ Processing failed with return code: {result.returncode}")
-                    self.log(f"Error output: {result.stderr}")
-                    if result.stdout:
-                        self.log(f"Standard output: {result.stdout}")
-                elif not os.path.exists(temp_output):
-                    self.log(f"❌ Processing failed: Output file was not created")
-                    self.log(f"Command stderr: {result.stderr}")
-                    self.log(f"Command stdout: {result.stdout}")
-                elif os.path.getsize(temp_output) == 0:
-                    self.log(f"❌ Processing failed: Output file is empty (0 bytes)")
-                    self.log(f"This usually indicates a server connection issue")
-                    self.log(f"Command stderr: {result.stderr}")
-                    self.log(f"Command stdout: {result.stdout}")
-                else:
-                    self.log(f"❌ Processing failed for unknown reason")
-                    self.log(f"Error output: {result.stderr}")
-                    
-                # Clean up temp file if it exists
-                if os.path.exists(temp_output):
-                    os.remove(temp_output)
-                return False
-                
-        except subprocess.TimeoutExpired:
-            self.log("Error: Processing timed out")
-            return False
         except Exception as e:
-            self.log(f"Error running processing: {str(e)}")
+            self.log(f"Error during file management: {str(e)}")
+            # Try to restore original file if it was moved
+            try:
+                if os.path.exists(backup_file) and not os.path.exists(input_file):
+                    shutil.move(backup_file, input_file)
+            except:
+                pass
+            # Clean up temp file if it exists
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
             return False
+    
+    def on_close(self):
+        """Stop the workers and close the window"""
+        self.is_processing = False
+        if self.worker_pool:
+            self.worker_pool.close()
+        self.root.destroy()
 
 def main():
     root = tk.Tk()
@@ -10,17 +10,32 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import queue
-from pathlib import Path
+from concurrent.futures import as_completed
 from datetime import datetime
 import subprocess
 import shutil
 
 # Import our large file handler
 try:
-    from large_file_handler import LargeFileProcessor
+    import soundfile as sf
+    from large_file_handler import LargeFileProcessor, PositionalWavWriter
 except ImportError:
     LargeFileProcessor = None
 
+from ui_updates import BoundedLogView, UIUpdateQueue
+from audio_scanner import AudioLibraryIndex, iter_audio_files
+from processing_manifest import ProcessingManifest
+
+# Import the in-process worker pool
+try:
+    from studio_voice_worker_pool import StudioVoiceWorkerPool, DEFAULT_WORKERS, MAX_WORKERS
+except ImportError:
+    StudioVoiceWorkerPool = None
+    DEFAULT_WORKERS, MAX_WORKERS = 4, 16
+
+# Result of a file that the manifest shows as already enhanced
+SKIPPED = "skipped"
+
 class StudioVoiceDesktopApp:
     def __init__(self, root):
         self.root = root
@@ -39,7 +54,17 @@ class StudioVoiceDesktopApp:
         # Initialize large file processor
         self.large_file_processor = LargeFileProcessor() if LargeFileProcessor else None
         
+        # Persistent workers that process files in-process over a shared channel
+        self.worker_pool = StudioVoiceWorkerPool() if StudioVoiceWorkerPool else None
+        self.file_progress = {}
+        self.progress_total = 0.0
+        self.progress_lock = threading.Lock()
+        
+        # Record of finished work in the processed tree, opened per run
+        self.manifest = None
+        
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def setup_ui(self):
         """Setup the user interface"""
@@ -88,6 +113,12 @@ class StudioVoiceDesktopApp:
         ttk.Checkbutton(settings_frame, text="Streaming Mode", 
                        variable=self.streaming_var).grid(row=0, column=2, sticky=tk.W)
         
+        # Number of files processed at the same time
+        ttk.Label(settings_frame, text="Parallel Files:").grid(row=0, column=3, padx=(20, 10), sticky=tk.W)
+        self.workers_var = tk.IntVar(value=DEFAULT_WORKERS)
+        ttk.Spinbox(settings_frame, from_=1, to=MAX_WORKERS, textvariable=self.workers_var,
+                    width=5, state="readonly").grid(row=0, column=4, sticky=tk.W)
+        
         # Processing info
         ttk.Label(settings_frame, text="Processing Mode:", 
                  font=('Arial', 9, 'bold')).grid(row=1, column=0, padx=(0, 10), sticky=tk.W)
@@ -137,12 +168,15 @@ class StudioVoiceDesktopApp:
         log_frame.rowconfigure(0, weight=1)
         
         self.log_text = tk.Text(log_frame, height=15, wrap=tk.WORD)
-        scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL, command=self.log_text.yview)
-        self.log_text.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL)
         
         self.log_text.grid(row=0, column=0, sticky="WENS")
         scrollbar.grid(row=0, column=1, sticky="NS")
         
+        # Bounded log and batched UI updates, safe to use from worker threads
+        self.log_view = BoundedLogView(self.log_text, scrollbar)
+        self.ui_updates = UIUpdateQueue(self.root, self.log_view, self.progress, self.progress_label)
+        
         # Initial log message
         self.log("Studio Voice Desktop UI initialized")
         self.log("Select audio files and configure settings to begin processing")
@@ -236,23 +270,33 @@ class StudioVoiceDesktopApp:
         folder = filedialog.askdirectory(title="Select Folder with Audio Files")
         
         if folder:
-            # Find all audio files in the folder and subfolders
-            audio_extensions = {'.wav', '.mp3', '.flac', '.m4a'}
-            files = []
-            
-            for root, dirs, filenames in os.walk(folder):
-                for filename in filenames:
-                    if Path(filename).suffix.lower() in audio_extensions:
-                        files.append(os.path.join(root, filename))
-            
-            if files:
-                self.selected_files = files
-                self.update_files_display()
-                self.log(f"Found {len(files)} audio files in {folder}")
-                self.check_file_sizes()
-            else:
-                messagebox.showwarning("No Files", "No audio files found in the selected folder")
-                
+            # Scan in the background so large libraries don't block the UI
+            self.files_label.config(text="Scanning...")
+            self.start_btn.config(state=tk.DISABLED)
+            threading.Thread(target=self.scan_folder, args=(folder,), daemon=True).start()
+            
+    def scan_folder(self, folder):
+        """Find all audio files in the folder and subfolders (runs in background thread)"""
+        files = []
+        
+        for path in iter_audio_files(folder, index=AudioLibraryIndex()):
+            files.append(path)
+            if len(files) % 1000 == 0:
+                self.ui_updates.call(self.files_label.config, text=f"Scanning... {len(files)} files found")
+        
+        self.ui_updates.call(self.finish_folder_scan, folder, sorted(files))
+        
+    def finish_folder_scan(self, folder, files):
+        """Show the files found by a folder scan"""
+        if files:
+            self.selected_files = files
+            self.update_files_display()
+            self.log(f"Found {len(files)} audio files in {folder}")
+            self.check_file_sizes()
+        else:
+            self.update_files_display()
+            messagebox.showwarning("No Files", "No audio files found in the selected folder")
+            
     def update_files_display(self):
         """Update the files display and enable/disable start button"""
         if self.selected_files:
@@ -264,14 +308,13 @@ class StudioVoiceDesktopApp:
             self.start_btn.config(state=tk.DISABLED)
             
     def log(self, message):
-        """Add a message to the log"""
+        """Add a message to the log (safe to call from any thread)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
+        self.ui_updates.log(f"[{timestamp}] {message}")
         
     def clear_log(self):
         """Clear the log text"""
-        self.log_text.delete(1.0, tk.END)
+        self.log_view.clear()
         
     def check_file_sizes(self):
         """Check selected files for size limits and warn user"""
@@ -282,7 +325,8 @@ class StudioVoiceDesktopApp:
         total_large_size = 0
         
         for file_path in self.selected_files:
-            if self.large_file_processor.needs_chunking(file_path):
+            if self.large_file_processor.needs_chunking(file_path, self.model_var.get(),
+                                                        self.streaming_var.get()):
                 file_info = self.large_file_processor.get_file_size_info(file_path)
                 large_files.append((file_path, file_info))
                 total_large_size += file_info['file_size_mb']
@@ -310,6 +354,12 @@ class StudioVoiceDesktopApp:
             messagebox.showwarning("No Files", "Please select audio files to process")
             return
         
+        if not self.worker_pool:
+            messagebox.showerror("Missing Dependencies",
+                                 "Studio Voice modules could not be loaded.\n\n"
+                                 "Use 'Check Dependencies' to see what is missing.")
+            return
+        
         # Confirm in-place processing
         result = messagebox.askyesno(
             "Confirm Processing", 
@@ -341,32 +391,37 @@ class StudioVoiceDesktopApp:
         self.log("Processing stopped by user")
         
     def process_files(self):
-        """Process the selected files (runs in background thread)"""
+        """Process the selected files on the worker pool (runs in background thread)"""
         total_files = len(self.selected_files)
         successful = 0
+        skipped = 0
         failed = 0
         
+        self.manifest = ProcessingManifest.for_tree(self.selected_files)
+        self.worker_pool.set_max_workers(self.workers_var.get())
+        with self.progress_lock:
+            self.file_progress = {}
+            self.progress_total = 0.0
+        
         self.log(f"Starting processing of {total_files} files...")
-        self.log(f"Model: {self.model_var.get()}, Streaming: {self.streaming_var.get()}")
+        self.log(f"Model: {self.model_var.get()}, Streaming: {self.streaming_var.get()}, "
+                 f"Parallel files: {self.worker_pool.max_workers}")
         self.log(f"Files will be enhanced in place with originals backed up")
         
-        for i, input_file in enumerate(self.selected_files):
-            if not self.is_processing:
-                break
-                
-            # Update progress
-            progress = (i / total_files) * 100
-            self.progress['value'] = progress
-            self.progress_label.config(text=f"Processing {i+1}/{total_files}")
-            
-            filename = os.path.basename(input_file)
-            self.log(f"Processing: {filename}")
+        futures = {self.worker_pool.submit(self.run_file, input_file): input_file
+                   for input_file in self.selected_files}
+        
+        for future in as_completed(futures):
+            filename = os.path.basename(futures[future])
             
             try:
-                # Process file in place (no separate output file needed)
-                result = self.process_single_file(input_file)
+                result = future.result()
                 
-                if result:
+                if result is None:
+                    continue  # Skipped after the user stopped processing
+                elif result == SKIPPED:
+                    skipped += 1
+                elif result:
                     successful += 1
                     self.log(f"✅ Completed: {filename}")
                 else:
@@ -376,142 +431,110 @@ class StudioVoiceDesktopApp:
             except Exception as e:
                 failed += 1
                 self.log(f"❌ Error processing {filename}: {str(e)}")
+            
+            self.ui_updates.set_progress(text=f"Processed {successful + skipped + failed}/{total_files}")
+        
+        self.manifest.close()
         
         # Final update
-        self.progress['value'] = 100
-        self.progress_label.config(text="Complete")
-        self.start_btn.config(state=tk.NORMAL)
-        self.stop_btn.config(state=tk.DISABLED)
+        self.ui_updates.set_progress(100, "Complete")
+        self.ui_updates.call(self.start_btn.config, state=tk.NORMAL)
+        self.ui_updates.call(self.stop_btn.config, state=tk.DISABLED)
         
-        self.log(f"Processing complete! ✅ {successful} successful, ❌ {failed} failed")
+        self.log(f"Processing complete! ✅ {successful} successful, ⏭️ {skipped} already enhanced, ❌ {failed} failed")
         self.log("Enhanced files have replaced the originals")
         self.log("Original files have been moved to '../original audio/' folders")
         
         if successful > 0:
-            messagebox.showinfo("Processing Complete", 
+            self.ui_updates.call(messagebox.showinfo, "Processing Complete", 
                               f"Successfully processed {successful} files!\n\n"
                               f"Enhanced files have replaced the originals.\n"
                               f"Original files backed up to '../original audio/' folders.")
 
-    def process_single_file(self, input_file):
-        """Process a single audio file using the existing Python script and manage files properly"""
+    def processing_params(self):
+        """Model and parameters recorded with every processed file"""
+        return {'model_type': self.model_var.get(), 'streaming': self.streaming_var.get()}
+    
+    def run_file(self, input_file):
+        """Process one file on a pool worker
+        
+        Returns None if processing was stopped and SKIPPED if the manifest shows the
+        file was already enhanced with the same settings.
+        """
+        if not self.is_processing:
+            return None
+        
+        filename = os.path.basename(input_file)
+        params = self.processing_params()
+        
+        if self.manifest.is_processed(input_file, params):
+            self.log(f"⏭️ Already enhanced: {filename}")
+            self.update_file_progress(input_file, 1.0)
+            return SKIPPED
+        
+        self.log(f"Processing: {filename}")
+        
+        def progress_callback(fraction):
+            self.update_file_progress(input_file, fraction)
+        
+        result = self.process_single_file(input_file, progress_callback)
+        if result:
+            self.manifest.mark_processed(input_file, params)
+        self.update_file_progress(input_file, 1.0)
+        return result
+    
+    def update_file_progress(self, input_file, fraction):
+        """Record the progress of one file and queue an overall progress update"""
+        with self.progress_lock:
+            self.progress_total += fraction - self.file_progress.get(input_file, 0.0)
+            self.file_progress[input_file] = fraction
+            value = self.progress_total / len(self.selected_files) * 100
+        self.ui_updates.set_progress(value)
+    
+    def process_single_file(self, input_file, progress_callback=None):
+        """Process a single audio file in-process and manage files properly"""
         try:
             # Check if file needs chunking due to size
-            if self.large_file_processor and self.large_file_processor.needs_chunking(input_file):
-                return self.process_large_file(input_file)
+            if self.large_file_processor and self.large_file_processor.needs_chunking(
+                    input_file, self.model_var.get(), self.streaming_var.get()):
+                return self.process_large_file(input_file, progress_callback)
             else:
-                return self.process_regular_file(input_file)
+                return self.process_regular_file(input_file, progress_callback)
         except Exception as e:
             self.log(f"Error processing file: {str(e)}")
             return False
     
-    def process_regular_file(self, input_file):
+    def process_regular_file(self, input_file, progress_callback=None):
         """Process a regular-sized audio file"""
+        # Process to a temporary output file first
+        temp_output = input_file.replace('.wav', '_temp_enhanced.wav')
+        
+        # Ensure temp file has .wav extension even for non-wav inputs
+        if not temp_output.endswith('.wav'):
+            temp_output = input_file + '_temp_enhanced.wav'
+        
         try:
-            # Get the directory of the input file
-            input_dir = os.path.dirname(input_file)
-            filename = os.path.basename(input_file)
-            
-            # Create backup directory one level up from the audio file
-            backup_dir = os.path.join(input_dir, '..', 'original audio')
-            os.makedirs(backup_dir, exist_ok=True)
-            backup_file = os.path.join(backup_dir, filename)
-            
-            # Find the studio_voice.py script
-            script_path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'studio_voice.py')
-            
-            if not os.path.exists(script_path):
-                self.log(f"Error: studio_voice.py not found at {script_path}")
-                return False
-            
-            # Process to a temporary output file first
-            temp_output = input_file.replace('.wav', '_temp_enhanced.wav')
-            
-            # Ensure temp file has .wav extension even for non-wav inputs
-            if not temp_output.endswith('.wav'):
-                temp_output = input_file + '_temp_enhanced.wav'
-            
-            # Build command to process to temp file
-            cmd = [
-                sys.executable, script_path,  # Use sys.executable instead of 'python'
-                '--input', input_file,
-                '--output', temp_output,
-                '--model-type', self.model_var.get()
-            ]
-            
-            if self.streaming_var.get():
-                cmd.append('--streaming')
-            
-            # Log the command being executed for debugging
-            self.log(f"Executing command: {' '.join(cmd)}")
-            
-            # Run the processing command
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
-            # Check if processing was actually successful
-            if result.returncode == 0 and os.path.exists(temp_output) and os.path.getsize(temp_output) > 0:
-                # Processing successful - now do the file management
-                try:
-                    # Move original file to backup location
-                    if os.path.exists(backup_file):
-                        # If backup already exists, remove it first
-                        os.remove(backup_file)
-                    shutil.move(input_file, backup_file)
-                    
-                    # Move enhanced file to replace original
-                    shutil.move(temp_output, input_file)
-                    
-                    self.log(f"✅ File management complete:")
-                    self.log(f"   Enhanced: {input_file}")
-                    self.log(f"   Backup: {backup_file}")
-                    
-                    return True
-                    
-                except Exception as e:
-                    self.log(f"Error during file management: {str(e)}")
-                    # Try to restore original file if it was moved
-                    try:
-                        if os.path.exists(backup_file) and not os.path.exists(input_file):
-                            shutil.move(backup_file, input_file)
-                    except:
-                        pass
-                    # Clean up temp file if it exists
-                    if os.path.exists(temp_output):
-                        os.remove(temp_output)
-                    return False
-            else:
-                # Log detailed error information
-                if result.returncode != 0:
-                    self.log(f"❌ Processing failed with return code: {result.returncode}")
-                    self.log(f"Error output: {result.stderr}")
-                    if result.stdout:
-                        self.log(f"Standard output: {result.stdout}")
-                elif not os.path.exists(temp_output):
-                    self.log(f"❌ Processing failed: Output file was not created")
-                    self.log(f"Command stderr: {result.stderr}")
-                    self.log(f"Command stdout: {result.stdout}")
-                elif os.path.getsize(temp_output) == 0:
-                    self.log(f"❌ Processing failed: Output file is empty (0 bytes)")
-                    self.log(f"This usually indicates a server connection issue")
-                    self.log(f"Command stderr: {result.stderr}")
-                    self.log(f"Command stdout: {result.stdout}")
-                else:
-                    self.log(f"❌ Processing failed for unknown reason")
-                    self.log(f"Error output: {result.stderr}")
-                    
-                # Clean up temp file if it exists
-                if os.path.exists(temp_output):
-                    os.remove(temp_output)
-                return False
-                
-        except subprocess.TimeoutExpired:
-            self.log("Error: Processing timed out")
-            return False
+            self.worker_pool.enhance_file(input_file, temp_output, self.model_var.get(),
+                                          self.streaming_var.get(), progress_callback)
         except Exception as e:
-            self.log(f"Error running processing: {str(e)}")
+            self.log(f"❌ Processing failed: {str(e)}")
+            # Clean up temp file if it exists
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+            return False
+        
+        # Check if processing was actually successful
+        if not os.path.exists(temp_output) or os.path.getsize(temp_output) == 0:
+            self.log(f"❌ Processing failed: Output file is empty (0 bytes)")
+            self.log(f"This usually indicates a server connection issue")
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
             return False
+        
+        # Processing successful - now do the file management
+        return self.finalize_processed_file(input_file, temp_output)
     
-    def process_large_file(self, input_file):
+    def process_large_file(self, input_file, progress_callback=None):
         """Process a large audio file by chunking it"""
         try:
             filename = os.path.basename(input_file)
@@ -521,103 +544,104 @@ class StudioVoiceDesktopApp:
             self.log(f"   Size: {file_info['file_size_mb']:.1f}MB (limit: {file_info['limit_mb']:.1f}MB)")
             self.log(f"   Duration: {file_info['duration_seconds']:.1f}s")
             
-            # Estimate chunk duration
-            chunk_duration = self.large_file_processor.estimate_chunk_duration(input_file)
-            self.log(f"   Using {chunk_duration:.0f}s chunks")
+            # Plan the largest chunk whose request fits the server limit
+            chunk_duration = self.large_file_processor.plan_chunk_duration(
+                input_file, self.model_var.get(), self.streaming_var.get())
+            self.log(f"   Using {chunk_duration:.2f}s chunks")
             
-            # Split file into chunks
-            self.log("🔪 Splitting file into chunks...")
-            chunk_files = self.large_file_processor.split_audio_file(input_file, chunk_duration)
-            self.log(f"   Created {len(chunk_files)} chunks")
+            # Chunks are read from the input as they are sent, nothing is written to a temp dir
+            info = sf.info(input_file)
+            chunk_ranges = self.large_file_processor.plan_chunk_ranges(
+                info.frames, info.samplerate, chunk_duration)
+            chunk_frames = [frames for _, frames in chunk_ranges]
+            self.log(f"   Processing {len(chunk_ranges)} chunks")
+            
+            # Create final output file with proper .wav extension
+            temp_output = input_file.replace('.wav', '_temp_enhanced.wav')
+            
+            # Ensure temp file has .wav extension even for non-wav inputs  
+            if not temp_output.endswith('.wav'):
+                temp_output = input_file + '_temp_enhanced.wav'
+            
+            # Chunks finished by an interrupted earlier run are kept in the partial output
+            chunk_params = dict(self.processing_params(), chunk_duration=chunk_duration)
+            writer = PositionalWavWriter(temp_output, info.samplerate, info.channels,
+                                         info.frames, resume=True)
+            completed_chunks = set()
+            if writer.resumed:
+                completed_chunks = self.manifest.completed_chunks(input_file, chunk_params)
+            else:
+                self.manifest.clear_chunks(input_file, chunk_params)
+            if completed_chunks:
+                self.log(f"   Resuming: {len(completed_chunks)} chunks already enhanced")
             
-            # Process each chunk
-            processed_chunks = []
+            processed_chunks = len(completed_chunks)
             failed_chunks = 0
+            completed_frames = [sum(chunk_frames[i] for i in completed_chunks)]
+            progress_lock = threading.Lock()
             
-            for i, chunk_file in enumerate(chunk_files):
+            def run_chunk(chunk):
+                i, start_frame, chunk_data = chunk
                 if not self.is_processing:  # Check if user stopped processing
-                    break
-                    
-                self.log(f"🔄 Processing chunk {i+1}/{len(chunk_files)}")
+                    return False
                 
-                # Create output filename for this chunk
-                chunk_output = chunk_file.replace('.wav', '_processed.wav')
+                self.log(f"🔄 Processing chunk {i+1}/{len(chunk_ranges)}")
+                
+                # Enhanced blocks go to the chunk's offset as they arrive, whatever order chunks finish in
+                try:
+                    writer.write_blocks(start_frame,
+                                        self.enhance_chunk(chunk_data, info.samplerate),
+                                        len(chunk_data))
+                except Exception as e:
+                    self.log(f"   ❌ Chunk {i+1} failed: {str(e)}")
+                    return False
                 
-                # Process this chunk using regular processing
-                success = self.process_chunk(chunk_file, chunk_output)
+                self.manifest.mark_chunk_completed(input_file, chunk_params, i)
                 
-                if success:
-                    processed_chunks.append(chunk_output)
-                else:
-                    failed_chunks += 1
-                    self.log(f"   ❌ Chunk {i+1} failed")
+                with progress_lock:
+                    completed_frames[0] += len(chunk_data)
+                    if progress_callback:
+                        progress_callback(completed_frames[0] / info.frames)
+                return True
+            
+            # Completed chunks are skipped before their audio is read
+            chunks = self.large_file_processor.iter_audio_chunks(
+                input_file, chunk_duration, skip_chunks=completed_chunks)
+            
+            try:
+                # Process chunks in parallel. Other files run at the same time, so the
+                # worker pool's request limit keeps the total number of streams bounded.
+                for success in self.large_file_processor.process_chunks(
+                        chunks, run_chunk, self.worker_pool.max_workers):
+                    if success:
+                        processed_chunks += 1
+                    else:
+                        failed_chunks += 1
+            except Exception:
+                writer.close()
+                raise
             
             # Check if all chunks processed successfully
-            if len(processed_chunks) == len(chunk_files) and failed_chunks == 0:
-                # Merge processed chunks
-                self.log("🔗 Merging processed chunks...")
-                
-                # Create final output file with proper .wav extension
-                temp_output = input_file.replace('.wav', '_temp_enhanced.wav')
+            if processed_chunks == len(chunk_ranges) and failed_chunks == 0:
+                writer.finalize()
                 
-                # Ensure temp file has .wav extension even for non-wav inputs  
-                if not temp_output.endswith('.wav'):
-                    temp_output = input_file + '_temp_enhanced.wav'
-                
-                success = self.large_file_processor.merge_audio_files(processed_chunks, temp_output)
-                
-                if success:
-                    # Do the file management (same as regular processing)
-                    return self.finalize_processed_file(input_file, temp_output)
-                else:
-                    self.log("❌ Failed to merge chunks")
-                    return False
+                # Do the file management (same as regular processing)
+                return self.finalize_processed_file(input_file, temp_output)
             else:
-                self.log(f"❌ Chunk processing failed: {failed_chunks} failures out of {len(chunk_files)} chunks")
+                # Keep the partial output so a re-run resumes at the missing chunks
+                writer.close()
+                self.log(f"❌ Chunk processing failed: {failed_chunks} failures out of {len(chunk_ranges)} chunks")
                 return False
                 
         except Exception as e:
             self.log(f"❌ Error processing large file: {str(e)}")
             return False
-        finally:
-            # Clean up chunk files
-            if 'chunk_files' in locals():
-                self.large_file_processor.cleanup_chunks(chunk_files)
-            if 'processed_chunks' in locals():
-                self.large_file_processor.cleanup_chunks(processed_chunks)
     
-    def process_chunk(self, input_chunk, output_chunk):
-        """Process a single audio chunk"""
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'studio_voice.py')
-            
-            cmd = [
-                sys.executable, script_path,
-                '--input', input_chunk,
-                '--output', output_chunk,
-                '--model-type', self.model_var.get()
-            ]
-            
-            if self.streaming_var.get():
-                cmd.append('--streaming')
-            
-            # Run with shorter timeout for chunks
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-            
-            # Check if chunk processing was successful
-            if result.returncode == 0 and os.path.exists(output_chunk) and os.path.getsize(output_chunk) > 0:
-                return True
-            else:
-                if result.stderr:
-                    self.log(f"   Chunk error: {result.stderr}")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            self.log("   Chunk processing timed out")
-            return False
-        except Exception as e:
-            self.log(f"   Chunk processing error: {str(e)}")
-            return False
+    def enhance_chunk(self, chunk_data, sample_rate):
+        """Enhance the samples of one chunk, yielding the enhanced blocks"""
+        # Shorter timeout for chunks
+        return self.worker_pool.enhance_audio(chunk_data, sample_rate, self.model_var.get(),
+                                              self.streaming_var.get(), timeout=120)
     
     def finalize_processed_file(self, input_file, temp_output):
         """Finalize the processed file by moving it to replace the original"""
@@ -658,6 +682,13 @@ class StudioVoiceDesktopApp:
                 os.remove(temp_output)
             return False
 
+    def on_close(self):
+        """Stop the workers and close the window"""
+        self.is_processing = False
+        if self.worker_pool:
+            self.worker_pool.close()
+        self.root.destroy()
+
 def main():
     root = tk.Tk()
     app = StudioVoiceDesktopApp(root)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Worker Pool
+Persistent in-process workers that enhance audio files over a shared gRPC channel
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+# Add the scripts and interfaces directories to import studio_voice
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'interfaces', 'studio_voice'))
+
+import grpc
+import numpy as np
+import soundfile as sf
+import studio_voice
+import studiovoice_pb2_grpc
+
+from large_file_handler import LargeFileProcessor
+
+DEFAULT_SERVER_TARGET = "127.0.0.1:8001"
+DEFAULT_WORKERS = 4
+MAX_WORKERS = 16
+
+# Per-request deadline in seconds, matches the former per-file subprocess timeout
+REQUEST_TIMEOUT = 300
+
+class StudioVoiceWorkerPool:
+    """Runs Studio Voice requests on long-lived worker threads sharing one gRPC channel
+
+    The interpreter, the grpc/numpy/soundfile imports and the HTTP/2 connection are
+    paid for once, so small files no longer spend most of their time starting Python.
+
+    At most max_workers requests are open at once, including those made from threads
+    outside the pool such as the chunks of a large file.
+    """
+
+    def __init__(self, server_target: str = DEFAULT_SERVER_TARGET, max_workers: int = DEFAULT_WORKERS):
+        self.server_target = server_target
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="studio-voice-worker")
+        self._streams = threading.BoundedSemaphore(max_workers)
+        self._channel = None
+        self._lock = threading.Lock()
+
+    def set_max_workers(self, max_workers: int):
+        """Change the concurrency level, work already submitted finishes on the old workers"""
+        max_workers = max(1, min(MAX_WORKERS, int(max_workers)))
+        with self._lock:
+            if max_workers == self.max_workers:
+                return
+            old_executor = self._executor
+            self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                thread_name_prefix="studio-voice-worker")
+            self._streams = threading.BoundedSemaphore(max_workers)
+            self.max_workers = max_workers
+        old_executor.shutdown(wait=False)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run fn on one of the pool workers"""
+        with self._lock:
+            return self._executor.submit(fn, *args, **kwargs)
+
+    def get_channel(self) -> grpc.Channel:
+        """Return the shared channel, connecting on first use"""
+        with self._lock:
+            if self._channel is None:
+                self._channel = grpc.insecure_channel(self.server_target)
+            return self._channel
+
+    def enhance_file(self, input_file: str, output_file: str, model_type: str, streaming: bool,
+                     progress_callback: Optional[Callable[[float], None]] = None,
+                     timeout: float = REQUEST_TIMEOUT):
+        """Enhance input_file into output_file on the calling thread
+
+        progress_callback receives the fraction of the request payload sent so far.
+        Raises on invalid input or a failed request.
+        """
+        # Same sample rate check as the studio_voice.py script
+        sample_rate = 16000 if model_type == "16k-hq" else 48000
+        input_sample_rate = sf.info(input_file).samplerate
+        if input_sample_rate != sample_rate:
+            raise ValueError(f"Sample rate mismatch: expected {sample_rate}, got {input_sample_rate}.")
+
+        total_bytes = LargeFileProcessor().request_payload_size(input_file, model_type, streaming)
+        requests = studio_voice.generate_request_for_inference(
+            input_filepath=input_file,
+            model_type=model_type,
+            sample_rate=sample_rate,
+            streaming=streaming
+        )
+
+        def tracked_requests():
+            sent_bytes = 0
+            for request in requests:
+                yield request
+                sent_bytes += len(request.audio_stream_data)
+                if progress_callback and total_bytes:
+                    progress_callback(min(1.0, sent_bytes / total_bytes))
+
+        with self._lock:
+            streams = self._streams
+        with streams:
+            stub = studiovoice_pb2_grpc.MaxineStudioVoiceStub(self.get_channel())
+            responses = stub.EnhanceAudio(tracked_requests(), timeout=timeout)
+
+            studio_voice.write_output_file_from_response(
+                response_iter=responses,
+                output_filepath=output_file,
+                sample_rate=sample_rate,
+                streaming=streaming
+            )
+
+    def enhance_audio(self, audio: np.ndarray, sample_rate: int, model_type: str, streaming: bool,
+                      timeout: float = REQUEST_TIMEOUT) -> Iterator[np.ndarray]:
+        """Enhance samples held in memory on the calling thread, yielding blocks as they arrive
+
+        Used for the chunks of large files, which are read from the input and written
+        to the output without temporary files. Raises on invalid input or a failed request.
+        """
+        expected_sample_rate = 16000 if model_type == "16k-hq" else 48000
+        if sample_rate != expected_sample_rate:
+            raise ValueError(f"Sample rate mismatch: expected {expected_sample_rate}, got {sample_rate}.")
+
+        with self._lock:
+            streams = self._streams
+        with streams:
+            stub = studiovoice_pb2_grpc.MaxineStudioVoiceStub(self.get_channel())
+            responses = stub.EnhanceAudio(
+                studio_voice.generate_request_for_audio(audio, model_type, sample_rate, streaming),
+                timeout=timeout
+            )
+            yield from studio_voice.iter_audio_from_response(responses, streaming)
+
+    def close(self):
+        """Stop the workers and close the shared channel"""
+        with self._lock:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            if self._channel is not None:
+                self._channel.close()
+                self._channel = None
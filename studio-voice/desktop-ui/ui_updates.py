@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Desktop UI Updates
+Thread-safe, batched UI updates and a bounded, virtualized log view for the tkinter apps
+"""
+
+import itertools
+import threading
+import tkinter as tk
+import tkinter.font as tkfont
+from collections import deque
+from typing import Callable, Optional
+
+# Lines kept in the log ring buffer
+MAX_LOG_LINES = 10000
+
+# Interval between UI refreshes (~20 frames per second)
+UI_REFRESH_MS = 50
+
+class BoundedLogView:
+    """Shows a window of a bounded log ring buffer in a Text widget
+
+    Only the lines that fit in the widget are inserted, so rendering cost does not
+    grow with the size of the log. The scrollbar moves the window over the buffer
+    and the view follows new lines while it is scrolled to the bottom.
+    """
+
+    def __init__(self, text: tk.Text, scrollbar: tk.Scrollbar, max_lines: int = MAX_LOG_LINES):
+        self.text = text
+        self.scrollbar = scrollbar
+        self.lines = deque(maxlen=max_lines)
+        self.first_line = 0
+        self.follow = True
+
+        self.scrollbar.configure(command=self.yview)
+        self.text.configure(state=tk.DISABLED)
+        self.text.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.text.bind("<Button-4>", lambda event: self.yview("scroll", -3, "units"))
+        self.text.bind("<Button-5>", lambda event: self.yview("scroll", 3, "units"))
+        self.text.bind("<Configure>", lambda event: self.render())
+
+    def visible_line_count(self) -> int:
+        """Number of log lines that fit in the widget"""
+        line_height = tkfont.nametofont(self.text.cget("font")).metrics("linespace")
+        height = self.text.winfo_height()
+        if height <= 1:
+            return int(self.text.cget("height"))
+        return max(1, height // line_height)
+
+    def append(self, lines):
+        """Add lines to the ring buffer and refresh the visible window"""
+        if not lines:
+            return
+        dropped = max(0, len(self.lines) + len(lines) - self.lines.maxlen)
+        self.lines.extend(lines)
+        self.first_line = max(0, self.first_line - dropped)
+        self.render()
+
+    def clear(self):
+        """Remove every line from the log"""
+        self.lines.clear()
+        self.first_line = 0
+        self.follow = True
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar command: move the visible window over the ring buffer"""
+        visible = self.visible_line_count()
+        if args[0] == "moveto":
+            self.first_line = int(float(args[1]) * len(self.lines))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (visible if args[2] == "pages" else 1)
+            self.first_line += step
+
+        last_first_line = max(0, len(self.lines) - visible)
+        self.first_line = max(0, min(self.first_line, last_first_line))
+        self.follow = self.first_line >= last_first_line
+        self.render()
+
+    def render(self):
+        """Insert the visible window of lines into the Text widget"""
+        visible = self.visible_line_count()
+        if self.follow:
+            self.first_line = max(0, len(self.lines) - visible)
+
+        window = itertools.islice(self.lines, self.first_line, self.first_line + visible)
+
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(tk.END, "\n".join(window))
+        self.text.configure(state=tk.DISABLED)
+
+        if self.lines:
+            total = len(self.lines)
+            self.scrollbar.set(self.first_line / total, min(1.0, (self.first_line + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_mouse_wheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+        return "break"
+
+class UIUpdateQueue:
+    """Collects UI updates from any thread and applies them on the Tk thread
+
+    A root.after loop drains the queue at a fixed rate: log lines are appended to
+    the log view in one batch, progress updates are coalesced to the latest value
+    and queued calls run in order.
+    """
+
+    def __init__(self, root: tk.Misc, log_view: BoundedLogView, progress_bar=None,
+                 progress_label=None, interval_ms: int = UI_REFRESH_MS):
+        self.root = root
+        self.log_view = log_view
+        self.progress_bar = progress_bar
+        self.progress_label = progress_label
+        self.interval_ms = interval_ms
+
+        self._lock = threading.Lock()
+        self._log_lines = deque(maxlen=log_view.lines.maxlen)
+        self._calls = deque()
+        self._progress_value = None
+        self._progress_text = None
+
+        self.root.after(self.interval_ms, self._drain)
+
+    def log(self, message: str):
+        """Queue a log message"""
+        with self._lock:
+            self._log_lines.extend(message.splitlines() or [""])
+
+    def set_progress(self, value: Optional[float] = None, text: Optional[str] = None):
+        """Queue a progress update, only the latest value and text are shown"""
+        with self._lock:
+            if value is not None:
+                self._progress_value = value
+            if text is not None:
+                self._progress_text = text
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Queue an arbitrary call to run on the Tk thread"""
+        with self._lock:
+            self._calls.append((fn, args, kwargs))
+
+    def _drain(self):
+        try:
+            with self._lock:
+                lines = list(self._log_lines)
+                self._log_lines.clear()
+                calls = list(self._calls)
+                self._calls.clear()
+                value, text = self._progress_value, self._progress_text
+                self._progress_value = self._progress_text = None
+
+            self.log_view.append(lines)
+
+            if value is not None and self.progress_bar is not None:
+                self.progress_bar['value'] = value
+            if text is not None and self.progress_label is not None:
+                self.progress_label.config(text=text)
+
+            for fn, args, kwargs in calls:
+                fn(*args, **kwargs)
+        finally:
+            self.root.after(self.interval_ms, self._drain)
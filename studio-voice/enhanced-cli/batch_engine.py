@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Studio Voice CLI Batch Engine
+Concurrent in-process batch processing with live throughput and real-time factor reporting
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import grpc
+import soundfile as sf
+from rich.table import Table
+
+# Add the desktop-ui directory to the path to import the shared worker pool and manifest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'desktop-ui'))
+from large_file_handler import LargeFileProcessor
+from processing_manifest import MANIFEST_FILENAME, ProcessingManifest
+from studio_voice_worker_pool import DEFAULT_WORKERS, MAX_WORKERS, StudioVoiceWorkerPool
+
+# Finished files kept in the live table below the running ones
+RECENT_ROWS = 5
+
+class FileJob:
+    """Progress of one file in a batch"""
+
+    def __init__(self, input_file: str, output_file: str):
+        self.input_file = input_file
+        self.output_file = output_file
+        self.name = os.path.basename(input_file)
+        self.status = "queued"
+        self.error = None
+        self.audio_seconds = 0.0
+        self.total_bytes = 0
+        self.sent_bytes = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def elapsed(self, now: Optional[float] = None) -> float:
+        """Seconds since the request started"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or now or time.monotonic()) - self.started_at
+
+    def throughput(self, now: Optional[float] = None) -> float:
+        """Request bytes streamed per second"""
+        elapsed = self.elapsed(now)
+        return self.sent_bytes / elapsed if elapsed > 0 else 0.0
+
+class BatchEngine:
+    """Enhances files concurrently on a worker pool sharing one gRPC channel
+
+    Files are submitted one by one and processed by up to max_workers threads. Progress
+    comes from the request bytes actually streamed to the server, and the aggregate
+    real-time factor is wall time divided by the seconds of audio enhanced, so values
+    below 1 mean the batch runs faster than real time.
+    """
+
+    def __init__(self, settings: Dict, max_workers: int = DEFAULT_WORKERS):
+        self.output_dir = settings['output_dir']
+        self.model_type = settings['model_type']
+        self.streaming = settings['streaming']
+        self.params = {'model_type': self.model_type, 'streaming': self.streaming}
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        max_workers = max(1, min(MAX_WORKERS, int(max_workers)))
+        self.pool = StudioVoiceWorkerPool(settings['server'], max_workers)
+        self.manifest = ProcessingManifest(os.path.join(self.output_dir, MANIFEST_FILENAME))
+        self.payload_sizer = LargeFileProcessor()
+
+        self._lock = threading.Lock()
+        self.running: Dict[str, FileJob] = {}
+        self.recent = deque(maxlen=RECENT_ROWS)
+        self.failures: List[FileJob] = []
+        self.submitted = 0
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        self.audio_seconds = 0.0
+        self.sent_bytes = 0
+        self.started_at = time.monotonic()
+
+    def submit(self, input_file: str) -> Future:
+        """Queue input_file for enhancement into the output directory"""
+        output_file = os.path.join(self.output_dir, f"enhanced_{os.path.basename(input_file)}")
+        job = FileJob(input_file, output_file)
+        with self._lock:
+            self.submitted += 1
+        return self.pool.submit(self._run, job)
+
+    @property
+    def finished(self) -> int:
+        """Number of submitted files that are done, failed or skipped"""
+        return self.successful + self.failed + self.skipped
+
+    def _run(self, job: FileJob) -> FileJob:
+        if self.manifest.is_processed(job.input_file, self.params):
+            job.status = "skipped"
+            with self._lock:
+                self.skipped += 1
+            return job
+
+        job.started_at = time.monotonic()
+        job.status = "running"
+        with self._lock:
+            self.running[job.input_file] = job
+
+        try:
+            job.audio_seconds = sf.info(job.input_file).duration
+            job.total_bytes = self.payload_sizer.request_payload_size(
+                job.input_file, self.model_type, self.streaming)
+
+            def on_progress(fraction):
+                job.sent_bytes = int(fraction * job.total_bytes)
+
+            self.pool.enhance_file(job.input_file, job.output_file, self.model_type,
+                                   self.streaming, on_progress)
+            self.manifest.mark_processed(job.input_file, self.params, job.output_file)
+            job.status = "done"
+        except grpc.RpcError as e:
+            job.status = "timeout" if e.code() == grpc.StatusCode.DEADLINE_EXCEEDED else "failed"
+            job.error = e.details()
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.monotonic()
+            with self._lock:
+                self.running.pop(job.input_file, None)
+                self.recent.append(job)
+                if job.status == "done":
+                    self.successful += 1
+                    self.audio_seconds += job.audio_seconds
+                else:
+                    self.failed += 1
+                    self.failures.append(job)
+                self.sent_bytes += job.sent_bytes
+
+        return job
+
+    def real_time_factor(self, now: Optional[float] = None) -> float:
+        """Wall time per second of enhanced audio, 0 until a file has finished"""
+        if self.audio_seconds <= 0:
+            return 0.0
+        return ((now or time.monotonic()) - self.started_at) / self.audio_seconds
+
+    def render(self) -> Table:
+        """Live table of the running and most recently finished files"""
+        now = time.monotonic()
+        with self._lock:
+            running = list(self.running.values())
+            recent = list(self.recent)
+            sent_bytes = self.sent_bytes + sum(job.sent_bytes for job in running)
+            finished = self.finished
+            submitted = self.submitted
+            failed = self.failed
+            skipped = self.skipped
+
+        elapsed = now - self.started_at
+        rtf = self.real_time_factor(now)
+        table = Table(
+            title=f"Studio Voice batch · {self.pool.max_workers} workers",
+            caption=(f"{finished}/{submitted} files · {failed} failed · {skipped} skipped · "
+                     f"{sent_bytes / 1024 / 1024:.1f} MB sent · "
+                     f"{sent_bytes / 1024 / 1024 / elapsed if elapsed > 0 else 0:.2f} MB/s · "
+                     f"RTF {rtf:.3f}" + (f" ({1 / rtf:.1f}x real time)" if rtf > 0 else "")),
+            expand=True
+        )
+        table.add_column("File", style="cyan", overflow="ellipsis", no_wrap=True, ratio=3)
+        table.add_column("Status", no_wrap=True)
+        table.add_column("Progress", justify="right")
+        table.add_column("Sent", justify="right")
+        table.add_column("Throughput", justify="right")
+        table.add_column("Audio", justify="right")
+
+        status_styles = {"running": "🔄", "done": "✅", "failed": "❌", "timeout": "⏰"}
+        for job in running + recent[::-1]:
+            progress = job.sent_bytes / job.total_bytes if job.total_bytes else 0.0
+            table.add_row(
+                job.name,
+                f"{status_styles.get(job.status, '')} {job.status}",
+                f"{progress * 100:.0f}%",
+                f"{job.sent_bytes / 1024 / 1024:.1f} MB",
+                f"{job.throughput(now) / 1024 / 1024:.2f} MB/s",
+                f"{job.audio_seconds:.1f}s"
+            )
+        return table
+
+    def close(self):
+        """Stop the workers and close the channel and manifest"""
+        self.pool.close()
+        self.manifest.close()
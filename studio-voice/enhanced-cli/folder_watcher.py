@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Folder Watcher
+Detects audio files landing in a folder tree and reports them once they are fully written
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Add the desktop-ui directory to the path to import the shared audio scanner
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'desktop-ui'))
+from audio_scanner import AUDIO_EXTENSIONS, AudioLibraryIndex, iter_audio_files
+
+# Seconds a file's size and mtime must stay unchanged before it is processed
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# Seconds between directory checks when inotify is not available
+DEFAULT_POLL_INTERVAL = 5.0
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+def is_audio_file(path: str) -> bool:
+    """True if path has one of the supported audio extensions"""
+    return os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS
+
+def _load_libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+class InotifySource:
+    """Reports audio files created, written or moved anywhere under a folder via inotify
+
+    Every directory of the tree gets a watch. New subdirectories are watched as they
+    appear and listed once, so files written before their watch existed are not missed.
+    """
+
+    def __init__(self, folder: str, exclude: Iterable[str] = ()):
+        self.libc = _load_libc()
+        if self.libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+
+        self.exclude = tuple(exclude)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: Dict[int, str] = {}
+        self.overflowed = False
+        try:
+            self.add_tree(folder)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, directory: str) -> List[str]:
+        """Watch directory and its subdirectories, returning the audio files already in them"""
+        files = []
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            if os.path.join(current, '').startswith(self.exclude):
+                continue
+
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOENT:
+                    continue
+                raise OSError(error, f"Cannot watch {current}: {os.strerror(error)}")
+            self.watches[wd] = current
+
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif is_audio_file(entry.name):
+                                files.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return files
+
+    def read(self, timeout: float) -> List[str]:
+        """Wait up to timeout seconds and return the audio files that changed"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        files = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b'\0'))
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        files.extend(self.add_tree(path))
+                    except OSError:
+                        self.overflowed = True
+            elif is_audio_file(name):
+                files.append(path)
+        return files
+
+    def close(self):
+        """Release the inotify descriptor and its watches"""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingSource:
+    """Reports audio files that appeared under a folder since the previous check
+
+    Uses the cached audio library index, so each check only stats directories and
+    lists the ones whose mtime changed instead of rescanning the whole tree.
+    """
+
+    def __init__(self, folder: str, exclude: Iterable[str] = (),
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 index: Optional[AudioLibraryIndex] = None):
+        self.folder = folder
+        self.exclude = tuple(exclude)
+        self.poll_interval = poll_interval
+        self.index = index if index is not None else AudioLibraryIndex()
+        self.known = set()
+        self.last_poll = 0.0
+
+    def list_files(self) -> List[str]:
+        """Return every audio file in the tree and remember them as seen"""
+        files = [path for path in iter_audio_files(self.folder, index=self.index)
+                 if not path.startswith(self.exclude)]
+        self.known = set(files)
+        self.last_poll = time.monotonic()
+        return files
+
+    def read(self, timeout: float) -> List[str]:
+        """Wait up to timeout seconds and return audio files not seen before"""
+        wait = self.last_poll + self.poll_interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, wait))
+
+        known = self.known
+        return [path for path in self.list_files() if path not in known]
+
+    def close(self):
+        """Nothing to release"""
+
+class FolderWatcher:
+    """Yields audio files under folder once they have finished being written
+
+    Files present at start-up are reported as well, so a restarted daemon picks up
+    what arrived while it was down. A file is considered complete when its size and
+    mtime have not changed for settle_seconds, which also covers writers on network
+    shares that close and reopen the file while copying.
+    """
+
+    def __init__(self, folder: str, settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, exclude: Iterable[str] = (),
+                 use_inotify: bool = True, index: Optional[AudioLibraryIndex] = None):
+        self.folder = os.path.abspath(folder)
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.exclude = tuple(os.path.join(os.path.abspath(path), '') for path in exclude)
+
+        self.source = None
+        self.fallback_reason = None
+        if use_inotify:
+            try:
+                self.source = InotifySource(self.folder, self.exclude)
+            except OSError as e:
+                self.fallback_reason = e.strerror or str(e)
+        if self.source is None:
+            self.source = PollingSource(self.folder, self.exclude, poll_interval, index)
+
+    @property
+    def mode(self) -> str:
+        """'inotify' or 'polling'"""
+        return 'inotify' if isinstance(self.source, InotifySource) else 'polling'
+
+    def _initial_files(self) -> List[str]:
+        if isinstance(self.source, InotifySource):
+            # The watches are in place, so nothing written from here on is missed
+            return [path for path in iter_audio_files(self.folder)
+                    if not path.startswith(self.exclude)]
+        return self.source.list_files()
+
+    def watch(self, stop_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """Yield complete audio files until stop_event is set"""
+        pending: Dict[str, Optional[Tuple[Tuple[int, int], float]]] = {}
+        tick = max(0.05, min(self.poll_interval, self.settle_seconds / 2))
+
+        try:
+            for path in self._initial_files():
+                pending[path] = None
+
+            while stop_event is None or not stop_event.is_set():
+                for path in self.source.read(tick if pending else self.poll_interval):
+                    if not path.startswith(self.exclude):
+                        pending[path] = None
+
+                if getattr(self.source, 'overflowed', False):
+                    # Events were lost, recover with one listing of the tree
+                    self.source.overflowed = False
+                    for path in iter_audio_files(self.folder):
+                        if not path.startswith(self.exclude):
+                            pending.setdefault(path, None)
+
+                now = time.monotonic()
+                ready = []
+                for path, state in list(pending.items()):
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        del pending[path]
+                        continue
+
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                    if state is None or state[0] != signature:
+                        pending[path] = (signature, now)
+                    elif stat.st_size > 0 and now - state[1] >= self.settle_seconds:
+                        del pending[path]
+                        ready.append(path)
+
+                yield from sorted(ready)
+        finally:
+            self.source.close()
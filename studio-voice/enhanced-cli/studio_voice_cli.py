@@ -8,15 +8,21 @@ import os
 import sys
 import argparse
 from pathlib import Path
-import subprocess
+from concurrent.futures import as_completed
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
-from rich.prompt import Prompt, Confirm
+from rich.live import Live
+from rich.prompt import Prompt, Confirm, IntPrompt
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 from rich import print as rprint
-import time
+
+# Add the desktop-ui directory to the path to import the shared audio scanner
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'desktop-ui'))
+from audio_scanner import AudioLibraryIndex, iter_audio_files
+from batch_engine import BatchEngine
+from folder_watcher import DEFAULT_SETTLE_SECONDS, FolderWatcher
+from studio_voice_worker_pool import DEFAULT_WORKERS, MAX_WORKERS
 
 console = Console()
 
@@ -77,13 +83,7 @@ class StudioVoiceCLI:
         elif choice == "3":
             directory = Prompt.ask("Enter directory path")
             if os.path.isdir(directory):
-                audio_extensions = {'.wav', '.mp3', '.flac', '.m4a'}
-                files = []
-                for root, dirs, filenames in os.walk(directory):
-                    for filename in filenames:
-                        if Path(filename).suffix.lower() in audio_extensions:
-                            files.append(os.path.join(root, filename))
-                return files
+                return self.scan_directory(directory)
             return []
             
         elif choice == "4":
@@ -93,6 +93,16 @@ class StudioVoiceCLI:
             
         return []
         
+    def scan_directory(self, directory):
+        """Recursively find audio files, showing a live count while scanning"""
+        files = []
+        with console.status(f"[cyan]Scanning {directory}...[/cyan]") as status:
+            for path in iter_audio_files(directory, index=AudioLibraryIndex()):
+                files.append(path)
+                if len(files) % 500 == 0:
+                    status.update(f"[cyan]Scanning {directory}... {len(files)} audio files found[/cyan]")
+        return sorted(files)
+        
     def configure_settings_interactive(self):
         """Interactive settings configuration"""
         console.print("\n[bold]Processing Configuration:[/bold]")
@@ -118,6 +128,9 @@ class StudioVoiceCLI:
         default_server = "127.0.0.1:8001"
         server = Prompt.ask(f"Server address", default=default_server)
         
+        # Files sent to the server at the same time
+        workers = IntPrompt.ask(f"Parallel files (1-{MAX_WORKERS})", default=DEFAULT_WORKERS)
+        
         # Output settings
         output_dir = Prompt.ask("Output directory", default="./enhanced_audio")
         
@@ -125,7 +138,8 @@ class StudioVoiceCLI:
             'model_type': model_type,
             'streaming': streaming,
             'server': server,
-            'output_dir': output_dir
+            'output_dir': output_dir,
+            'workers': max(1, min(MAX_WORKERS, workers))
         }
         
     def show_file_summary(self, files, settings):
@@ -138,6 +152,7 @@ class StudioVoiceCLI:
         table.add_row("Model type", settings['model_type'])
         table.add_row("Streaming mode", "Yes" if settings['streaming'] else "No")
         table.add_row("Server", settings['server'])
+        table.add_row("Parallel files", str(settings['workers']))
         table.add_row("Output directory", settings['output_dir'])
         
         console.print(table)
@@ -151,72 +166,24 @@ class StudioVoiceCLI:
             console.print("  (Too many to list individually)")
             
     def process_files(self, files, settings):
-        """Process files with enhanced progress display"""
-        os.makedirs(settings['output_dir'], exist_ok=True)
-        
-        successful = 0
-        failed = 0
-        
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TaskProgressColumn(),
-            console=console
-        ) as progress:
-            
-            overall_task = progress.add_task("Overall Progress", total=len(files))
+        """Process files concurrently with a live table of per-file progress"""
+        engine = BatchEngine(settings, settings.get('workers', DEFAULT_WORKERS))
+        
+        try:
+            futures = [engine.submit(input_file) for input_file in files]
             
-            for i, input_file in enumerate(files):
-                filename = os.path.basename(input_file)
-                current_task = progress.add_task(f"Processing {filename}", total=100)
-                
-                try:
-                    # Create output filename
-                    output_file = os.path.join(settings['output_dir'], f"enhanced_{filename}")
-                    
-                    # Build command
-                    cmd = [
-                        'python', str(self.studio_voice_script),
-                        '--input', input_file,
-                        '--output', output_file,
-                        '--model-type', settings['model_type'],
-                        '--target', settings['server']
-                    ]
-                    
-                    if settings['streaming']:
-                        cmd.append('--streaming')
-                    
-                    # Simulate progress (in real implementation, you'd parse actual progress)
-                    for step in range(0, 101, 10):
-                        progress.update(current_task, completed=step)
-                        time.sleep(0.1)  # Simulate processing time
-                    
-                    # Run the actual command
-                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-                    
-                    progress.update(current_task, completed=100)
-                    
-                    if result.returncode == 0:
-                        successful += 1
-                        progress.update(current_task, description=f"✅ {filename}")
-                    else:
-                        failed += 1
-                        progress.update(current_task, description=f"❌ {filename}")
-                        console.print(f"[red]Error processing {filename}: {result.stderr}[/red]")
-                        
-                except subprocess.TimeoutExpired:
-                    failed += 1
-                    progress.update(current_task, description=f"⏰ {filename} (timeout)")
-                except Exception as e:
-                    failed += 1
-                    progress.update(current_task, description=f"❌ {filename}")
-                    console.print(f"[red]Error processing {filename}: {str(e)}[/red]")
-                
-                progress.update(overall_task, advance=1)
-                progress.remove_task(current_task)
-        
-        return successful, failed
+            with Live(get_renderable=engine.render, console=console, refresh_per_second=4):
+                for future in as_completed(futures):
+                    job = future.result()
+                    if job.error:
+                        console.print(f"[red]Error processing {job.name}: {job.error}[/red]")
+        finally:
+            engine.close()
+        
+        if engine.skipped:
+            console.print(f"[dim]⏭️ Skipped {engine.skipped} files already enhanced with these settings[/dim]")
+        
+        return engine.successful + engine.skipped, engine.failed
         
     def show_results(self, successful, failed, output_dir):
         """Display processing results"""
@@ -289,11 +256,7 @@ class StudioVoiceCLI:
             if os.path.isfile(args.input):
                 files = [args.input]
             elif os.path.isdir(args.input):
-                audio_extensions = {'.wav', '.mp3', '.flac', '.m4a'}
-                for root, dirs, filenames in os.walk(args.input):
-                    for filename in filenames:
-                        if Path(filename).suffix.lower() in audio_extensions:
-                            files.append(os.path.join(root, filename))
+                files = self.scan_directory(args.input)
                             
         if not files:
             console.print("[red]❌ No valid input files found[/red]")
@@ -303,7 +266,8 @@ class StudioVoiceCLI:
             'model_type': args.model_type,
             'streaming': args.streaming,
             'server': args.target,
-            'output_dir': args.output or './enhanced_audio'
+            'output_dir': args.output or './enhanced_audio',
+            'workers': args.workers
         }
         
         console.print(f"[cyan]Processing {len(files)} files in batch mode...[/cyan]")
@@ -311,6 +275,56 @@ class StudioVoiceCLI:
         self.show_results(successful, failed, settings['output_dir'])
         
         return 0 if successful > 0 else 1
+        
+    def run_watch_mode(self, args):
+        """Enhance audio files as they land in a folder until interrupted"""
+        if not args.input or not os.path.isdir(args.input):
+            console.print("[red]❌ Watch mode needs an input directory[/red]")
+            return 1
+            
+        settings = {
+            'model_type': args.model_type,
+            'streaming': args.streaming,
+            'server': args.target,
+            'output_dir': args.output or './enhanced_audio'
+        }
+        
+        # The output directory may live inside the watched tree, never ingest our own output
+        watcher = FolderWatcher(args.input, settle_seconds=args.settle,
+                                exclude=[settings['output_dir']])
+        if watcher.fallback_reason:
+            console.print(f"[yellow]⚠️  inotify unavailable ({watcher.fallback_reason}), polling instead[/yellow]")
+        console.print(f"[cyan]👀 Watching {args.input} ({watcher.mode}), press Ctrl+C to stop[/cyan]")
+        
+        engine = BatchEngine(settings, args.workers)
+        in_flight = {}
+        
+        def report(future):
+            job = future.result()
+            if job.error:
+                console.print(f"[red]Error processing {job.name}: {job.error}[/red]")
+        
+        try:
+            with Live(get_renderable=engine.render, console=console, refresh_per_second=4):
+                for input_file in watcher.watch():
+                    # A file rewritten while it is still queued is picked up by the manifest later
+                    if input_file in in_flight and not in_flight[input_file].done():
+                        continue
+                    future = engine.submit(input_file)
+                    future.add_done_callback(report)
+                    in_flight[input_file] = future
+                    
+                    for path in [path for path, future in in_flight.items() if future.done()]:
+                        del in_flight[path]
+        except KeyboardInterrupt:
+            console.print("\n[yellow]Stopped watching[/yellow]")
+        finally:
+            engine.close()
+            
+        console.print(f"[green]✅ {engine.successful} enhanced[/green], "
+                      f"[dim]⏭️ {engine.skipped} already enhanced[/dim], "
+                      f"[red]❌ {engine.failed} failed[/red]")
+        return 0
 
 def main():
     """Main entry point"""
@@ -326,6 +340,12 @@ def main():
                        help='Enable streaming mode')
     parser.add_argument('--target', '-t', default='127.0.0.1:8001',
                        help='Server target address')
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_WORKERS,
+                       help=f'Files processed in parallel (1-{MAX_WORKERS})')
+    parser.add_argument('--watch', action='store_true',
+                       help='Keep running and enhance new files as they land in the input directory')
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE_SECONDS,
+                       help='Seconds a new file must stay unchanged before it is processed (watch mode)')
     parser.add_argument('--batch', '-b', action='store_true',
                        help='Run in batch mode (non-interactive)')
     
@@ -334,7 +354,9 @@ def main():
     cli = StudioVoiceCLI()
     
     try:
-        if args.batch or args.input:
+        if args.watch:
+            return cli.run_watch_mode(args)
+        elif args.batch or args.input:
             return cli.run_batch_mode(args)
         else:
             return cli.run_interactive_mode()
@@ -19,7 +19,9 @@
 # DEALINGS IN THE SOFTWARE.
 
 import argparse
+import io
 import os
+import struct
 import sys
 import grpc
 import time
@@ -32,6 +34,9 @@ sys.path.append(os.path.join(os.getcwd(), "../interfaces/studio_voice"))
 import studiovoice_pb2  # noqa: E402
 import studiovoice_pb2_grpc  # noqa: E402
 
+DATA_CHUNKS = 64 * 1024  # bytes, we send the wav file in 64KB chunks
+OUTPUT_BLOCK_FRAMES = 64 * 1024  # frames, decoded wav output is returned in blocks of this size
+
 
 def read_file_content(file_path: os.PathLike) -> bytes:
     """Function to read file content as bytes.
@@ -57,19 +62,47 @@ def generate_request_for_inference(
       sample_rate: Input audio sample rate
       streaming: Enables grpc streaming mode
     """
+    if streaming:
+        input_audio, sample_rate_file = sf.read(input_filepath)
+        yield from generate_request_for_audio(
+            input_audio=input_audio,
+            model_type=model_type,
+            sample_rate=sample_rate,
+            streaming=streaming,
+        )
+    else:
+        with open(input_filepath, "rb") as fd:
+            while True:
+                buffer = fd.read(DATA_CHUNKS)
+                if buffer == b"":
+                    break
+                yield studiovoice_pb2.EnhanceAudioRequest(audio_stream_data=buffer)
+
+
+def generate_request_for_audio(
+    input_audio: np.ndarray, model_type: str, sample_rate: int, streaming: bool
+) -> Iterator[studiovoice_pb2.EnhanceAudioRequest]:
+    """Generator to produce the request data stream from audio samples held in memory
+
+    Args:
+      input_audio: Input audio samples
+      model_type: Studio Voice model type to infer
+      sample_rate: Input audio sample rate
+      streaming: Enables grpc streaming mode
+    """
     if streaming:
         """
         Input audio chunk is generated based on model type and sample rate,
         1) High quality models require 6sec input
         2) Low latency models require 10ms input chunk
         """
-        input_audio, sample_rate_file = sf.read(input_filepath)
         input_audio = input_audio.astype(np.float32)  # Convert to float32
         input_size_in_ms = 10 if (model_type == "48k-ll") else 6000
         samples_per_ms = sample_rate // 1000
         input_float_size = int(input_size_in_ms * samples_per_ms)
 
-        pad_length = input_float_size - len(input_audio) % input_float_size
+        # Pad only up to the next frame boundary so aligned chunks are sent as-is
+        pad_length = -len(input_audio) % input_float_size
         input_audio = np.pad(input_audio, (0, pad_length), "constant")
 
         print(
@@ -80,13 +113,14 @@ def generate_request_for_inference(
             data = input_audio[i : i + input_float_size]
             yield studiovoice_pb2.EnhanceAudioRequest(audio_stream_data=data.tobytes())
     else:
-        DATA_CHUNKS = 64 * 1024  # bytes, we send the wav file in 64KB chunks
-        with open(input_filepath, "rb") as fd:
-            while True:
-                buffer = fd.read(DATA_CHUNKS)
-                if buffer == b"":
-                    break
-                yield studiovoice_pb2.EnhanceAudioRequest(audio_stream_data=buffer)
+        # Non-streaming mode expects a wav file, encode it in memory
+        buffer = io.BytesIO()
+        sf.write(buffer, input_audio, sample_rate, format="WAV")
+        wav_data = buffer.getbuffer()
+        for i in range(0, len(wav_data), DATA_CHUNKS):
+            yield studiovoice_pb2.EnhanceAudioRequest(
+                audio_stream_data=bytes(wav_data[i : i + DATA_CHUNKS])
+            )
 
 
 def write_output_file_from_response(
@@ -104,13 +138,11 @@ def write_output_file_from_response(
       streaming: Enables grpc streaming mode
     """
     if streaming:
-        output_audio = []
         response_count = 0
-        for response in response_iter:
-            response_count += 1
-            output_audio.append(np.frombuffer(response.audio_stream_data, np.float32))
-
-        sf.write(output_filepath, np.hstack(output_audio), sample_rate)
+        with sf.SoundFile(output_filepath, "w", samplerate=sample_rate, channels=1) as fd:
+            for block in iter_audio_from_response(response_iter, streaming=streaming):
+                response_count += 1
+                fd.write(block)
         return response_count
     else:
         with open(output_filepath, "wb") as fd:
@@ -120,6 +152,164 @@ def write_output_file_from_response(
         return 0  # No response count for non-streaming mode
 
 
+def iter_audio_from_response(
+    response_iter: Iterator[studiovoice_pb2.EnhanceAudioResponse], streaming: bool
+) -> Iterator[np.ndarray]:
+    """Generator to decode the incoming gRPC data stream into blocks of audio samples.
+
+    In streaming mode every response is yielded as soon as it arrives. In
+    non-streaming mode the server returns one wav file, which is decoded as it
+    arrives and yielded in blocks of OUTPUT_BLOCK_FRAMES.
+
+    Args:
+      response_iter: Responses from the server
+      streaming: Enables grpc streaming mode
+    """
+    if streaming:
+        for response in response_iter:
+            yield np.frombuffer(response.audio_stream_data, np.float32)
+    else:
+        yield from iter_wav_blocks(
+            response.audio_stream_data
+            for response in response_iter
+            if response.HasField("audio_stream_data")
+        )
+
+
+# Sample formats decoded incrementally: (format tag, bits) -> (dtype, offset, scale)
+_WAV_SAMPLE_FORMATS = {
+    (1, 8): ("u1", 128.0, 1 / 128),
+    (1, 16): ("<i2", 0.0, 1 / 32768),
+    (1, 32): ("<i4", 0.0, 1 / 2147483648),
+    (3, 32): ("<f4", 0.0, 1.0),
+    (3, 64): ("<f8", 0.0, 1.0),
+}
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def iter_wav_blocks(
+    data_iter: Iterator[bytes], blocksize: int = OUTPUT_BLOCK_FRAMES
+) -> Iterator[np.ndarray]:
+    """Generator to decode a wav file arriving in pieces into blocks of float samples.
+
+    Only the header and one block are held in memory. Blocks are shaped like
+    those of sf.blocks, (frames,) for mono and (frames, channels) otherwise.
+    Sample formats other than 8/16/32-bit PCM and 32/64-bit float are decoded
+    once the whole file has arrived.
+
+    Args:
+      data_iter: Consecutive pieces of the wav file
+      blocksize: Number of frames per yielded block
+    """
+    data_iter = iter(data_iter)
+    pending = bytearray()
+
+    def fill(size):
+        # Read until pending holds at least size bytes, False at the end of the file
+        while len(pending) < size:
+            piece = next(data_iter, None)
+            if piece is None:
+                return False
+            pending.extend(piece)
+        return True
+
+    if not fill(12) or pending[:4] != b"RIFF" or pending[8:12] != b"WAVE":
+        raise ValueError("Response is not a wav file")
+    header_size = 12
+    sample_format = None
+    while True:
+        if not fill(header_size + 8):
+            raise ValueError("Response wav file has no data chunk")
+        chunk_id, chunk_size = struct.unpack_from("<4sI", pending, header_size)
+        header_size += 8
+        if chunk_id == b"data":
+            break
+        if not fill(header_size + chunk_size):
+            raise ValueError("Response wav file is truncated")
+        if chunk_id == b"fmt ":
+            tag, channels, _, _, block_align, bits = struct.unpack_from(
+                "<HHIIHH", pending, header_size
+            )
+            if tag == _WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                tag = struct.unpack_from("<H", pending, header_size + 24)[0]
+            sample_format = _WAV_SAMPLE_FORMATS.get((tag, bits))
+        header_size += chunk_size + (chunk_size & 1)
+
+    if sample_format is None:
+        # Uncommon sample formats are left to libsndfile
+        buffer = io.BytesIO(pending)
+        buffer.seek(0, io.SEEK_END)
+        for piece in data_iter:
+            buffer.write(piece)
+        buffer.seek(0)
+        yield from sf.blocks(buffer, blocksize=blocksize)
+        return
+
+    dtype, offset, scale = sample_format
+    # Streaming writers declare an unknown length as 0 or 0xFFFFFFFF
+    remaining = chunk_size if 0 < chunk_size < 0xFFFFFFFF else None
+    del pending[:header_size]
+    block_bytes = blocksize * block_align
+
+    def decode(data):
+        samples = (np.frombuffer(data, dtype).astype(np.float64) - offset) * scale
+        return samples if channels == 1 else samples.reshape(-1, channels)
+
+    while True:
+        more = fill(block_bytes)
+        if remaining is not None and len(pending) >= remaining:
+            del pending[remaining:]
+            more = False
+        if not more:
+            # Drop a trailing partial frame
+            del pending[len(pending) - len(pending) % block_align :]
+        while len(pending) >= block_bytes or (pending and not more):
+            block = bytes(pending[:block_bytes])
+            del pending[:block_bytes]
+            if remaining is not None:
+                remaining -= len(block)
+            yield decode(block)
+        if not more:
+            return
+
+
+def enhance_audio(
+    channel,
+    input_audio: np.ndarray,
+    model_type: str,
+    sample_rate: int,
+    streaming: bool,
+    request_metadata=None,
+    timeout=None,
+) -> Iterator[np.ndarray]:
+    """Function to enhance audio samples held in memory.
+
+    Args:
+      channel: gRPC channel for server client communication
+      input_audio: Input audio samples
+      model_type: Studio Voice model type to infer
+      sample_rate: Input audio sample rate
+      streaming: Enables grpc streaming mode
+      request_metadata: Credentials to process request
+      timeout: Deadline for the request in seconds
+
+    Returns:
+      Iterator over blocks of enhanced audio samples
+    """
+    stub = studiovoice_pb2_grpc.MaxineStudioVoiceStub(channel)
+    responses = stub.EnhanceAudio(
+        generate_request_for_audio(
+            input_audio=input_audio,
+            model_type=model_type,
+            sample_rate=sample_rate,
+            streaming=streaming,
+        ),
+        metadata=request_metadata,
+        timeout=timeout,
+    )
+    return iter_audio_from_response(responses, streaming=streaming)
+
+
 def parse_args():
     """
     Parse command-line arguments using argparse.
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test incremental decoding of the wav file returned in non-streaming mode
+"""
+
+import io
+import os
+import struct
+import sys
+
+import numpy as np
+import soundfile as sf
+
+# Add scripts and interfaces directories to Python path
+studio_voice_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+sys.path.insert(0, os.path.join(studio_voice_root, 'scripts'))
+sys.path.insert(0, os.path.join(studio_voice_root, 'interfaces', 'studio_voice'))
+from studio_voice import iter_wav_blocks
+
+def make_wav(subtype, channels, frames=10000):
+    samples = np.sin(np.arange(frames * channels).reshape(frames, channels) / 30) * 0.8
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, 48000, format='WAV', subtype=subtype)
+    return buffer.getvalue()
+
+def pieces(data, size):
+    """Split data like a response stream, ignoring frame boundaries"""
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+def test_response_decoding():
+    """Test that pieces of a wav file decode to the same blocks as soundfile"""
+    print("🔬 Testing Response Decoding")
+    print("=" * 50)
+
+    for subtype, channels in [('PCM_16', 1), ('PCM_16', 2), ('PCM_U8', 1), ('PCM_32', 1),
+                              ('FLOAT', 2), ('DOUBLE', 1), ('PCM_24', 2)]:
+        data = make_wav(subtype, channels)
+        expected = np.concatenate(list(sf.blocks(io.BytesIO(data), blocksize=1000)))
+        blocks = list(iter_wav_blocks(pieces(data, 777), blocksize=1000))
+        decoded = np.concatenate(blocks)
+        if decoded.shape != expected.shape or not np.array_equal(decoded, expected):
+            print(f"❌ {subtype} x{channels} decodes differently from soundfile")
+            return False
+        if any(len(block) > 1000 for block in blocks):
+            print(f"❌ {subtype} x{channels} yielded a block larger than the block size")
+            return False
+    print("✅ PCM and float wav files decode like soundfile, in bounded blocks")
+
+    # A streaming writer's header with an unknown data length
+    data = bytearray(make_wav('PCM_16', 1))
+    struct.pack_into('<I', data, 4, 0xFFFFFFFF)
+    struct.pack_into('<I', data, 40, 0xFFFFFFFF)
+    decoded = np.concatenate(list(iter_wav_blocks(pieces(bytes(data), 100))))
+    if len(decoded) != 10000:
+        print(f"❌ Unknown length decoded to {len(decoded)} frames")
+        return False
+    print("✅ Data of unknown length is decoded to the end of the stream")
+
+    try:
+        list(iter_wav_blocks(iter([b'not a wav file'])))
+        print("❌ Non-wav response was accepted")
+        return False
+    except ValueError:
+        print("✅ Non-wav responses are rejected")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_response_decoding() else 1)
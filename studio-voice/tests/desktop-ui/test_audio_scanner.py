@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test the shared audio library scanner and its cached index
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add desktop-ui directory to Python path
+desktop_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../desktop-ui'))
+sys.path.insert(0, desktop_ui_path)
+from audio_scanner import AUDIO_EXTENSIONS, AudioLibraryIndex, FolderScan, scan_audio_files
+
+def walk_audio_files(folder):
+    """Reference result using os.walk"""
+    return sorted(os.path.join(root, filename)
+                  for root, dirs, filenames in os.walk(folder)
+                  for filename in filenames
+                  if Path(filename).suffix.lower() in AUDIO_EXTENSIONS)
+
+def test_audio_scanner():
+    """Test that the scanner matches os.walk, pages results and revalidates its index"""
+    print("🔬 Testing Audio Library Scanner")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        library = os.path.join(temp_dir, "library")
+        for i in range(20):
+            folder = os.path.join(library, f"artist_{i % 4}", f"album_{i}")
+            os.makedirs(folder)
+            for j, extension in enumerate(['.wav', '.WAV', '.mp3', '.flac', '.m4a', '.txt']):
+                Path(folder, f"track_{j}{extension}").touch()
+        
+        expected = walk_audio_files(library)
+        
+        if scan_audio_files(library) != expected:
+            print("❌ Scanner result differs from os.walk")
+            return False
+        print(f"✅ Found the same {len(expected)} files as os.walk")
+        
+        index_path = os.path.join(temp_dir, "index.json")
+        if scan_audio_files(library, index=AudioLibraryIndex(index_path)) != expected:
+            print("❌ Indexed scan differs from os.walk")
+            return False
+        
+        if scan_audio_files(library, index=AudioLibraryIndex(index_path)) != expected:
+            print("❌ Scan from the cached index differs from os.walk")
+            return False
+        print("✅ Cached index reproduces the scan")
+        
+        # Adding a file changes its directory mtime, which invalidates the cached listing
+        new_file = os.path.join(library, "artist_0", "album_0", "new_track.wav")
+        Path(new_file).touch()
+        if new_file not in scan_audio_files(library, index=AudioLibraryIndex(index_path)):
+            print("❌ Cached index missed a new file")
+            return False
+        print("✅ Cached index picked up a new file")
+        
+        scan = FolderScan(library)
+        files, offset = [], 0
+        while True:
+            page = scan.page(offset, 7)
+            files.extend(page['files'])
+            offset = page['next_offset']
+            if page['complete']:
+                break
+        
+        if sorted(files) != walk_audio_files(library):
+            print("❌ Paged scan results are incomplete")
+            return False
+        print(f"✅ Paged scan returned all {len(files)} files")
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_audio_scanner() else 1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test the temp-file-free chunk iterator of the large file handler
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+# Add desktop-ui directory to Python path
+desktop_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../desktop-ui'))
+sys.path.insert(0, desktop_ui_path)
+from large_file_handler import LargeFileProcessor
+
+def test_chunk_iterator():
+    """Test that iterated chunks cover the input exactly without touching the temp dir"""
+    print("🔬 Testing Chunk Iterator")
+    print("=" * 50)
+    
+    processor = LargeFileProcessor()
+    
+    test_file = os.path.abspath(os.path.join('..', '..', 'assets', 'studio_voice_48k_input.wav'))
+    
+    if not os.path.exists(test_file):
+        print(f"❌ Test file not found: {test_file}")
+        return False
+    
+    original, sample_rate = sf.read(test_file)
+    temp_entries_before = set(os.listdir(tempfile.gettempdir()))
+    
+    chunks = list(processor.iter_audio_chunks(test_file, 3.0))
+    print(f"✅ Iterated {len(chunks)} chunks")
+    
+    new_temp_entries = set(os.listdir(tempfile.gettempdir())) - temp_entries_before
+    if any(entry.startswith("studio_voice_chunks_") for entry in new_temp_entries):
+        print("❌ Chunk iterator created a temp directory")
+        return False
+    
+    expected_start = 0
+    for chunk_index, start_frame, data in chunks:
+        if start_frame != expected_start:
+            print(f"❌ Chunk {chunk_index} starts at {start_frame}, expected {expected_start}")
+            return False
+        expected_start += len(data)
+    
+    merged = np.concatenate([data for _, _, data in chunks], axis=0)
+    if merged.shape != original.shape or not np.array_equal(merged, original):
+        print("❌ Iterated chunks do not match the original audio")
+        return False
+    
+    print(f"✅ Chunks cover all {len(original)} samples at {sample_rate}Hz")
+    
+    # Output offsets are planned without reading the input
+    chunk_ranges = processor.plan_chunk_ranges(len(original), sample_rate, 3.0)
+    if chunk_ranges != [(start_frame, len(data)) for _, start_frame, data in chunks]:
+        print(f"❌ Planned chunk ranges {chunk_ranges} do not match the iterated chunks")
+        return False
+    print("✅ Planned chunk ranges match the iterated chunks")
+    
+    # Chunks finished by an earlier run are skipped without being read
+    resumed = list(processor.iter_audio_chunks(test_file, 3.0, skip_chunks={0, 2}))
+    if [chunk_index for chunk_index, _, _ in resumed] != [i for i in range(len(chunks)) if i not in (0, 2)]:
+        print(f"❌ Unexpected chunks after skipping: {[chunk_index for chunk_index, _, _ in resumed]}")
+        return False
+    if not all(np.array_equal(data, chunks[chunk_index][2]) for chunk_index, _, data in resumed):
+        print("❌ Chunks after skipped ones do not match")
+        return False
+    print("✅ Skipped chunks are left out, the others are unchanged")
+    
+    # split_audio_file is built on the iterator and must produce the same chunks
+    chunk_files = processor.split_audio_file(test_file, 3.0)
+    try:
+        if len(chunk_files) != len(chunks):
+            print(f"❌ split_audio_file created {len(chunk_files)} chunks, expected {len(chunks)}")
+            return False
+        print(f"✅ split_audio_file created {len(chunk_files)} matching chunks")
+    finally:
+        processor.cleanup_chunks(chunk_files)
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_chunk_iterator() else 1)
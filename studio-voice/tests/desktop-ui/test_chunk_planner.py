@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test the exact wire-size chunk planner of the large file handler
+"""
+
+import io
+import os
+import sys
+
+import numpy as np
+import soundfile as sf
+
+# Add desktop-ui directory to Python path
+desktop_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../desktop-ui'))
+sys.path.insert(0, desktop_ui_path)
+from large_file_handler import LargeFileProcessor
+
+def request_size(frames, sample_rate, channels, streaming):
+    """Bytes actually sent for a chunk of the given length"""
+    if streaming:
+        return frames * channels * np.dtype(np.float32).itemsize
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros((frames, channels)), sample_rate, format='WAV')
+    return len(buffer.getvalue())
+
+def test_chunk_planner():
+    """Test that planned chunks are frame aligned and the largest that fit the limit"""
+    print("🔬 Testing Chunk Planner")
+    print("=" * 50)
+    
+    processor = LargeFileProcessor(5 * 1024 * 1024)
+    
+    for model_type, sample_rate in [("48k-hq", 48000), ("48k-ll", 48000), ("16k-hq", 16000)]:
+        frame_size = processor.model_frame_size(model_type, sample_rate)
+        
+        for streaming in (False, True):
+            for channels in (1, 2):
+                frames = processor.plan_chunk_frames(sample_rate, channels, model_type, streaming)
+                label = f"{model_type} streaming={streaming} channels={channels}"
+                
+                if frames % frame_size != 0:
+                    print(f"❌ {label}: {frames} samples not aligned to {frame_size}")
+                    return False
+                
+                if request_size(frames, sample_rate, channels, streaming) > processor.file_size_limit:
+                    print(f"❌ {label}: {frames} samples exceed the limit")
+                    return False
+                
+                if request_size(frames + frame_size, sample_rate, channels, streaming) <= processor.file_size_limit:
+                    print(f"❌ {label}: one more frame would still fit the limit")
+                    return False
+                
+                print(f"✅ {label}: {frames / sample_rate:.2f}s chunks")
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_chunk_planner() else 1)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test the bounded parallel chunk pool of the large file handler
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+# Add desktop-ui directory to Python path
+desktop_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../desktop-ui'))
+sys.path.insert(0, desktop_ui_path)
+from large_file_handler import LargeFileProcessor
+
+def test_parallel_chunks():
+    """Test that chunks run concurrently but results come back in chunk order"""
+    print("🔬 Testing Parallel Chunk Processing")
+    print("=" * 50)
+    
+    processor = LargeFileProcessor()
+    max_workers = 3
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, peak
+    
+    def process_chunk(chunk):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(random.uniform(0.01, 0.05))
+        with lock:
+            in_flight[0] -= 1
+        return chunk * 2
+    
+    results = list(processor.process_chunks(range(20), process_chunk, max_workers=max_workers))
+    
+    if results != [chunk * 2 for chunk in range(20)]:
+        print(f"❌ Results out of order: {results}")
+        return False
+    print(f"✅ {len(results)} results returned in chunk order")
+    
+    if in_flight[1] < 2 or in_flight[1] > max_workers:
+        print(f"❌ Peak concurrency {in_flight[1]}, expected 2..{max_workers}")
+        return False
+    print(f"✅ Peak concurrency {in_flight[1]} within {max_workers} workers")
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_parallel_chunks() else 1)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test out-of-order segment writes into a preallocated WAV file
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+# Add desktop-ui directory to Python path
+desktop_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../desktop-ui'))
+sys.path.insert(0, desktop_ui_path)
+from large_file_handler import PositionalWavWriter
+
+def test_positional_writer():
+    """Test that shuffled segments reassemble the original audio and failures leave no file"""
+    print("🔬 Testing Positional WAV Writer")
+    print("=" * 50)
+    
+    test_file = os.path.abspath(os.path.join('..', '..', 'assets', 'studio_voice_48k_input.wav'))
+    
+    if not os.path.exists(test_file):
+        print(f"❌ Test file not found: {test_file}")
+        return False
+    
+    original, sample_rate = sf.read(test_file)
+    segment_frames = 48000
+    segments = [(start, original[start:start + segment_frames])
+                for start in range(0, len(original), segment_frames)]
+    random.shuffle(segments)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = os.path.join(temp_dir, "positional.wav")
+        
+        with PositionalWavWriter(output_file, sample_rate, 1, len(original)) as writer:
+            for start, segment in segments:
+                # Padding past the segment must not spill into the next one
+                padded = np.concatenate([segment, np.ones(1000)])
+                writer.write_blocks(start, [padded[:500], padded[500:]], len(segment))
+            
+            if os.path.exists(output_file):
+                print("❌ Output appeared before finalize")
+                return False
+        
+        merged, _ = sf.read(output_file)
+        if merged.shape != original.shape or np.abs(merged - original).max() > 1e-4:
+            print("❌ Reassembled audio does not match the original")
+            return False
+        print(f"✅ {len(segments)} shuffled segments reassembled {len(original)} samples")
+        
+        failed_output = os.path.join(temp_dir, "failed.wav")
+        try:
+            with PositionalWavWriter(failed_output, sample_rate, 1, len(original)) as writer:
+                writer.write(0, original[:segment_frames])
+                raise RuntimeError("segment failed")
+        except RuntimeError:
+            pass
+        
+        if os.listdir(temp_dir) != ["positional.wav"]:
+            print(f"❌ Aborted write left files behind: {os.listdir(temp_dir)}")
+            return False
+        print("✅ Aborted write left no files behind")
+        
+        # Past 4GiB the sizes go in an RF64 ds64 chunk. The file is sparse, so only
+        # the samples written here take up disk space.
+        large_output = os.path.join(temp_dir, "large.wav")
+        large_frames = 2 ** 31 + segment_frames
+        with PositionalWavWriter(large_output, sample_rate, 1, large_frames) as writer:
+            writer.write(large_frames - segment_frames, original[:segment_frames])
+        
+        info = sf.info(large_output)
+        with sf.SoundFile(large_output) as large:
+            large.seek(large_frames - segment_frames)
+            tail = large.read(segment_frames)
+        os.remove(large_output)
+        if info.format != 'RF64' or info.frames != large_frames:
+            print(f"❌ Large output read as {info.format} with {info.frames} frames")
+            return False
+        if np.abs(tail - original[:segment_frames]).max() > 1e-4:
+            print("❌ Samples past 4GiB were not written correctly")
+            return False
+        print("✅ Outputs past 4GiB are written as RF64")
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_positional_writer() else 1)
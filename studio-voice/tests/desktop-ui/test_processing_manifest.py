@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test the processed-file manifest and resumable partial outputs
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import soundfile as sf
+
+# Add desktop-ui directory to Python path
+desktop_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../desktop-ui'))
+sys.path.insert(0, desktop_ui_path)
+from large_file_handler import PositionalWavWriter
+from processing_manifest import MANIFEST_FILENAME, ProcessingManifest
+
+def test_processing_manifest():
+    """Test skip detection, change detection, chunk records and writer resume"""
+    print("🔬 Testing Processing Manifest")
+    print("=" * 50)
+
+    test_file = os.path.abspath(os.path.join('..', '..', 'assets', 'studio_voice_48k_input.wav'))
+
+    if not os.path.exists(test_file):
+        print(f"❌ Test file not found: {test_file}")
+        return False
+
+    params = {'model_type': '48k-hq', 'streaming': False}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, "input.wav")
+        output_file = os.path.join(temp_dir, "enhanced_input.wav")
+        shutil.copy(test_file, input_file)
+        shutil.copy(test_file, output_file)
+
+        manifest = ProcessingManifest.for_tree([input_file])
+        if manifest.manifest_path != os.path.join(temp_dir, MANIFEST_FILENAME):
+            print(f"❌ Unexpected manifest location: {manifest.manifest_path}")
+            return False
+
+        if manifest.is_processed(input_file, params):
+            print("❌ New file reported as processed")
+            return False
+
+        manifest.mark_processed(input_file, params, output_file)
+        manifest.close()
+
+        # Reopen to check the record survives
+        manifest = ProcessingManifest.for_tree([input_file])
+        if not manifest.is_processed(input_file, params):
+            print("❌ Processed file not skipped after reopening the manifest")
+            return False
+        if manifest.is_processed(input_file, {'model_type': '48k-ll', 'streaming': True}):
+            print("❌ File skipped for different parameters")
+            return False
+        print("✅ Processed file skipped only for the same parameters")
+
+        # A touched but identical file is still recognised by its content hash
+        stat = os.stat(input_file)
+        os.utime(input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        if not manifest.is_processed(input_file, params):
+            print("❌ Touched but unchanged file not recognised")
+            return False
+
+        with open(input_file, 'r+b') as f:
+            f.seek(-2, os.SEEK_END)
+            f.write(b'\x01\x02')
+        if manifest.is_processed(input_file, params):
+            print("❌ Modified file reported as processed")
+            return False
+        print("✅ Content changes detected, timestamp-only changes ignored")
+
+        manifest.mark_processed(input_file, params, output_file)
+        os.remove(output_file)
+        if manifest.is_processed(input_file, params):
+            print("❌ File skipped although its output is missing")
+            return False
+        print("✅ Missing output forces reprocessing")
+
+        # Chunk records and a kept partial output resume an interrupted large file
+        original, sample_rate = sf.read(test_file)
+        half = len(original) // 2
+
+        writer = PositionalWavWriter(output_file, sample_rate, 1, len(original), resume=True)
+        writer.write(0, original[:half])
+        manifest.mark_chunk_completed(input_file, params, 0)
+        writer.close()
+        manifest.close()
+
+        manifest = ProcessingManifest.for_tree([input_file])
+        if manifest.completed_chunks(input_file, params) != {0}:
+            print("❌ Completed chunks not recorded")
+            return False
+
+        with PositionalWavWriter(output_file, sample_rate, 1, len(original), resume=True) as writer:
+            if not writer.resumed:
+                print("❌ Partial output not resumed")
+                return False
+            writer.write(half, original[half:])
+
+        resumed, _ = sf.read(output_file)
+        if resumed.shape != original.shape or np.abs(resumed - original).max() > 1e-4:
+            print("❌ Resumed output does not match the original")
+            return False
+
+        manifest.mark_processed(input_file, params, output_file)
+        if manifest.completed_chunks(input_file, params):
+            print("❌ Chunk records kept after the file completed")
+            return False
+        manifest.close()
+        print("✅ Interrupted large file resumed from its completed chunks")
+
+        # Windows paths on different drives have no common path, stand in two directories for drives
+        drive_c, drive_d = os.path.join(temp_dir, "c"), os.path.join(temp_dir, "d")
+        os.makedirs(os.path.join(drive_c, "music"))
+        os.makedirs(drive_d)
+        file_c = os.path.join(drive_c, "music", "input.wav")
+        file_d = os.path.join(drive_d, "input.wav")
+        shutil.copy(test_file, file_c)
+        shutil.copy(test_file, file_d)
+        commonpath = os.path.commonpath
+
+        def splitdrive(path):
+            for drive in (drive_c, drive_d):
+                if path.startswith(drive):
+                    return drive, path[len(drive):]
+            return "", path
+
+        def drive_commonpath(paths):
+            if len({splitdrive(path)[0] for path in paths}) > 1:
+                raise ValueError("Paths don't have the same drive")
+            return commonpath(paths)
+
+        with mock.patch("os.path.splitdrive", splitdrive), mock.patch("os.path.commonpath", drive_commonpath):
+            manifest = ProcessingManifest.for_tree([file_c, file_d])
+            manifest.mark_processed(file_c, params)
+            processed = manifest.is_processed(file_c, params), manifest.is_processed(file_d, params)
+            manifest.close()
+
+        if not all(os.path.exists(os.path.join(os.path.dirname(path), MANIFEST_FILENAME))
+                   for path in (file_c, file_d)):
+            print("❌ No manifest on each drive")
+            return False
+        if processed != (True, False):
+            print(f"❌ Drives' records mixed up: {processed}")
+            return False
+        print("✅ Files on different drives are recorded in each drive's manifest")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_processing_manifest() else 1)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test the block-by-block streaming merge of the large file handler
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+# Add desktop-ui directory to Python path
+desktop_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../desktop-ui'))
+sys.path.insert(0, desktop_ui_path)
+from large_file_handler import LargeFileProcessor
+
+def test_streaming_merge():
+    """Test that chunk streams and chunk files merge into the original audio"""
+    print("🔬 Testing Streaming Merge")
+    print("=" * 50)
+    
+    processor = LargeFileProcessor()
+    
+    test_file = os.path.abspath(os.path.join('..', '..', 'assets', 'studio_voice_48k_input.wav'))
+    
+    if not os.path.exists(test_file):
+        print(f"❌ Test file not found: {test_file}")
+        return False
+    
+    original, sample_rate = sf.read(test_file)
+    
+    def chunk_streams():
+        # Yield every chunk as several small blocks, like a response stream
+        for _, _, data in processor.iter_audio_chunks(test_file, 3.0):
+            yield (data[i:i + 4800] for i in range(0, len(data), 4800))
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stream_output = os.path.join(temp_dir, "merged_stream.wav")
+        if not processor.merge_audio_streams(chunk_streams(), stream_output, sample_rate):
+            print("❌ merge_audio_streams failed")
+            return False
+        
+        merged, _ = sf.read(stream_output)
+        if merged.shape != original.shape or np.abs(merged - original).max() > 1e-4:
+            print("❌ Stream merge does not match the original audio")
+            return False
+        print(f"✅ Stream merge matches all {len(original)} samples")
+        
+        chunk_files = processor.split_audio_file(test_file, 3.0)
+        try:
+            file_output = os.path.join(temp_dir, "merged_files.wav")
+            if not processor.merge_audio_files(chunk_files, file_output):
+                print("❌ merge_audio_files failed")
+                return False
+            
+            merged, _ = sf.read(file_output)
+            if merged.shape != original.shape or np.abs(merged - original).max() > 1e-4:
+                print("❌ File merge does not match the original audio")
+                return False
+            print(f"✅ File merge of {len(chunk_files)} chunks matches the original")
+        finally:
+            processor.cleanup_chunks(chunk_files)
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_streaming_merge() else 1)
@@ -0,0 +1 @@
+"""Enhanced CLI tests - focuses on concurrent batch processing and progress reporting."""
\ No newline at end of file
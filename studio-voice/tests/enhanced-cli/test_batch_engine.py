@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test the enhanced CLI batch engine bookkeeping without a running server
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+# Add enhanced-cli directory to Python path
+enhanced_cli_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../enhanced-cli'))
+sys.path.insert(0, enhanced_cli_path)
+from batch_engine import BatchEngine
+
+def test_batch_engine():
+    """Test skipped and failed files are counted and shown in the live table"""
+    print("🔬 Testing CLI Batch Engine")
+    print("=" * 50)
+    
+    assets = os.path.abspath(os.path.join('..', '..', 'assets'))
+    input_48k = os.path.join(assets, 'studio_voice_48k_input.wav')
+    input_16k = os.path.join(assets, 'studio_voice_16k_input.wav')
+    
+    for test_file in (input_48k, input_16k):
+        if not os.path.exists(test_file):
+            print(f"❌ Test file not found: {test_file}")
+            return False
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        settings = {
+            'model_type': '48k-hq',
+            'streaming': False,
+            # Nothing listens here, the files below never reach the server
+            'server': '127.0.0.1:1',
+            'output_dir': os.path.join(temp_dir, 'out')
+        }
+        engine = BatchEngine(settings, max_workers=2)
+        
+        # Pretend the 48k file was enhanced by an earlier run
+        output_file = os.path.join(settings['output_dir'], 'enhanced_studio_voice_48k_input.wav')
+        shutil.copy(input_48k, output_file)
+        engine.manifest.mark_processed(input_48k, engine.params, output_file)
+        
+        try:
+            jobs = [engine.submit(path).result(timeout=30) for path in (input_48k, input_16k)]
+        finally:
+            engine.close()
+        
+        statuses = [job.status for job in jobs]
+        if statuses != ['skipped', 'failed']:
+            print(f"❌ Unexpected statuses: {statuses}")
+            return False
+        if 'Sample rate mismatch' not in (jobs[1].error or ''):
+            print(f"❌ Unexpected error: {jobs[1].error}")
+            return False
+        if (engine.submitted, engine.successful, engine.failed, engine.skipped) != (2, 0, 1, 1):
+            print("❌ Batch counters are wrong")
+            return False
+        print("✅ Already enhanced file skipped, invalid file failed before any request")
+        
+        table = engine.render()
+        if table.row_count != 1 or engine.real_time_factor() != 0.0:
+            print(f"❌ Live table shows {table.row_count} rows")
+            return False
+        print("✅ Live table lists finished files")
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_batch_engine() else 1)
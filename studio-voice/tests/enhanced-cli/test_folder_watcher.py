@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the watch-folder daemon's detection of completely written audio files
+"""
+
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+# Add enhanced-cli directory to Python path
+enhanced_cli_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../enhanced-cli'))
+sys.path.insert(0, enhanced_cli_path)
+from folder_watcher import AudioLibraryIndex, FolderWatcher
+
+def collect(watcher, stop_event, results):
+    for path in watcher.watch(stop_event):
+        results.put((path, time.monotonic()))
+
+def check_watcher(use_inotify):
+    """Files are reported once after they stop changing, excluded folders are ignored"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        library = os.path.join(temp_dir, 'library')
+        output_dir = os.path.join(library, 'out')
+        os.makedirs(output_dir)
+        with open(os.path.join(library, 'existing.wav'), 'wb') as f:
+            f.write(b'\0' * 1024)
+        
+        watcher = FolderWatcher(library, settle_seconds=0.5, poll_interval=0.2,
+                                exclude=[output_dir], use_inotify=use_inotify,
+                                index=AudioLibraryIndex(os.path.join(temp_dir, 'index.json')))
+        print(f"   Mode: {watcher.mode}")
+        if use_inotify and watcher.mode != 'inotify':
+            print(f"   ⚠️ inotify unavailable ({watcher.fallback_reason}), checked polling only")
+        
+        stop_event = threading.Event()
+        results = queue.Queue()
+        thread = threading.Thread(target=collect, args=(watcher, stop_event, results), daemon=True)
+        thread.start()
+        
+        time.sleep(0.3)
+        os.makedirs(os.path.join(library, 'day1'))
+        growing = os.path.join(library, 'day1', 'recording.wav')
+        with open(growing, 'wb') as f:
+            for _ in range(6):
+                f.write(b'\1' * 4096)
+                f.flush()
+                time.sleep(0.2)
+        written_at = time.monotonic()
+        
+        with open(os.path.join(output_dir, 'enhanced_existing.wav'), 'wb') as f:
+            f.write(b'\0' * 1024)
+        with open(os.path.join(library, 'notes.txt'), 'w') as f:
+            f.write('not audio')
+        
+        time.sleep(2.0)
+        stop_event.set()
+        thread.join(timeout=10)
+        
+        found = {}
+        while not results.empty():
+            path, reported_at = results.get()
+            found.setdefault(os.path.relpath(path, library), []).append(reported_at)
+        
+        expected = sorted(['existing.wav', os.path.join('day1', 'recording.wav')])
+        if sorted(found) != expected or any(len(times) != 1 for times in found.values()):
+            print(f"❌ Unexpected files reported: {found}")
+            return False
+        if found[os.path.join('day1', 'recording.wav')][0] < written_at:
+            print("❌ Growing file reported before it was completely written")
+            return False
+        print(f"✅ {watcher.mode}: files reported once after they stopped changing, output ignored")
+        return True
+
+def test_folder_watcher():
+    """Test both the inotify and the polling sources"""
+    print("🔬 Testing Folder Watcher")
+    print("=" * 50)
+    
+    return check_watcher(use_inotify=True) and check_watcher(use_inotify=False)
+
+if __name__ == "__main__":
+    sys.exit(0 if test_folder_watcher() else 1)
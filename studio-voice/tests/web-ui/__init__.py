@@ -0,0 +1 @@
+"""Web UI tests - focuses on job management and request handling."""
\ No newline at end of file
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test resumable chunked uploads for the web UI
+"""
+
+import io
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+# Add web-ui directory to Python path
+web_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../web-ui'))
+sys.path.insert(0, web_ui_path)
+from chunked_upload import ChunkedUploadStore, UploadError
+
+def make_wav_bytes(seconds: float) -> bytes:
+    buffer = io.BytesIO()
+    samples = (np.sin(np.arange(int(48000 * seconds)) / 20) * 8000).astype(np.int16)
+    sf.write(buffer, samples, 48000, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+def expect_error(status, function, *args):
+    try:
+        function(*args)
+    except UploadError as e:
+        return e.status == status
+    return False
+
+def test_chunked_upload():
+    """Test parallel parts, acknowledgements, resuming, header rejection and completion"""
+    print("🔬 Testing Chunked Uploads")
+    print("=" * 50)
+
+    data = make_wav_bytes(3)
+    part_size = 64 * 1024
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        folder = os.path.join(temp_dir, 'incoming')
+        store = ChunkedUploadStore(folder, part_size=part_size, max_size=10 * 1024 * 1024)
+
+        if not expect_error(413, store.create, 'huge.wav', 20 * 1024 * 1024):
+            print("❌ Oversized upload was accepted")
+            return False
+
+        upload = store.create('take.wav', len(data), {'model_type': '48k-hq'})
+        upload_id = upload.upload_id
+
+        # The first part validates the header
+        ack = store.write_part(upload_id, 0, io.BytesIO(data[:part_size]), part_size)
+        if not ack.header_checked or ack.offset != part_size or ack.audio_info['samplerate'] != 48000:
+            print(f"❌ First part not acknowledged: {ack.to_dict()}")
+            return False
+        print("✅ First part acknowledged and header validated")
+
+        # A dropped connection keeps what arrived, the ack tells the client where to resume
+        offsets = list(range(part_size, len(data), part_size))
+        last = offsets.pop()
+        dropped = data[last:last + 100]
+        store.write_part(upload_id, last, io.BytesIO(dropped), len(data) - last)
+        if [last, last + 100] not in upload.ranges:
+            print(f"❌ Partial part not recorded: {upload.ranges}")
+            return False
+
+        # Remaining parts in parallel and out of order
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda offset: store.write_part(
+                upload_id, offset, io.BytesIO(data[offset:offset + part_size]),
+                len(data[offset:offset + part_size])), reversed(offsets)))
+        if upload.complete or upload.missing() != [[last + 100, len(data)]]:
+            print(f"❌ Unexpected missing ranges: {upload.missing()}")
+            return False
+        print("✅ Parallel parts and partial parts tracked as byte ranges")
+
+        if not expect_error(409, store.finish, upload_id, os.path.join(temp_dir, 'early.wav')):
+            print("❌ Incomplete upload was finished")
+            return False
+        if not expect_error(416, store.write_part, upload_id, len(data) - 10, io.BytesIO(b'x' * 20), 20):
+            print("❌ Part past the end was accepted")
+            return False
+
+        # A restarted web UI picks the upload up from its sidecar file
+        store = ChunkedUploadStore(folder, part_size=part_size)
+        resumed = store.get(upload_id)
+        if resumed.missing() != [[last + 100, len(data)]] or resumed.params != {'model_type': '48k-hq'}:
+            print(f"❌ Upload not resumed after restart: {resumed.to_dict()}")
+            return False
+        store.write_part(upload_id, last + 100, io.BytesIO(data[last + 100:]), len(data) - last - 100)
+
+        destination = os.path.join(temp_dir, 'take.wav')
+        store.finish(upload_id, destination)
+        with open(destination, 'rb') as f:
+            if f.read() != data:
+                print("❌ Finished file differs from the upload")
+                return False
+        if os.listdir(folder) or not expect_error(404, store.get, upload_id):
+            print("❌ Upload session left behind")
+            return False
+        print("✅ Resumed after restart and completed byte for byte")
+
+        # Files that are not audio are rejected after the first part
+        junk = store.create('notes.wav', 10 * part_size)
+        if not expect_error(415, store.write_part, junk.upload_id, 0,
+                            io.BytesIO(b'not audio' * 10000), part_size):
+            print("❌ Non-audio upload was not rejected")
+            return False
+        if os.listdir(folder):
+            print("❌ Rejected upload was not deleted")
+            return False
+        print("✅ Bad files rejected on the first part")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_chunked_upload() else 1)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test job event rooms, progress coalescing and delta updates for the web UI
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add web-ui directory to Python path
+web_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../web-ui'))
+sys.path.insert(0, web_ui_path)
+from job_events import JobEventHub, job_room, session_room
+
+class RecordingSocketIO:
+    """Stands in for Flask-SocketIO and records what would be emitted"""
+
+    def __init__(self):
+        self.emitted = []
+        self.tasks = 0
+
+    def emit(self, event, data, to=None):
+        self.emitted.append((event, data, to))
+
+    def start_background_task(self, target):
+        # The test flushes by hand instead of running the flusher loop
+        self.tasks += 1
+        return target
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+class Job:
+    def __init__(self, job_id, client_id=None):
+        self.job_id = job_id
+        self.client_id = client_id
+        self.status = 'processing'
+
+    def to_dict(self):
+        return {'job_id': self.job_id, 'status': self.status}
+
+def test_job_events():
+    """Test room targeting, coalescing, deltas and waiting for changes"""
+    print("🔬 Testing Job Events")
+    print("=" * 50)
+
+    socketio = RecordingSocketIO()
+    hub = JobEventHub(socketio)
+    job = Job('job-1', client_id='alice')
+
+    hub.publish_status(job)
+    event, data, rooms = socketio.emitted[-1]
+    if event != 'job_status_update' or rooms != [job_room('job-1'), session_room('alice')]:
+        print(f"❌ Status update sent to {rooms}")
+        return False
+    print("✅ Status updates go to the job's room and its session's room")
+
+    # Many progress updates between flushes become one event with the latest values
+    transfer = {'bytes_sent': 0, 'total_bytes': 1000, 'stalled': False}
+    for sent in range(0, 1000, 100):
+        hub.publish_progress(job, {'progress': sent // 10, 'message': 'Processing...',
+                                   'transfer': dict(transfer, bytes_sent=sent)})
+    before = len(socketio.emitted)
+    hub.flush()
+    updates = socketio.emitted[before:]
+    if len(updates) != 1 or updates[0][1]['progress'] != 90 or socketio.tasks != 1:
+        print(f"❌ Progress not coalesced: {updates}")
+        return False
+    print("✅ Progress is coalesced to the latest value per interval")
+
+    hub.publish_progress(job, {'progress': 95, 'message': 'Processing...',
+                               'transfer': dict(transfer, bytes_sent=1000)})
+    hub.flush()
+    _, update, _ = socketio.emitted[-1]
+    if update != {'job_id': 'job-1', 'progress': 95, 'transfer': {'bytes_sent': 1000}}:
+        print(f"❌ Unexpected delta: {update}")
+        return False
+
+    # Nothing changed, so nothing is sent
+    before = len(socketio.emitted)
+    hub.publish_progress(job, {'progress': 95, 'message': 'Processing...',
+                               'transfer': dict(transfer, bytes_sent=1000)})
+    hub.flush()
+    if len(socketio.emitted) != before:
+        print("❌ Unchanged progress was sent")
+        return False
+    print("✅ Only changed fields are sent")
+
+    # A status change resets the baseline, so the next progress is sent in full
+    hub.publish_status(job)
+    hub.publish_progress(job, {'progress': 95, 'message': 'Processing...'})
+    hub.flush()
+    if socketio.emitted[-1][1] != {'job_id': 'job-1', 'progress': 95, 'message': 'Processing...'}:
+        print(f"❌ Progress after a status change was not complete: {socketio.emitted[-1][1]}")
+        return False
+
+    # Jobs without a session only go to their own room
+    hub.publish_status(Job('job-2'))
+    if socketio.emitted[-1][2] != [job_room('job-2')]:
+        print(f"❌ Sessionless job sent to {socketio.emitted[-1][2]}")
+        return False
+    print("✅ Status changes reset the delta baseline")
+
+    # Long-polling clients wake up on the next change
+    etag = hub.etag
+    if hub.wait_for_change(etag, 0.05) != etag:
+        print("❌ ETag changed without an event")
+        return False
+    threading.Timer(0.1, hub.publish_status, args=(job,)).start()
+    started = time.monotonic()
+    new_etag = hub.wait_for_change(etag, 5)
+    if new_etag == etag or time.monotonic() - started > 2:
+        print("❌ Waiting client was not woken by a change")
+        return False
+    print("✅ Waiting clients wake up when the ETag changes")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_job_events() else 1)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test the web UI job scheduler and its use by the job executor
+"""
+
+import asyncio
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+# Add web-ui directory to Python path
+web_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../web-ui'))
+sys.path.insert(0, web_ui_path)
+from job_executor import AsyncJobExecutor
+from job_scheduler import (LANE_BATCH, LANE_INTERACTIVE, FairShareScheduler, SchedulingQueue,
+                           choose_lane, estimate_job_seconds)
+
+class FakeJob:
+    def __init__(self, job_id, expected_seconds, client_id="client-a", lane=None,
+                 server_target="127.0.0.1:8001"):
+        self.job_id = job_id
+        self.expected_seconds = expected_seconds
+        self.client_id = client_id
+        self.lane = lane or choose_lane(expected_seconds)
+        self.server_target = server_target
+
+def drain(scheduler, can_start=None):
+    order = []
+    while True:
+        job = scheduler.pop(can_start)
+        if job is None:
+            return order
+        order.append(job.job_id)
+
+def test_job_scheduler():
+    """Test cost estimates, shortest-first with aging, fair share, lanes and the executor order"""
+    print("🔬 Testing Job Scheduler")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        wav_path = os.path.join(temp_dir, 'clip.wav')
+        sf.write(wav_path, np.zeros(96000, dtype=np.int16), 48000, subtype='PCM_16')
+        estimates = (estimate_job_seconds(wav_path, '48k-hq'),
+                     estimate_job_seconds(wav_path, '16k-hq'),
+                     estimate_job_seconds(wav_path, '48k-ll', streaming=True))
+        if [round(value, 3) for value in estimates] != [2.0, 1.0, 3.6]:
+            print(f"❌ Unexpected cost estimates: {estimates}")
+            return False
+    if choose_lane(5) != LANE_INTERACTIVE or choose_lane(600) != LANE_BATCH or choose_lane(5, LANE_BATCH) != LANE_BATCH:
+        print("❌ Wrong lane choice")
+        return False
+    print("✅ Cost comes from the header duration and the model, short jobs are interactive")
+
+    # Shortest expected job first within a client
+    scheduler = FairShareScheduler()
+    for job_id, seconds in [('long', 50), ('short', 5), ('medium', 20)]:
+        scheduler.add(FakeJob(job_id, seconds, lane=LANE_INTERACTIVE), now=0)
+    if drain(scheduler) != ['short', 'medium', 'long']:
+        print("❌ Jobs are not shortest first")
+        return False
+
+    # A job that has waited long enough overtakes shorter newcomers
+    scheduler.add(FakeJob('old', 50, lane=LANE_INTERACTIVE), now=0)
+    scheduler.add(FakeJob('new', 5, lane=LANE_INTERACTIVE), now=200)
+    if drain(scheduler) != ['old', 'new']:
+        print("❌ Aging did not promote the waiting job")
+        return False
+    print("✅ Shortest expected first, with aging")
+
+    # One client's backlog does not hold up another client
+    scheduler = FairShareScheduler()
+    for i in range(4):
+        scheduler.add(FakeJob(f"a{i}", 10, "client-a"), now=0)
+    scheduler.add(FakeJob("b0", 10, "client-b"), now=1)
+    order = drain(scheduler)
+    if order.index('b0') != 1:
+        print(f"❌ Second client waited behind the first: {order}")
+        return False
+    print("✅ Clients get a fair share")
+
+    # Interactive jobs get most of the starts, batch jobs are not starved
+    scheduler = FairShareScheduler()
+    for i in range(5):
+        scheduler.add(FakeJob(f"batch{i}", 600), now=0)
+    for i in range(8):
+        scheduler.add(FakeJob(f"clip{i}", 5), now=1)
+    first_five = drain(scheduler)[:5]
+    if sum(job_id.startswith('clip') for job_id in first_five) != 4:
+        print(f"❌ Lane weights not applied: {first_five}")
+        return False
+    print("✅ Interactive and batch lanes share starts 4:1")
+
+    # Jobs whose target is busy are passed over, removed jobs never come out
+    scheduler = FairShareScheduler()
+    scheduler.add(FakeJob('busy-target', 1, server_target='busy:8001'), now=0)
+    scheduler.add(FakeJob('free-target', 30), now=0)
+    scheduler.add(FakeJob('cancelled', 2), now=0)
+    scheduler.remove('cancelled')
+    if drain(scheduler, lambda job: job.server_target != 'busy:8001') != ['free-target'] or len(scheduler) != 1:
+        print("❌ Busy target or removal not respected")
+        return False
+
+    job_queue = SchedulingQueue()
+    try:
+        job_queue.get(timeout=0.01)
+        print("❌ Empty queue returned a job")
+        return False
+    except queue.Empty:
+        pass
+    job_queue.put(FakeJob('queued', 1))
+    if job_queue.qsize() != 1 or job_queue.get(timeout=1).job_id != 'queued' or not job_queue.empty():
+        print("❌ SchedulingQueue does not behave like a queue")
+        return False
+    print("✅ Busy targets, cancellation and the blocking queue")
+
+    # The executor starts waiting jobs in scheduler order, not submission order
+    started = []
+    release = threading.Event()
+
+    async def run_job(job, channel):
+        started.append(job.job_id)
+        if job.job_id == 'blocker':
+            await asyncio.to_thread(release.wait, 5)
+
+    executor = AsyncJobExecutor(run_job, default_target_limit=1)
+    executor.start()
+    try:
+        executor.submit(FakeJob('blocker', 1))
+        deadline = time.monotonic() + 5
+        while executor.running == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for job_id, seconds in [('upload-100mb', 50), ('clip-1', 5), ('clip-2', 3)]:
+            executor.submit(FakeJob(job_id, seconds, lane=LANE_INTERACTIVE))
+        executor.submit(FakeJob('clip-cancelled', 1, lane=LANE_INTERACTIVE))
+        executor.cancel('clip-cancelled')
+        release.set()
+
+        deadline = time.monotonic() + 5
+        while (executor.running or executor.queued) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        executor.stop(timeout=5)
+
+    if started != ['blocker', 'clip-2', 'clip-1', 'upload-100mb'] or executor.queued != 0:
+        print(f"❌ Executor start order was {started}, {executor.queued} still queued")
+        return False
+    print("✅ Executor starts short clips ahead of a large upload")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_job_scheduler() else 1)
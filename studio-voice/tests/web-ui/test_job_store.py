@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the SQLite-backed web UI job store
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Add web-ui directory to Python path
+web_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../web-ui'))
+sys.path.insert(0, web_ui_path)
+from job_store import JobStore
+
+class FakeJob:
+    def __init__(self, job_id, status="queued", created_at=None):
+        self.job_id = job_id
+        self.status = status
+        self.progress = 0
+        self.created_at = created_at or datetime.now()
+        self.started_at = None
+        self.completed_at = None
+    
+    def finish(self, status="completed", completed_at=None):
+        self.status = status
+        self.progress = 100
+        self.completed_at = completed_at or datetime.now()
+    
+    def to_dict(self):
+        return {'job_id': self.job_id, 'status': self.status}
+
+def test_job_store():
+    """Test lookups, history, restart recovery, the hot cache and retention"""
+    print("🔬 Testing Job Store")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'jobs.sqlite')
+        store = JobStore(db_path, FakeJob, cache_size=2, retention_days=30, max_history=3)
+        
+        jobs = [FakeJob(f"job-{i}") for i in range(6)]
+        jobs[5]._audio_data = b'RIFF'
+        for job in jobs:
+            store.add(job)
+        
+        for job in jobs[:4]:
+            job.finish()
+            store.save(job)
+        jobs[4].status = "processing"
+        store.save(jobs[4])
+        
+        if [job.job_id for job in store.active_jobs()] != ['job-4', 'job-5']:
+            print("❌ Active jobs are wrong")
+            return False
+        
+        history = store.history(2)
+        if [job['job_id'] for job in history] != ['job-2', 'job-3'] or store.history(2) is not history:
+            print(f"❌ History is wrong or was rebuilt: {history}")
+            return False
+        print("✅ Active jobs and cached history")
+        
+        # job-0 dropped out of the two-entry hot cache and is read from SQLite
+        loaded = store.get('job-0')
+        if loaded is None or loaded.status != 'completed' or not isinstance(loaded.completed_at, datetime):
+            print("❌ Evicted job not loaded from the database")
+            return False
+        if store.get('missing') is not None:
+            print("❌ Unknown job found")
+            return False
+        print("✅ Lookups by job_id hit memory first, then the database")
+        store.close()
+        
+        # A restart brings back the queued and interrupted jobs as queued
+        store = JobStore(db_path, FakeJob, max_history=3)
+        restored = store.restore_unfinished()
+        if [(job.job_id, job.status) for job in restored] != [('job-4', 'queued'), ('job-5', 'queued')]:
+            print(f"❌ Unexpected restored jobs: {[(job.job_id, job.status) for job in restored]}")
+            return False
+        if hasattr(restored[1], '_audio_data'):
+            print("❌ Transient attribute was persisted")
+            return False
+        print("✅ Queued and interrupted jobs survive a restart")
+        
+        # Retention: at most max_history finished jobs, none older than retention_days
+        old = FakeJob("job-old", created_at=datetime.now() - timedelta(days=90))
+        old.finish(completed_at=datetime.now() - timedelta(days=90))
+        store.save(old)
+        store.purge()
+        
+        remaining = [job['job_id'] for job in store.history(10)]
+        if remaining != ['job-1', 'job-2', 'job-3']:
+            print(f"❌ Retention kept {remaining}")
+            return False
+        if len(store.active_jobs()) != 2:
+            print("❌ Retention removed unfinished jobs")
+            return False
+        store.close()
+        print("✅ Retention keeps the newest finished jobs and every unfinished one")
+    
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_job_store() else 1)
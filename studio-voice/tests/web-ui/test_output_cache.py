@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory output cache used for small web UI jobs
+"""
+
+import os
+import sys
+
+# Add web-ui directory to Python path
+web_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../web-ui'))
+sys.path.insert(0, web_ui_path)
+from output_cache import OutputCache
+
+def test_output_cache():
+    """Test lookups, the byte budget and least recently used eviction"""
+    print("🔬 Testing Output Cache")
+    print("=" * 50)
+
+    cache = OutputCache(max_bytes=100)
+    cache.put('a', b'a' * 40)
+    cache.put('b', b'b' * 40)
+    if cache.get('a') != b'a' * 40 or cache.get('missing') is not None:
+        print("❌ Lookup failed")
+        return False
+    print("✅ Cached outputs are returned")
+
+    # 'a' was used last, so adding 'c' evicts 'b'
+    cache.put('c', b'c' * 40)
+    if cache.get('b') is not None or cache.get('a') is None or cache.size != 80:
+        print(f"❌ Wrong eviction, size {cache.size}")
+        return False
+
+    cache.put('huge', b'x' * 200)
+    cache.put('a', b'A' * 10)
+    cache.discard('c')
+    if cache.get('huge') is not None or cache.get('a') != b'A' * 10 or cache.size != 10:
+        print(f"❌ Budget not enforced, size {cache.size}")
+        return False
+    print("✅ Least recently used outputs are evicted within the byte budget")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_output_cache() else 1)
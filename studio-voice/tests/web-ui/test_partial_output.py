@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test reading and following web UI outputs while they are being written
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+# Add web-ui directory to Python path
+web_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../web-ui'))
+sys.path.insert(0, web_ui_path)
+from partial_output import PartialOutput, PartialWavWriter, WAV_HEADER_SIZE
+
+def test_partial_output():
+    """Test the readable prefix, following a growing file, moving it into place and failures"""
+    print("🔬 Testing Partial Output")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Chunks finishing out of order only become readable once the gap before them is filled
+        path = os.path.join(temp_dir, 'large.wav.partial')
+        data = os.urandom(3000)
+        with open(path, 'wb') as f:
+            f.write(data)
+        partial = PartialOutput()
+        partial.begin(path, total_size=3000)
+        partial.mark(2000, 3000)
+        partial.mark(0, 1000)
+        if partial.ready != 1000 or partial.read(500, 2000) != data[500:1000]:
+            print(f"❌ Wrong readable prefix: {partial.ready}")
+            return False
+        partial.mark(1000, 2000)
+        if partial.ready != 3000:
+            print(f"❌ Prefix did not close the gap: {partial.ready}")
+            return False
+        print("✅ Out of order chunks are readable up to the first gap")
+
+        # A finished file moved into place is found by readers at its new path
+        final_path = os.path.join(temp_dir, 'large.wav')
+        os.replace(path, final_path)
+        threading.Timer(0.1, partial.finish, args=(final_path, 3000)).start()
+        if partial.read(0, 3000) != data or not partial.done:
+            print("❌ Read failed while the output was moved")
+            return False
+        print("✅ Readers follow the output to its final path")
+
+        # A follower receives samples as they are written and ends with the job
+        path = os.path.join(temp_dir, 'streamed.wav')
+        partial = PartialOutput()
+        writer = PartialWavWriter(path, 48000, 1, expected_frames=48000, partial=partial)
+        blocks = [np.sin(np.arange(i * 4800, (i + 1) * 4800) / 20) * 0.5 for i in range(12)]
+
+        def write_blocks():
+            for block in blocks:
+                writer.write(block)
+                time.sleep(0.01)
+            partial.finish(path, writer.close())
+
+        thread = threading.Thread(target=write_blocks)
+        thread.start()
+        followed = b''.join(partial.follow())
+        thread.join()
+
+        final = open(path, 'rb').read()
+        samples, sample_rate = sf.read(path)
+        if followed[WAV_HEADER_SIZE:] != final[WAV_HEADER_SIZE:] or len(samples) != 12 * 4800:
+            print(f"❌ Followed {len(followed)} bytes, final file has {len(samples)} frames")
+            return False
+        if np.abs(samples - np.concatenate(blocks)).max() > 1e-4 or sample_rate != 48000:
+            print("❌ Samples were not written correctly")
+            return False
+        print("✅ Followers get samples as they are written and the header is fixed on close")
+
+        # Followers of a failed job stop instead of waiting forever
+        partial = PartialOutput()
+        threading.Timer(0.1, partial.fail).start()
+        started = time.monotonic()
+        if list(partial.follow()) or time.monotonic() - started > 2:
+            print("❌ Follower did not stop when the job failed")
+            return False
+        print("✅ Followers stop when the job fails")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_partial_output() else 1)
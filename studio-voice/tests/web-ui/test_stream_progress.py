@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test byte and sample progress tracking of web UI job streams
+"""
+
+import asyncio
+import os
+import sys
+
+# Add web-ui directory to Python path
+web_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../web-ui'))
+sys.path.insert(0, web_ui_path)
+import stream_progress
+from stream_progress import StreamProgress
+
+class FakeMessage:
+    def __init__(self, size):
+        self.audio_stream_data = b'\0' * size
+
+class FakeCall:
+    """Async response stream of a given number of 2-byte samples per message"""
+
+    def __init__(self, messages, samples_per_message, delay=0.0):
+        self.messages = messages
+        self.samples_per_message = samples_per_message
+        self.delay = delay
+
+    async def __aiter__(self):
+        for _ in range(self.messages):
+            await asyncio.sleep(self.delay)
+            yield FakeMessage(self.samples_per_message * 2)
+
+async def consume(tracker, requests, call):
+    async with tracker:
+        sent = [request async for request in tracker.requests(requests)]
+        returned = [response async for response in tracker.responses(call)]
+    return sent, returned
+
+def test_stream_progress():
+    """Test counters, ETA, throttled reports and stall detection"""
+    print("🔬 Testing Stream Progress")
+    print("=" * 50)
+
+    reports = []
+    tracker = StreamProgress(total_bytes=4000, total_samples=1000, response_sample_bytes=2,
+                             report=reports.append, interval=0.05)
+
+    # All request bytes go out first, then the samples come back
+    requests = (FakeMessage(400) for _ in range(10))
+    sent, returned = asyncio.run(consume(tracker, requests, FakeCall(10, 100, delay=0.01)))
+    if len(sent) != 10 or len(returned) != 10:
+        print("❌ Messages were lost")
+        return False
+
+    final = reports[-1]
+    if (final['bytes_sent'], final['samples_returned'], final['fraction']) != (4000, 1000, 1.0):
+        print(f"❌ Wrong final counters: {final}")
+        return False
+    if final['eta_seconds'] != 0 or final['send_rate'] <= 0 or final['stalled']:
+        print(f"❌ Wrong rates or ETA: {final}")
+        return False
+    if not 2 <= len(reports) < 21:
+        print(f"❌ Reports not throttled: {len(reports)} for 20 messages")
+        return False
+    middle = [report for report in reports if 0.5 <= report['fraction'] < 1.0]
+    if middle and middle[0]['eta_seconds'] is None:
+        print("❌ No ETA while the job was running")
+        return False
+    print("✅ Bytes sent, samples returned and ETA reported")
+
+    # Nothing moving: the heartbeat keeps reporting and marks the job stalled
+    stream_progress.HEARTBEAT_INTERVAL = 0.05
+    stream_progress.STALL_SECONDS = 0.2
+    reports = []
+    stalled = StreamProgress(total_bytes=100, total_samples=100, response_sample_bytes=2,
+                             report=reports.append)
+
+    async def stuck():
+        async with stalled:
+            await asyncio.sleep(0.4)
+    asyncio.run(stuck())
+
+    if len(reports) < 4 or not reports[-1]['stalled'] or reports[-1]['idle_seconds'] < 0.2:
+        print(f"❌ Stall not reported: {reports[-1:]}")
+        return False
+    print("✅ Stuck streams are reported as stalled")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_stream_progress() else 1)
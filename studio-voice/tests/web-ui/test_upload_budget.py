@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Test the memory budget shared by small web UI uploads waiting in the queue
+"""
+
+import os
+import sys
+
+# Add web-ui directory to Python path
+web_ui_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../web-ui'))
+sys.path.insert(0, web_ui_path)
+from upload_budget import UploadBudget
+
+def test_upload_budget():
+    """Test reservations within the budget, refusals past it and repeated releases"""
+    print("🔬 Testing Upload Budget")
+    print("=" * 50)
+
+    budget = UploadBudget(max_bytes=100)
+    if not budget.reserve('a', 60) or not budget.reserve('b', 40) or budget.size != 100:
+        print(f"❌ Uploads within the budget were refused, size {budget.size}")
+        return False
+    if budget.reserve('c', 1):
+        print("❌ Upload past the budget was accepted")
+        return False
+    print("✅ Uploads are held in memory until the budget is used up")
+
+    # Cancelling and finishing a job may both release it
+    budget.release('a')
+    budget.release('a')
+    budget.release('missing')
+    if budget.size != 40 or not budget.reserve('c', 60) or budget.reserve('d', 1):
+        print(f"❌ Released bytes were not returned exactly once, size {budget.size}")
+        return False
+    print("✅ Released bytes are returned once and can be reserved again")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if test_upload_budget() else 1)
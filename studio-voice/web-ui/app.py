@@ -4,18 +4,18 @@ Studio Voice Web UI
 A Flask-based web interface for the Studio Voice NIM client
 """
 
+import io
 import os
 import sys
 import json
 import uuid
-import threading
-import time
+import asyncio
+import shutil
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_file
-from flask_socketio import SocketIO, emit
+from flask import Flask, Request, render_template, request, jsonify, send_file, session
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from werkzeug.utils import secure_filename
-import queue
 
 # Add the parent directory to the path to import studio_voice
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
@@ -25,12 +25,12 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'desktop-ui'))
 # Import the studio voice processing functions
 try:
     import studio_voice
-    import grpc
     import studiovoice_pb2
     import studiovoice_pb2_grpc
     import soundfile as sf
     import numpy as np
-    from large_file_handler import LargeFileProcessor
+    from large_file_handler import (LargeFileProcessor, PositionalWavWriter, DEFAULT_CHUNK_WORKERS,
+                                    CHUNK_SAMPLE_BYTES, STREAMING_SAMPLE_BYTES)
     STUDIO_VOICE_AVAILABLE = True
     LARGE_FILE_HANDLER_AVAILABLE = True
 except ImportError as e:
@@ -38,23 +38,66 @@ except ImportError as e:
     STUDIO_VOICE_AVAILABLE = False
     LARGE_FILE_HANDLER_AVAILABLE = False
 
+from chunked_upload import ChunkedUploadStore, UploadError
+from job_events import JobEventHub, MAX_LONG_POLL_SECONDS, job_room, session_room
+from job_executor import AsyncJobExecutor, wait_until_ready
+from job_scheduler import LANE_BATCH, choose_lane, estimate_job_seconds, job_cost
+from job_store import JobStore
+from output_cache import OutputCache
+from partial_output import PartialFileWriter, PartialOutput, PartialWavWriter
+from stream_progress import StreamProgress
+from upload_budget import UploadBudget
+
+class UploadRequest(Request):
+    """Keeps small multipart uploads in memory instead of spooling them to a temporary file"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= IN_MEMORY_UPLOAD_LIMIT:
+            return io.BytesIO()
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.config['SECRET_KEY'] = 'studio-voice-ui-secret'
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'outputs'
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size (chunking will handle server limits)
+app.config['JOB_DATABASE'] = 'jobs.sqlite'
+# Recordings larger than a single request are sent through /api/uploads in resumable parts
+app.config['CHUNKED_UPLOAD_FOLDER'] = os.path.join('uploads', 'incoming')
+
+# Studio Voice NIM target, jobs running at the same time in this process and the
+# per-target limits on concurrent jobs, e.g. {'10.0.0.5:8001': 8}
+app.config['SERVER_TARGET'] = '127.0.0.1:8001'
+app.config['MAX_CONCURRENT_JOBS'] = 256
+app.config['TARGET_CONCURRENCY'] = {}
+
+# Let a front-end server (nginx, Apache) send finished outputs with X-Sendfile. Without
+# it send_file hands the open file to the WSGI server, which can use sendfile itself.
+app.config['USE_X_SENDFILE'] = False
 
 # Server file size limit (35MB)
 SERVER_FILE_SIZE_LIMIT = 36700160  # ~35MB - matches desktop UI
 
+# Concurrent jobs per target when TARGET_CONCURRENCY has no entry for it
+DEFAULT_TARGET_CONCURRENCY = 2
+
+# Bytes read from disk at a time when streaming an upload to the server
+FILE_READ_BLOCK = 1024 * 1024
+
+# Bytes of enhanced audio gathered before they are appended to a growing output
+OUTPUT_WRITE_BLOCK = 256 * 1024
+
+# Seconds a range request for output that is not written yet waits for it
+PARTIAL_RANGE_WAIT_SECONDS = 10.0
+
+# Upload requests up to this size are processed from memory without touching uploads/
+IN_MEMORY_UPLOAD_LIMIT = 8 * 1024 * 1024
+
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# Global variables for job management
-job_queue = queue.Queue()
-current_jobs = {}
-job_history = []
-processing_thread = None
-is_processing = False
+# Job events go to the rooms of the job and its session, progress is coalesced
+job_events = JobEventHub(socketio)
 
 # Ensure upload and output directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -68,12 +111,14 @@ class JobStatus:
     CANCELLED = "cancelled"
 
 class ProcessingJob:
-    def __init__(self, job_id, file_path, filename, model_type="48k-hq", streaming=False):
+    def __init__(self, job_id, file_path, filename, model_type="48k-hq", streaming=False,
+                 server_target=None):
         self.job_id = job_id
         self.file_path = file_path
         self.filename = filename
         self.model_type = model_type
         self.streaming = streaming
+        self.server_target = server_target or app.config['SERVER_TARGET']
         self.status = JobStatus.QUEUED
         self.progress = 0
         self.created_at = datetime.now()
@@ -83,6 +128,18 @@ class ProcessingJob:
         self.output_path = None
         self.large_file_warning = None
         self.requires_chunking = False
+        # Scheduling inputs: expected processing cost, interactive or batch lane, submitter
+        self.expected_seconds = None
+        self.lane = None
+        self.client_id = None
+        # Uploads processed from memory keep their bytes here and are never written to uploads/
+        self.sample_rate = None
+        self.total_samples = None
+        self._audio_data = None
+        # Latest byte and sample counters of the running job
+        self.transfer = None
+        # Output being written by a running job, readable up to where it has got
+        self._partial = None
 
     def to_dict(self):
         return {
@@ -98,21 +155,125 @@ class ProcessingJob:
             'error_message': self.error_message,
             'output_path': self.output_path,
             'large_file_warning': self.large_file_warning,
-            'requires_chunking': self.requires_chunking
+            'requires_chunking': self.requires_chunking,
+            'expected_seconds': self.expected_seconds,
+            'lane': self.lane,
+            'transfer': self.transfer,
+            'output_available': self.output_path is not None or getattr(self, '_partial', None) is not None
         }
 
-def process_large_audio_file(input_path, output_path, model_type="48k-hq", streaming=False,
-                           server_target="127.0.0.1:8001", progress_callback=None):
+# Jobs survive restarts, finished ones are kept according to the store's retention policy
+job_store = JobStore(app.config['JOB_DATABASE'], ProcessingJob)
+
+# Chunked uploads in progress, resumable across dropped connections and restarts
+upload_store = ChunkedUploadStore(app.config['CHUNKED_UPLOAD_FOLDER'])
+
+# Outputs of in-memory jobs, downloaded without reading them back from outputs/
+output_cache = OutputCache()
+
+# Small uploads waiting in the queue share a memory budget, the rest wait on disk
+upload_budget = UploadBudget()
+
+async def iter_file_requests(input_path):
+    """
+    Yield the request stream for a wav file, reading it off the event loop
+    
+    Args:
+        input_path: Path to input audio file
+    """
+    with open(input_path, 'rb') as fd:
+        while True:
+            block = await asyncio.to_thread(fd.read, FILE_READ_BLOCK)
+            if not block:
+                break
+            for i in range(0, len(block), studio_voice.DATA_CHUNKS):
+                yield studiovoice_pb2.EnhanceAudioRequest(
+                    audio_stream_data=block[i:i + studio_voice.DATA_CHUNKS]
+                )
+
+def iter_buffer_requests(audio_data):
+    """
+    Yield the request stream for an audio file held in memory
+    
+    Args:
+        audio_data: Bytes of the uploaded audio file
+    """
+    for i in range(0, len(audio_data), studio_voice.DATA_CHUNKS):
+        yield studiovoice_pb2.EnhanceAudioRequest(
+            audio_stream_data=audio_data[i:i + studio_voice.DATA_CHUNKS]
+        )
+
+def stream_progress_reporter(progress_callback, message="Enhancing audio..."):
+    """Publish StreamProgress snapshots as progress events between 5% and 95%"""
+    if progress_callback is None:
+        return None
+    
+    def report(stats):
+        text = f"No data for {stats['idle_seconds']:.0f}s" if stats['stalled'] else message
+        progress_callback(5 + int(stats['fraction'] * 90), text, stats)
+    return report
+
+def create_stream_progress(file_size, total_samples, streaming, progress_callback):
+    """
+    Tracker for a whole file sent in one stream
+    
+    Streaming mode sends and returns float32 samples. Non-streaming mode sends the file
+    bytes and gets a 16-bit WAV back.
+    """
+    if streaming:
+        return StreamProgress(total_samples * STREAMING_SAMPLE_BYTES, total_samples, STREAMING_SAMPLE_BYTES,
+                              stream_progress_reporter(progress_callback))
+    return StreamProgress(file_size, total_samples, CHUNK_SAMPLE_BYTES,
+                          stream_progress_reporter(progress_callback))
+
+async def write_responses(responses, writer, streaming):
+    """
+    Append a response stream to a growing output as it arrives
+    
+    Responses are gathered into blocks of OUTPUT_WRITE_BLOCK bytes, which are written
+    off the event loop.
+    
+    Args:
+        responses: Async iterator of EnhanceAudioResponse
+        writer: PartialWavWriter in streaming mode, PartialFileWriter otherwise
+        streaming: Whether responses carry float32 samples
+    """
+    pending = []
+    pending_bytes = 0
+    
+    async def flush():
+        nonlocal pending, pending_bytes
+        block = b''.join(pending)
+        pending, pending_bytes = [], 0
+        await asyncio.to_thread(writer.write, np.frombuffer(block, np.float32) if streaming else block)
+    
+    async for response in responses:
+        if response.HasField("audio_stream_data"):
+            pending.append(response.audio_stream_data)
+            pending_bytes += len(response.audio_stream_data)
+            if pending_bytes >= OUTPUT_WRITE_BLOCK:
+                await flush()
+    if pending:
+        await flush()
+
+async def process_large_audio_file(channel, input_path, output_path, model_type="48k-hq",
+                                   streaming=False, progress_callback=None, partial=None):
     """
     Process large audio file using chunking
     
+    Chunks are read from the input file and enhanced concurrently as streams on the
+    shared channel, and each is written into the preallocated output file at its own
+    offset, so no temporary chunk files are written. The output is readable through
+    partial up to the first chunk that is not done yet.
+    
     Args:
+        channel: Shared grpc.aio channel to the Studio Voice server
         input_path: Path to input audio file
         output_path: Path to output audio file
         model_type: Model type to use
         streaming: Whether to use streaming mode
-        server_target: gRPC server target
         progress_callback: Function to call with progress updates
+        partial: PartialOutput following the output file as chunks complete
         
     Returns:
         bool: True if successful, False otherwise
@@ -124,82 +285,106 @@ def process_large_audio_file(input_path, output_path, model_type="48k-hq", strea
         # Initialize large file processor
         processor = LargeFileProcessor()
         
-        if progress_callback:
-            progress_callback(5)
+        # Plan the largest chunk whose request fits the server limit
+        info = await asyncio.to_thread(sf.info, input_path)
+        chunk_frames = processor.plan_chunk_frames(info.samplerate, info.channels, model_type, streaming)
+        chunk_duration = chunk_frames / info.samplerate
+        total_chunks = -(-info.frames // chunk_frames)
         
-        # Split the file into chunks
         if progress_callback:
-            progress_callback(10, "Splitting large file into chunks...")
+            progress_callback(5, f"Processing {total_chunks} chunks...")
         
-        # First estimate the appropriate chunk duration
-        chunk_duration = processor.estimate_chunk_duration(input_path)
-        chunk_files = processor.split_audio_file(input_path, chunk_duration)
-        total_chunks = len(chunk_files)
+        await wait_until_ready(channel)
+        stub = studiovoice_pb2_grpc.MaxineStudioVoiceStub(channel)
         
-        if progress_callback:
-            progress_callback(20, f"Created {total_chunks} chunks, processing...")
+        # Chunks are sent as float32 frames in streaming mode and as 16-bit WAV otherwise,
+        # and come back in the same sample format. All chunk streams share one tracker.
+        sample_bytes = STREAMING_SAMPLE_BYTES if streaming else CHUNK_SAMPLE_BYTES
+        total_samples = info.frames * info.channels
+        tracker = StreamProgress(total_samples * sample_bytes, total_samples, sample_bytes,
+                                 stream_progress_reporter(progress_callback,
+                                                          f"Processing {total_chunks} chunks..."))
         
-        # Process each chunk
-        processed_chunks = []
-        for i, chunk_file in enumerate(chunk_files):
-            chunk_output = f"{chunk_file}_enhanced.wav"
+        # Enhanced audio is written at each chunk's offset as soon as it arrives
+        with PositionalWavWriter(output_path, info.samplerate, info.channels, info.frames) as writer:
+            frame_bytes = info.channels * CHUNK_SAMPLE_BYTES
+            if partial:
+                partial.begin(writer.temp_file, writer.header_size + info.frames * frame_bytes)
+                partial.mark(0, writer.header_size)
             
-            # Calculate progress for this chunk (20% to 80% of total)
-            chunk_start_progress = 20 + (i * 60 // total_chunks)
-            chunk_end_progress = 20 + ((i + 1) * 60 // total_chunks)
-            
-            if progress_callback:
-                progress_callback(chunk_start_progress, f"Processing chunk {i+1}/{total_chunks}...")
+            async def enhance_chunk(start_frame, chunk_data):
+                call = stub.EnhanceAudio(tracker.requests(studio_voice.generate_request_for_audio(
+                    chunk_data, model_type, info.samplerate, streaming
+                )), timeout=120.0)  # 2 minute timeout per chunk
+                responses = [response async for response in tracker.responses(call)]
+                await asyncio.to_thread(
+                    writer.write_blocks, start_frame,
+                    studio_voice.iter_audio_from_response(responses, streaming), len(chunk_data)
+                )
+                if partial:
+                    partial.mark(writer.header_size + start_frame * frame_bytes,
+                                 writer.header_size + (start_frame + len(chunk_data)) * frame_bytes)
             
-            # Process individual chunk
-            success = process_audio_with_studio_voice(
-                chunk_file, chunk_output, model_type, streaming, server_target,
-                lambda p: progress_callback(chunk_start_progress + (p * (chunk_end_progress - chunk_start_progress) // 100)) if progress_callback else None
-            )
+            chunks = processor.iter_audio_chunks(input_path, chunk_duration)
+            pending = set()
+            completed = 0
             
-            if not success:
-                # Clean up on failure
-                processor.cleanup_chunks(chunk_files)
-                processor.cleanup_chunks(processed_chunks)
-                raise Exception(f"Failed to process chunk {i+1}")
+            async def wait_for_chunks(return_when):
+                nonlocal pending, completed
+                done, pending = await asyncio.wait(pending, return_when=return_when)
+                for task in done:
+                    task.result()
+                    completed += 1
+                    if progress_callback:
+                        stats = tracker.snapshot()
+                        progress_callback(5 + int(stats['fraction'] * 90),
+                                          f"Processed chunk {completed}/{total_chunks}", stats)
             
-            processed_chunks.append(chunk_output)
-        
-        if progress_callback:
-            progress_callback(80, "Merging processed chunks...")
-        
-        # Merge the processed chunks
-        success = processor.merge_audio_files(processed_chunks, output_path)
-        
-        if progress_callback:
-            progress_callback(90, "Cleaning up temporary files...")
-        
-        # Clean up temporary files
-        processor.cleanup_chunks(chunk_files)
-        processor.cleanup_chunks(processed_chunks)
+            async with tracker:
+                try:
+                    # Up to DEFAULT_CHUNK_WORKERS chunk streams share the channel at a time
+                    while True:
+                        chunk = await asyncio.to_thread(next, chunks, None)
+                        if chunk is None:
+                            break
+                        if len(pending) >= DEFAULT_CHUNK_WORKERS:
+                            await wait_for_chunks(asyncio.FIRST_COMPLETED)
+                        _, start_frame, chunk_data = chunk
+                        pending.add(asyncio.create_task(enhance_chunk(start_frame, chunk_data)))
+                
+                    if pending:
+                        await wait_for_chunks(asyncio.ALL_COMPLETED)
+                finally:
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
         
         if progress_callback:
             progress_callback(100, "Large file processing complete")
         
-        return success
+        return True
         
     except Exception as e:
         if progress_callback:
             progress_callback(-1, f"Error processing large file: {str(e)}")
         return False
 
-def process_audio_with_studio_voice(input_path, output_path, model_type="48k-hq", streaming=False, 
-                                   server_target="127.0.0.1:8001", progress_callback=None):
+async def process_audio_with_studio_voice(channel, input_path, output_path, model_type="48k-hq",
+                                          streaming=False, progress_callback=None, partial=None):
     """
     Process audio file using Studio Voice NIM
     
+    The enhanced audio is appended to the output file as it arrives, so it can be
+    played through partial before the job ends.
+    
     Args:
+        channel: Shared grpc.aio channel to the Studio Voice server
         input_path: Path to input audio file
         output_path: Path to output audio file
         model_type: Model type to use (48k-hq, 48k-ll, 16k-hq)
         streaming: Whether to use streaming mode
-        server_target: gRPC server target
         progress_callback: Function to call with progress updates
+        partial: PartialOutput following the output file as it is written
         
     Returns:
         bool: True if successful, False otherwise
@@ -208,186 +393,345 @@ def process_audio_with_studio_voice(input_path, output_path, model_type="48k-hq"
         raise Exception("Studio Voice modules not available")
     
     try:
-        # Create gRPC channel with proper options
-        channel_options = [
-            ('grpc.keepalive_time_ms', 30000),
-            ('grpc.keepalive_timeout_ms', 5000),
-            ('grpc.keepalive_permit_without_calls', True),
-            ('grpc.http2.max_pings_without_data', 0),
-            ('grpc.http2.min_time_between_pings_ms', 10000),
-            ('grpc.http2.min_ping_interval_without_data_ms', 300000)
-        ]
-        channel = grpc.insecure_channel(server_target, options=channel_options)
+        await wait_until_ready(channel)
+        
+        # Read the audio header to get sample rate
+        info = await asyncio.to_thread(sf.info, input_path)
+        sample_rate = info.samplerate
+        
+        # Create stub
+        stub = studiovoice_pb2_grpc.MaxineStudioVoiceStub(channel)
+        
+        # Generate the request stream without blocking the event loop on disk reads
+        if streaming:
+            input_audio, _ = await asyncio.to_thread(sf.read, input_path)
+            request_generator = studio_voice.generate_request_for_audio(
+                input_audio=input_audio,
+                model_type=model_type,
+                sample_rate=sample_rate,
+                streaming=streaming
+            )
+        else:
+            request_generator = iter_file_requests(input_path)
+        
+        tracker = create_stream_progress(os.path.getsize(input_path), info.frames * info.channels,
+                                         streaming, progress_callback)
         
+        # Streaming mode returns mono float32 samples, non-streaming mode a whole WAV file
+        if streaming:
+            writer = PartialWavWriter(output_path, sample_rate, 1, info.frames, partial)
+        else:
+            writer = PartialFileWriter(output_path, partial)
+        
+        # Process the request with timeout
         try:
-            # Test channel connectivity with timeout
-            grpc.channel_ready_future(channel).result(timeout=10.0)
-        except grpc.FutureTimeoutError:
-            raise Exception("Failed to connect to Studio Voice server - timeout")
+            async with tracker:
+                call = stub.EnhanceAudio(tracker.requests(request_generator), timeout=120.0)  # 2 minute timeout
+                await write_responses(tracker.responses(call), writer, streaming)
+        except BaseException:
+            writer.abort()
+            raise
+        await asyncio.to_thread(writer.close)
+        
+        if progress_callback:
+            progress_callback(100)
         
-        # Read audio file to get sample rate
-        audio_data, sample_rate = sf.read(input_path)
+        return True
         
+    except Exception as e:
+        print(f"Error processing audio: {e}")
         if progress_callback:
-            progress_callback(10)
+            progress_callback(-1, f"Error: {str(e)}")
+        return False
+
+async def process_audio_from_memory(channel, audio_data, sample_rate, total_samples, output_path,
+                                    model_type="48k-hq", streaming=False, progress_callback=None):
+    """
+    Process an upload held in memory using Studio Voice NIM
+    
+    The header was parsed when the file was uploaded, so the buffer goes straight into
+    the request stream. The enhanced audio is collected in memory as it arrives and
+    written to the output file once.
+    
+    Args:
+        channel: Shared grpc.aio channel to the Studio Voice server
+        audio_data: Bytes of the uploaded audio file
+        sample_rate: Sample rate from the upload's header
+        total_samples: Samples in the upload, from its header
+        output_path: Path to output audio file
+        model_type: Model type to use (48k-hq, 48k-ll, 16k-hq)
+        streaming: Whether to use streaming mode
+        progress_callback: Function to call with progress updates
         
-        # Create stub
+    Returns:
+        bytes: The enhanced audio file, or None if processing failed
+    """
+    if not STUDIO_VOICE_AVAILABLE:
+        raise Exception("Studio Voice modules not available")
+    
+    try:
+        await wait_until_ready(channel)
         stub = studiovoice_pb2_grpc.MaxineStudioVoiceStub(channel)
         
-        if progress_callback:
-            progress_callback(20)
-        
-        # Generate request using the existing function
-        request_generator = studio_voice.generate_request_for_inference(
-            input_filepath=input_path,
-            model_type=model_type,
-            sample_rate=sample_rate,
-            streaming=streaming
-        )
+        if streaming:
+            input_audio, _ = await asyncio.to_thread(sf.read, io.BytesIO(audio_data))
+            request_generator = studio_voice.generate_request_for_audio(
+                input_audio=input_audio,
+                model_type=model_type,
+                sample_rate=sample_rate,
+                streaming=streaming
+            )
+        else:
+            request_generator = iter_buffer_requests(audio_data)
         
-        if progress_callback:
-            progress_callback(40)
+        tracker = create_stream_progress(len(audio_data), total_samples, streaming, progress_callback)
         
-        # Process the request with timeout
-        responses = stub.EnhanceAudio(request_generator, timeout=120.0)  # 2 minute timeout
+        output = io.BytesIO()
+        async with tracker:
+            call = stub.EnhanceAudio(tracker.requests(request_generator), timeout=120.0)  # 2 minute timeout
+            if streaming:
+                with sf.SoundFile(output, 'w', samplerate=sample_rate, channels=1, format='WAV') as fd:
+                    async for response in tracker.responses(call):
+                        fd.write(np.frombuffer(response.audio_stream_data, np.float32))
+            else:
+                async for response in tracker.responses(call):
+                    if response.HasField("audio_stream_data"):
+                        output.write(response.audio_stream_data)
         
         if progress_callback:
-            progress_callback(60)
-        
-        # Write output using existing function
-        studio_voice.write_output_file_from_response(
-            response_iter=responses,
-            output_filepath=output_path,
-            sample_rate=sample_rate,
-            streaming=streaming
-        )
+            progress_callback(95, "Writing output...", tracker.snapshot())
+        
+        output_data = output.getvalue()
+        await asyncio.to_thread(Path(output_path).write_bytes, output_data)
         
         if progress_callback:
             progress_callback(100)
         
-        return True
+        return output_data
         
     except Exception as e:
         print(f"Error processing audio: {e}")
         if progress_callback:
             progress_callback(-1, f"Error: {str(e)}")
-        return False
-    finally:
-        try:
-            if 'channel' in locals():
-                channel.close()
-        except Exception as cleanup_error:
-            print(f"Error closing channel: {cleanup_error}")
-            pass
+        return None
 
-def process_jobs():
-    """Background thread to process jobs from the queue"""
-    global is_processing
+async def run_job(job, channel):
+    """Process one job on the executor's event loop and move it to the history"""
+    # Cancelled jobs stay scheduled until the executor reaches them
+    if job.status == JobStatus.CANCELLED:
+        upload_budget.release(job.job_id)
+        return
     
-    while True:
-        try:
-            if not job_queue.empty():
-                job = job_queue.get()
-                is_processing = True
-                
-                # Update job status
-                job.status = JobStatus.PROCESSING
-                job.started_at = datetime.now()
-                current_jobs[job.job_id] = job
-                
-                # Emit status update
-                socketio.emit('job_status_update', job.to_dict())
-                
-                try:
-                    # Process the audio file
-                    output_path = os.path.join(app.config['OUTPUT_FOLDER'], f"enhanced_{job.filename}")
-                    
-                    def progress_callback(progress, message="Processing..."):
-                        job.progress = progress
-                        socketio.emit('job_progress_update', {
-                            'job_id': job.job_id,
-                            'progress': progress,
-                            'message': message
-                        })
-                    
-                    # Use actual studio voice processing if available
-                    if STUDIO_VOICE_AVAILABLE:
-                        # Check if file requires chunking
-                        if job.requires_chunking and LARGE_FILE_HANDLER_AVAILABLE:
-                            progress_callback(5, "Large file detected, using chunking...")
-                            success = process_large_audio_file(
-                                job.file_path, 
-                                output_path, 
-                                job.model_type, 
-                                job.streaming,
-                                progress_callback=progress_callback
-                            )
-                        else:
-                            # Normal processing for smaller files
-                            success = process_audio_with_studio_voice(
-                                job.file_path, 
-                                output_path, 
-                                job.model_type, 
-                                job.streaming,
-                                progress_callback=progress_callback
-                            )
-                        
-                        if success:
-                            job.status = JobStatus.COMPLETED
-                            job.output_path = output_path
-                            progress_callback(100, "Processing complete")
-                        else:
-                            job.status = JobStatus.FAILED
-                            job.error_message = "Processing failed"
-                    else:
-                        # Fallback: simulate processing for demo purposes
-                        for progress in range(0, 101, 10):
-                            time.sleep(0.5)
-                            progress_callback(progress)
-                        
-                        # Copy input to output for demo
-                        import shutil
-                        shutil.copy2(job.file_path, output_path)
-                        job.status = JobStatus.COMPLETED
-                        job.output_path = output_path
-                    
-                    job.completed_at = datetime.now()
-                    job.progress = 100
-                    
-                except Exception as e:
-                    print(f"Job processing error: {e}")
-                    job.status = JobStatus.FAILED
-                    job.error_message = str(e)
-                    job.completed_at = datetime.now()
-                    job.progress = 0
-                
-                # Move job to history
-                job_history.append(job)
-                if job.job_id in current_jobs:
-                    del current_jobs[job.job_id]
-                
-                # Emit final status
-                socketio.emit('job_status_update', job.to_dict())
-                
-                is_processing = False
-                
-                # Remove the job from queue to prevent reprocessing
-                try:
-                    job_queue.task_done()
-                except ValueError:
-                    pass  # Queue might not support task_done
-                    
+    # Update job status
+    job.status = JobStatus.PROCESSING
+    job.started_at = datetime.now()
+    # Outputs written from a file can be played while they grow
+    job._partial = None
+    if STUDIO_VOICE_AVAILABLE and getattr(job, '_audio_data', None) is None:
+        job._partial = PartialOutput()
+    await asyncio.to_thread(job_store.save, job)
+    
+    # Emit status update
+    job_events.publish_status(job)
+    
+    try:
+        # Process the audio file
+        output_path = os.path.abspath(os.path.join(app.config['OUTPUT_FOLDER'], f"{job.job_id}_enhanced_{job.filename}"))
+        
+        def progress_callback(progress, message="Processing...", transfer=None):
+            job.progress = progress
+            if transfer is not None:
+                job.transfer = transfer
+            job_events.publish_progress(job, {
+                'progress': progress,
+                'message': message,
+                'transfer': job.transfer
+            })
+        
+        # Use actual studio voice processing if available
+        if STUDIO_VOICE_AVAILABLE:
+            audio_data = getattr(job, '_audio_data', None)
+            if audio_data is not None:
+                # Small upload held in memory
+                job._audio_data = None
+                output_data = await process_audio_from_memory(
+                    channel,
+                    audio_data,
+                    job.sample_rate,
+                    job.total_samples,
+                    output_path,
+                    job.model_type,
+                    job.streaming,
+                    progress_callback=progress_callback
+                )
+                success = output_data is not None
+                if success:
+                    output_cache.put(job.job_id, output_data)
+            # Check if file requires chunking
+            elif job.requires_chunking and LARGE_FILE_HANDLER_AVAILABLE:
+                progress_callback(5, "Large file detected, using chunking...")
+                success = await process_large_audio_file(
+                    channel,
+                    job.file_path, 
+                    output_path, 
+                    job.model_type, 
+                    job.streaming,
+                    progress_callback=progress_callback,
+                    partial=job._partial
+                )
             else:
-                time.sleep(1)  # Wait before checking queue again
-                
-        except Exception as e:
-            print(f"Error in processing thread: {e}")
-            is_processing = False
-            time.sleep(5)  # Wait longer if there's a critical error
+                # Normal processing for smaller files
+                success = await process_audio_with_studio_voice(
+                    channel,
+                    job.file_path, 
+                    output_path, 
+                    job.model_type, 
+                    job.streaming,
+                    progress_callback=progress_callback,
+                    partial=job._partial
+                )
+            
+            if success:
+                job.status = JobStatus.COMPLETED
+                job.output_path = output_path
+                progress_callback(100, "Processing complete")
+            else:
+                job.status = JobStatus.FAILED
+                job.error_message = "Processing failed"
+        else:
+            # Fallback: simulate processing for demo purposes
+            for progress in range(0, 101, 10):
+                await asyncio.sleep(0.5)
+                progress_callback(progress)
+            
+            # Copy input to output for demo
+            if getattr(job, '_audio_data', None) is not None:
+                await asyncio.to_thread(Path(output_path).write_bytes, job._audio_data)
+                job._audio_data = None
+            else:
+                await asyncio.to_thread(shutil.copy2, job.file_path, output_path)
+            job.status = JobStatus.COMPLETED
+            job.output_path = output_path
+        
+        job.completed_at = datetime.now()
+        job.progress = 100
+        
+    except Exception as e:
+        print(f"Job processing error: {e}")
+        job.status = JobStatus.FAILED
+        job.error_message = str(e)
+        job.completed_at = datetime.now()
+        job.progress = 0
+    
+    upload_budget.release(job.job_id)
+    
+    # Readers of the growing output continue with the finished file or stop where it ended
+    if job._partial is not None:
+        if job.status == JobStatus.COMPLETED:
+            job._partial.finish(job.output_path, os.path.getsize(job.output_path))
+        else:
+            job._partial.fail()
+    
+    # Move job to history
+    await asyncio.to_thread(job_store.save, job)
+    
+    # Emit final status
+    job_events.publish_status(job)
+
+job_executor = AsyncJobExecutor(
+    run_job,
+    max_concurrent_jobs=app.config['MAX_CONCURRENT_JOBS'],
+    target_limits=app.config['TARGET_CONCURRENCY'],
+    default_target_limit=DEFAULT_TARGET_CONCURRENCY
+)
+
+def restore_jobs():
+    """Resubmit the jobs a previous run left unfinished"""
+    for job in job_store.restore_unfinished():
+        # Uploads held in memory do not survive a restart
+        if job.file_path and os.path.exists(job.file_path):
+            job_executor.submit(job)
+        else:
+            job.status = JobStatus.FAILED
+            job.error_message = "Uploaded file is missing after restart"
+            job.completed_at = datetime.now()
+            job_store.save(job)
+
+def client_id():
+    """Identify the submitter for fair sharing, one id per browser session"""
+    if 'client_id' not in session:
+        session['client_id'] = str(uuid.uuid4())
+    return session['client_id']
+
+def submit_uploaded_file(job_id, file_path, filename, model_type, streaming, requested_lane, submitter):
+    """Create the job for an uploaded file and queue it"""
+    # Check request size and add warning for large files
+    file_size = os.path.getsize(file_path)
+    if LARGE_FILE_HANDLER_AVAILABLE:
+        # Streaming mode sends float32 samples, which can exceed the limit on its own
+        is_large_file = LargeFileProcessor(SERVER_FILE_SIZE_LIMIT).needs_chunking(
+            file_path, model_type, streaming
+        )
+    else:
+        is_large_file = file_size > SERVER_FILE_SIZE_LIMIT
+    
+    # Create processing job
+    job = ProcessingJob(job_id, file_path, filename, model_type, streaming)
+    
+    # Add large file information to job
+    if is_large_file:
+        file_size_mb = file_size / (1024 * 1024)
+        job.large_file_warning = (
+            f"File size ({file_size_mb:.1f}MB) exceeds server limit (35MB). "
+            f"{'Chunking will be used automatically.' if LARGE_FILE_HANDLER_AVAILABLE else 'Consider using the desktop standalone version for better large file support.'}"
+        )
+        job.requires_chunking = LARGE_FILE_HANDLER_AVAILABLE
+    
+    job.expected_seconds = estimate_job_seconds(file_path, model_type, streaming)
+    return queue_job(job, requested_lane, submitter)
+
+def submit_memory_upload(job_id, audio_data, filename, model_type, streaming, requested_lane, submitter):
+    """Create and queue a job for an upload held in memory
+    
+    Returns None when the upload has to go through a file instead, because its header
+    cannot be read, its request would need chunking or queued uploads already fill the
+    memory budget.
+    """
+    if not STUDIO_VOICE_AVAILABLE:
+        return None
+    try:
+        info = sf.info(io.BytesIO(audio_data))
+    except Exception:
+        return None
+    if LARGE_FILE_HANDLER_AVAILABLE and LargeFileProcessor(SERVER_FILE_SIZE_LIMIT).payload_size_from_info(
+            info, len(audio_data), model_type, streaming) > SERVER_FILE_SIZE_LIMIT:
+        return None
+    if not upload_budget.reserve(job_id, len(audio_data)):
+        return None
+    
+    job = ProcessingJob(job_id, None, filename, model_type, streaming)
+    job.sample_rate = info.samplerate
+    job.total_samples = info.frames * info.channels
+    job._audio_data = audio_data
+    job.expected_seconds = job_cost(info.duration, model_type, streaming)
+    return queue_job(job, requested_lane, submitter)
+
+def queue_job(job, requested_lane, submitter):
+    """Store a new job and hand it to the scheduler"""
+    # Short clips are scheduled ahead of long and chunked files
+    job.lane = LANE_BATCH if job.requires_chunking else choose_lane(job.expected_seconds, requested_lane)
+    job.client_id = submitter
+    
+    job_store.add(job)
+    job_events.publish_status(job)
+    job_executor.submit(job)
+    return job
 
 @app.route('/')
 def index():
     """Main dashboard page"""
+    # The session cookie has to exist before the page's socket connects
+    client_id()
     return render_template('index.html')
 
 @app.route('/api/upload', methods=['POST'])
@@ -399,6 +743,10 @@ def upload_files():
     files = request.files.getlist('files')
     model_type = request.form.get('model_type', '48k-hq')
     streaming = request.form.get('streaming', 'false').lower() == 'true'
+    requested_lane = request.form.get('lane')
+    submitter = client_id()
+    # Small requests were kept in memory by UploadRequest and skip uploads/ entirely
+    in_memory = request.content_length is not None and request.content_length <= IN_MEMORY_UPLOAD_LIMIT
     
     uploaded_jobs = []
     
@@ -409,27 +757,21 @@ def upload_files():
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
             job_id = str(uuid.uuid4())
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{job_id}_{filename}")
-            file.save(file_path)
-            
-            # Check file size and add warning for large files
-            file_size = os.path.getsize(file_path)
-            is_large_file = file_size > SERVER_FILE_SIZE_LIMIT
-            
-            # Create processing job
-            job = ProcessingJob(job_id, file_path, filename, model_type, streaming)
             
-            # Add large file information to job
-            if is_large_file:
-                file_size_mb = file_size / (1024 * 1024)
-                job.large_file_warning = (
-                    f"File size ({file_size_mb:.1f}MB) exceeds server limit (35MB). "
-                    f"{'Chunking will be used automatically.' if LARGE_FILE_HANDLER_AVAILABLE else 'Consider using the desktop standalone version for better large file support.'}"
-                )
-                job.requires_chunking = LARGE_FILE_HANDLER_AVAILABLE
+            job = None
+            if in_memory:
+                audio_data = file.read()
+                job = submit_memory_upload(job_id, audio_data, filename, model_type, streaming,
+                                           requested_lane, submitter)
             
-            job_queue.put(job)
-            current_jobs[job_id] = job
+            if job is None:
+                file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{job_id}_{filename}")
+                if in_memory:
+                    Path(file_path).write_bytes(audio_data)
+                else:
+                    file.save(file_path)
+                job = submit_uploaded_file(job_id, file_path, filename, model_type, streaming,
+                                           requested_lane, submitter)
             uploaded_jobs.append(job.to_dict())
     
     return jsonify({
@@ -437,28 +779,108 @@ def upload_files():
         'jobs': uploaded_jobs
     })
 
+@app.errorhandler(UploadError)
+def handle_upload_error(error):
+    return jsonify({'error': str(error)}), error.status
+
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    """Start a chunked upload, the client then PUTs parts at byte offsets"""
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(data.get('filename', ''))
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'Unsupported file type'}), 400
+    
+    try:
+        size = int(data.get('size', 0))
+    except (TypeError, ValueError):
+        raise UploadError("Upload size must be a whole number of bytes", 400)
+    
+    upload = upload_store.create(filename, size, {
+        'model_type': data.get('model_type', '48k-hq'),
+        'streaming': bool(data.get('streaming', False)),
+        'lane': data.get('lane'),
+        'client_id': client_id()
+    })
+    return jsonify({**upload.to_dict(), 'part_size': upload_store.part_size}), 201
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """Report the received byte ranges so an interrupted upload can resume"""
+    upload = upload_store.get(upload_id)
+    return jsonify({**upload.to_dict(), 'part_size': upload_store.part_size})
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+def upload_part(upload_id):
+    """Write the request body at ?offset= and acknowledge the bytes stored"""
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'offset is required'}), 400
+    
+    upload = upload_store.write_part(upload_id, offset, request.stream, request.content_length)
+    return jsonify(upload.to_dict())
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Abandon a chunked upload"""
+    upload_store.discard(upload_id)
+    return jsonify({'message': 'Upload deleted'})
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    """Turn a fully received upload into a processing job"""
+    upload = upload_store.get(upload_id)
+    job_id = str(uuid.uuid4())
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{job_id}_{upload.filename}")
+    upload_store.finish(upload_id, file_path)
+    
+    params = upload.params
+    job = submit_uploaded_file(job_id, file_path, upload.filename, params['model_type'],
+                               params['streaming'], params.get('lane'), params['client_id'])
+    return jsonify({'message': f'Uploaded {upload.filename}', 'jobs': [job.to_dict()]})
+
 @app.route('/api/jobs')
 def get_jobs():
-    """Get current jobs and history"""
-    return jsonify({
-        'current_jobs': [job.to_dict() for job in current_jobs.values()],
-        'job_history': [job.to_dict() for job in job_history[-50:]],  # Last 50 jobs
-        'queue_size': job_queue.qsize(),
-        'is_processing': is_processing
+    """Get current jobs and history
+    
+    Clients without a socket send the last ETag in If-None-Match and get a 304 while
+    nothing changed. With ?wait=<seconds> the request is held until a job changes.
+    """
+    etag = job_events.etag
+    if request.if_none_match.contains(etag):
+        wait = request.args.get('wait', 0, type=float)
+        if wait > 0:
+            etag = job_events.wait_for_change(etag, min(wait, MAX_LONG_POLL_SECONDS))
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+    
+    response = jsonify({
+        'current_jobs': [job.to_dict() for job in job_store.active_jobs()],
+        'job_history': job_store.history(50),  # Last 50 jobs
+        'queue_size': job_executor.queued,
+        'is_processing': job_executor.running > 0,
+        'active_jobs': job_executor.running
     })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
 def cancel_job(job_id):
     """Cancel a specific job"""
-    if job_id in current_jobs:
-        job = current_jobs[job_id]
+    job = job_store.get(job_id)
+    if job is not None:
         if job.status == JobStatus.QUEUED:
             job.status = JobStatus.CANCELLED
             job.completed_at = datetime.now()
-            job_history.append(job)
-            del current_jobs[job_id]
+            job._audio_data = None
+            upload_budget.release(job_id)
+            job_store.save(job)
+            job_executor.cancel(job_id)
             
-            socketio.emit('job_status_update', job.to_dict())
+            job_events.publish_status(job)
             return jsonify({'message': 'Job cancelled'})
         else:
             return jsonify({'error': 'Job cannot be cancelled'}), 400
@@ -467,18 +889,76 @@ def cancel_job(job_id):
 
 @app.route('/api/download/<job_id>')
 def download_result(job_id):
-    """Download processed audio file"""
-    # Look for job in history
-    job = None
-    for hist_job in job_history:
-        if hist_job.job_id == job_id:
-            job = hist_job
-            break
-    
-    if job and job.output_path and os.path.exists(job.output_path):
-        return send_file(job.output_path, as_attachment=True)
-    else:
-        return jsonify({'error': 'File not found'}), 404
+    """Download processed audio file, or what is written so far while the job runs"""
+    return send_output(job_store.get(job_id), as_attachment=True)
+
+@app.route('/api/stream/<job_id>')
+def stream_result(job_id):
+    """Play processed audio, following the output while the job writes it"""
+    return send_output(job_store.get(job_id), as_attachment=False)
+
+def send_output(job, as_attachment):
+    """Serve a job's output with range support, finished or still growing"""
+    if job and job.status == JobStatus.COMPLETED and job.output_path:
+        download_name = f"enhanced_{job.filename}"
+        output_data = output_cache.get(job.job_id)
+        if output_data is not None:
+            return send_file(io.BytesIO(output_data), mimetype='audio/wav', as_attachment=as_attachment,
+                             download_name=download_name, conditional=True)
+        if os.path.exists(job.output_path):
+            # Relative paths would be resolved against the app's directory, not the working directory
+            return send_file(os.path.abspath(job.output_path), mimetype='audio/wav', as_attachment=as_attachment,
+                             download_name=download_name, conditional=True)
+    
+    partial = getattr(job, '_partial', None)
+    if job and job.status == JobStatus.PROCESSING and partial is not None:
+        return send_partial_output(partial, f"enhanced_{job.filename}", as_attachment)
+    return jsonify({'error': 'File not found'}), 404
+
+def send_partial_output(partial, download_name, as_attachment):
+    """
+    Serve an output that is still being written
+    
+    A request without a range follows the file until the job ends. An open range does
+    too when the final size is known, otherwise it gets the bytes written so far, as
+    does a closed range. A range past the written bytes waits briefly for them.
+    """
+    total = partial.total_size
+    start, end, status = 0, None, 200
+    byte_range = request.range
+    if byte_range is not None and len(byte_range.ranges) == 1:
+        start, end = byte_range.ranges[0]
+        if start < 0:
+            # Suffix ranges need the final size
+            if total is None:
+                return app.response_class(status=416, headers={'Content-Range': 'bytes */*'})
+            start, end = max(0, total + start), None
+        if start > 0 or end is not None or total is not None:
+            status = 206
+    
+    if status == 206:
+        if (total is not None and start >= total) or not partial.wait(start, PARTIAL_RANGE_WAIT_SECONDS):
+            return app.response_class(status=416, headers={'Content-Range': f"bytes */{total or '*'}"})
+        if end is None:
+            end = total if total is not None else partial.ready
+        elif total is None:
+            end = min(end, partial.ready)
+        else:
+            end = min(end, total)
+    
+    response = app.response_class(partial.follow(start, end), status=status, mimetype='audio/wav',
+                                  direct_passthrough=True)
+    if end is not None:
+        response.content_length = end - start
+    elif total is not None:
+        response.content_length = total
+    if status == 206:
+        response.headers['Content-Range'] = f"bytes {start}-{end - 1}/{total if total is not None else '*'}"
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline',
+                         filename=download_name)
+    return response
 
 @app.route('/api/settings')
 def get_settings():
@@ -505,17 +985,38 @@ def allowed_file(filename):
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
+    # Jobs submitted from this browser session are followed automatically
+    if 'client_id' in session:
+        join_room(session_room(session['client_id']))
     emit('connected', {'message': 'Connected to Studio Voice UI'})
 
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """Follow jobs by id and get their current state"""
+    for job_id in (data or {}).get('job_ids', []):
+        job = job_store.get(job_id)
+        if job is None:
+            continue
+        join_room(job_room(job_id))
+        emit('job_status_update', job.to_dict())
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    """Stop following jobs"""
+    for job_id in (data or {}).get('job_ids', []):
+        leave_room(job_room(job_id))
+
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
     print('Client disconnected')
 
 if __name__ == '__main__':
-    # Start the processing thread
-    processing_thread = threading.Thread(target=process_jobs, daemon=True)
-    processing_thread.start()
+    # Start the job executor's event loop
+    job_executor.start()
+    
+    # Requeue the jobs that were queued or interrupted when the UI last stopped
+    restore_jobs()
     
     # Run the Flask app (disable debug to prevent multiple threads)
     socketio.run(app, host='127.0.0.1', port=5000, debug=False, allow_unsafe_werkzeug=True)
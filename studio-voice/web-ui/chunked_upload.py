@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Chunked Uploads
+Resumable uploads written part by part straight into the destination file
+"""
+
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from typing import BinaryIO, Dict, List, Optional
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+# Size of the parts clients are asked to send, each part is one request
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+
+# Largest recording accepted through chunked uploads
+MAX_UPLOAD_SIZE = 16 * 1024 * 1024 * 1024
+
+# Bytes from the start of the file needed to validate the audio header
+HEADER_PROBE_BYTES = 64 * 1024
+
+# Bytes copied from the request body to disk at a time
+WRITE_BLOCK = 1024 * 1024
+
+# Unfinished uploads untouched for this many seconds are deleted
+STALE_UPLOAD_SECONDS = 24 * 3600
+
+class UploadError(Exception):
+    """Raised for rejected upload requests, status is the HTTP status code to return"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+def _merge(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    merged = []
+    for range_start, range_end in sorted(ranges + [[start, end]]):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return merged
+
+class ChunkedUpload:
+    """One upload in progress, the file is preallocated and parts land at their offsets
+
+    The byte ranges received so far are kept in a JSON file next to the data, so an
+    upload can be resumed after a dropped connection or a restart of the web UI.
+    """
+
+    def __init__(self, upload_id: str, filename: str, size: int, params: Dict, folder: str):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.params = params
+        self.data_path = os.path.join(folder, f"{upload_id}.part")
+        self.meta_path = os.path.join(folder, f"{upload_id}.upload.json")
+        self.ranges: List[List[int]] = []
+        self.header_checked = False
+        self.audio_info = None
+        self.lock = threading.Lock()
+
+    @property
+    def received(self) -> int:
+        """Total bytes received"""
+        return sum(end - start for start, end in self.ranges)
+
+    @property
+    def offset(self) -> int:
+        """Bytes received contiguously from the start, where a sequential client resumes"""
+        if self.ranges and self.ranges[0][0] == 0:
+            return self.ranges[0][1]
+        return 0
+
+    @property
+    def complete(self) -> bool:
+        """True once every byte has arrived"""
+        return self.offset >= self.size
+
+    def missing(self) -> List[List[int]]:
+        """Byte ranges still to be sent"""
+        gaps = []
+        position = 0
+        for start, end in self.ranges:
+            if start > position:
+                gaps.append([position, start])
+            position = max(position, end)
+        if position < self.size:
+            gaps.append([position, self.size])
+        return gaps
+
+    def to_dict(self) -> Dict:
+        return {
+            'upload_id': self.upload_id,
+            'filename': self.filename,
+            'size': self.size,
+            'offset': self.offset,
+            'received': self.received,
+            'missing': self.missing(),
+            'complete': self.complete,
+            'header_checked': self.header_checked
+        }
+
+    def save(self):
+        """Write the session state next to the data file"""
+        state = {
+            'upload_id': self.upload_id, 'filename': self.filename, 'size': self.size,
+            'params': self.params, 'ranges': self.ranges, 'header_checked': self.header_checked,
+            'audio_info': self.audio_info
+        }
+        temp_path = f"{self.meta_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.meta_path)
+
+    @classmethod
+    def load(cls, meta_path: str) -> 'ChunkedUpload':
+        with open(meta_path) as f:
+            state = json.load(f)
+        upload = cls(state['upload_id'], state['filename'], state['size'], state['params'],
+                     os.path.dirname(meta_path))
+        upload.ranges = state['ranges']
+        upload.header_checked = state['header_checked']
+        upload.audio_info = state.get('audio_info')
+        return upload
+
+class ChunkedUploadStore:
+    """Creates, resumes and finishes chunked uploads in folder
+
+    Parts are copied from the request stream to their offset in the preallocated file
+    as they arrive, so nothing is spooled in memory or to a temporary file, and parts
+    of the same upload can be sent in parallel. The audio header is checked with
+    sf.info as soon as the start of the file is in, so a file that is not audio is
+    rejected after its first part instead of after the whole upload.
+    """
+
+    def __init__(self, folder: str, part_size: int = UPLOAD_PART_SIZE,
+                 max_size: int = MAX_UPLOAD_SIZE):
+        self.folder = folder
+        self.part_size = part_size
+        self.max_size = max_size
+        self._uploads: Dict[str, ChunkedUpload] = {}
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def create(self, filename: str, size: int, params: Optional[Dict] = None) -> ChunkedUpload:
+        """Start an upload of size bytes"""
+        if size <= 0:
+            raise UploadError("Upload size must be positive")
+        if size > self.max_size:
+            raise UploadError(f"File is larger than {self.max_size // (1024 ** 3)}GB", 413)
+
+        self.purge_stale()
+        upload = ChunkedUpload(uuid.uuid4().hex, filename, size, params or {}, self.folder)
+        with open(upload.data_path, 'xb') as f:
+            f.truncate(size)
+        upload.save()
+        with self._lock:
+            self._uploads[upload.upload_id] = upload
+        return upload
+
+    def get(self, upload_id: str) -> ChunkedUpload:
+        """Return the upload, loading it from disk after a restart"""
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is not None:
+                return upload
+
+            meta_path = os.path.join(self.folder, f"{upload_id}.upload.json")
+            if not upload_id.isalnum() or not os.path.exists(meta_path):
+                raise UploadError("Upload not found", 404)
+            upload = ChunkedUpload.load(meta_path)
+            self._uploads[upload_id] = upload
+            return upload
+
+    def write_part(self, upload_id: str, offset: int, stream: BinaryIO,
+                   length: Optional[int]) -> ChunkedUpload:
+        """Copy length bytes from stream to offset and acknowledge what was stored
+
+        Bytes that arrive before the connection drops are kept, the client resumes
+        from the returned ranges.
+        """
+        upload = self.get(upload_id)
+        if length is None:
+            raise UploadError("Content-Length is required", 411)
+        if offset < 0 or offset + length > upload.size:
+            raise UploadError(f"Part {offset}+{length} is outside the {upload.size} byte upload", 416)
+
+        try:
+            f = open(upload.data_path, 'r+b')
+        except FileNotFoundError:
+            raise UploadError("Upload not found", 404)
+
+        position = offset
+        try:
+            with f:
+                f.seek(offset)
+                while position < offset + length:
+                    block = stream.read(min(WRITE_BLOCK, offset + length - position))
+                    if not block:
+                        break
+                    f.write(block)
+                    position += len(block)
+        finally:
+            with upload.lock:
+                if position > offset and os.path.exists(upload.data_path):
+                    upload.ranges = _merge(upload.ranges, offset, position)
+                    upload.save()
+
+        self._check_header(upload)
+        return upload
+
+    def _check_header(self, upload: ChunkedUpload):
+        probe_size = min(HEADER_PROBE_BYTES, upload.size)
+        with upload.lock:
+            if upload.header_checked or upload.offset < probe_size:
+                return
+            with open(upload.data_path, 'rb') as f:
+                probe = f.read(probe_size)
+            try:
+                info = sf.info(io.BytesIO(probe))
+            except Exception as e:
+                error = e
+            else:
+                upload.header_checked = True
+                upload.audio_info = {'samplerate': info.samplerate, 'channels': info.channels,
+                                     'format': info.format, 'subtype': info.subtype}
+                upload.save()
+                return
+
+        self.discard(upload.upload_id)
+        raise UploadError(f"Not a supported audio file: {error}", 415)
+
+    def finish(self, upload_id: str, destination: str) -> ChunkedUpload:
+        """Move a complete upload to destination and forget the session"""
+        upload = self.get(upload_id)
+        with upload.lock:
+            if not upload.complete:
+                raise UploadError(f"Upload is incomplete, {upload.received} of {upload.size} bytes received", 409)
+            os.replace(upload.data_path, destination)
+            os.remove(upload.meta_path)
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+        return upload
+
+    def discard(self, upload_id: str):
+        """Delete an upload and its data"""
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is None:
+            upload = ChunkedUpload(upload_id, '', 0, {}, self.folder)
+        with upload.lock:
+            for path in (upload.data_path, upload.meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def purge_stale(self, max_age: float = STALE_UPLOAD_SECONDS):
+        """Delete unfinished uploads that have not received data for max_age seconds"""
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.folder):
+            if not name.endswith('.upload.json'):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.folder, name)) < cutoff:
+                    self.discard(name[:-len('.upload.json')])
+            except OSError:
+                continue
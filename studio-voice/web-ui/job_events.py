@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Job Events
+Socket.IO rooms per job and per browser session, with coalesced delta progress updates
+"""
+
+import threading
+import uuid
+from typing import Dict, List, Tuple
+
+# Seconds between progress flushes, only the latest progress of each job is sent
+COALESCE_INTERVAL = 0.5
+
+# Longest a long-polling /api/jobs request is held open
+MAX_LONG_POLL_SECONDS = 30.0
+
+def job_room(job_id: str) -> str:
+    """Room of the clients following one job"""
+    return f"job:{job_id}"
+
+def session_room(client_id: str) -> str:
+    """Room of one browser session, which follows the jobs it submitted"""
+    return f"session:{client_id}"
+
+def delta(previous: Dict, current: Dict) -> Dict:
+    """Fields of current that differ from previous, nested dicts are compared key by key"""
+    changes = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if isinstance(value, dict) and isinstance(old, dict):
+            nested = delta(old, value)
+            if nested:
+                changes[key] = nested
+        elif key not in previous or old != value:
+            changes[key] = value
+    return changes
+
+class JobEventHub:
+    """Sends job events only to the clients following the job
+
+    Status changes go out at once with the whole job, to the job's room and to the
+    room of the session that submitted it. Progress is coalesced: the latest progress
+    of each job is kept and flushed every interval, and only the fields that changed
+    since the previous flush are sent, so clients merge them into what they have.
+
+    The version changes whenever an event goes out. It backs the ETag of /api/jobs, and
+    wait_for_change() lets clients without WebSockets long-poll for the next change.
+    """
+
+    def __init__(self, socketio, interval: float = COALESCE_INTERVAL):
+        self.socketio = socketio
+        self.interval = interval
+        self.version = 0
+        self._boot_id = uuid.uuid4().hex[:8]
+        self._pending: Dict[str, Tuple[List[str], Dict]] = {}
+        self._sent: Dict[str, Dict] = {}
+        self._changed = threading.Condition()
+        self._flusher = None
+
+    @property
+    def etag(self) -> str:
+        """Entity tag of the current job state, unique across restarts"""
+        return f"{self._boot_id}-{self.version}"
+
+    def _rooms(self, job) -> List[str]:
+        rooms = [job_room(job.job_id)]
+        if getattr(job, 'client_id', None):
+            rooms.append(session_room(job.client_id))
+        return rooms
+
+    def _bump(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def publish_status(self, job):
+        """Send the job's new status and full state now"""
+        with self._changed:
+            self._pending.pop(job.job_id, None)
+            self._sent.pop(job.job_id, None)
+        self.socketio.emit('job_status_update', job.to_dict(), to=self._rooms(job))
+        self._bump()
+
+    def publish_progress(self, job, progress: Dict):
+        """Keep the job's latest progress for the next flush"""
+        with self._changed:
+            self._pending[job.job_id] = (self._rooms(job), dict(progress))
+            if self._flusher is None:
+                self._flusher = self.socketio.start_background_task(self._run)
+
+    def flush(self):
+        """Send each job's progress changes since the previous flush"""
+        with self._changed:
+            pending, self._pending = self._pending, {}
+            updates = []
+            for job_id, (rooms, progress) in pending.items():
+                changes = delta(self._sent.get(job_id, {}), progress)
+                self._sent[job_id] = progress
+                if changes:
+                    updates.append((rooms, {'job_id': job_id, **changes}))
+
+        for rooms, update in updates:
+            self.socketio.emit('job_progress_update', update, to=rooms)
+        if updates:
+            self._bump()
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.interval)
+            self.flush()
+
+    def wait_for_change(self, etag: str, timeout: float) -> str:
+        """Wait up to timeout seconds for the ETag to move on from etag and return the current one"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.etag != etag, min(timeout, MAX_LONG_POLL_SECONDS))
+            return self.etag
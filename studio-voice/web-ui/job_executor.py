@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Job Executor
+Runs jobs as asyncio tasks on one event loop, multiplexing their gRPC streams over
+one long-lived grpc.aio channel per Studio Voice target
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional
+
+from job_scheduler import FairShareScheduler
+
+try:
+    import grpc
+except ImportError:
+    grpc = None
+
+# Keepalive settings for the long-lived channels
+CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 5000),
+    ('grpc.keepalive_permit_without_calls', True),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.http2.min_time_between_pings_ms', 10000),
+    ('grpc.http2.min_ping_interval_without_data_ms', 300000)
+]
+
+# Seconds to wait for a target to accept connections before a job fails
+CONNECT_TIMEOUT = 10.0
+
+class AsyncJobExecutor:
+    """Runs jobs concurrently on a single event loop thread
+
+    Each job is a coroutine, so hundreds of jobs cost hundreds of tasks rather than
+    hundreds of threads. Jobs against the same target share one HTTP/2 connection, on
+    which gRPC multiplexes their streams. Submitted jobs wait in the scheduler, which
+    decides which job starts next whenever its target is below its concurrency limit
+    and the process is below max_concurrent_jobs.
+    """
+
+    def __init__(self, run_job: Callable[..., Awaitable[None]], max_concurrent_jobs: int = 256,
+                 target_limits: Optional[Dict[str, int]] = None, default_target_limit: int = 2,
+                 scheduler: Optional[FairShareScheduler] = None):
+        self.run_job = run_job
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.target_limits = target_limits if target_limits is not None else {}
+        self.default_target_limit = default_target_limit
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = None
+        self._channels: Dict[str, 'grpc.aio.Channel'] = {}
+        self.scheduler = scheduler if scheduler is not None else FairShareScheduler()
+        self._running_per_target: Dict[str, int] = defaultdict(int)
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+
+    def start(self):
+        """Start the event loop thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True,
+                                        name="studio-voice-jobs")
+        self._thread.start()
+
+    def submit(self, job):
+        """Queue job from any thread, job.server_target selects the channel"""
+        with self._lock:
+            self.queued += 1
+        self.loop.call_soon_threadsafe(self._enqueue, job)
+
+    def cancel(self, job_id: str):
+        """Drop a job that has not started yet"""
+        self.loop.call_soon_threadsafe(self._dequeue, job_id)
+
+    def _enqueue(self, job):
+        self.scheduler.add(job)
+        self._dispatch()
+
+    def _dequeue(self, job_id: str):
+        if self.scheduler.remove(job_id):
+            with self._lock:
+                self.queued -= 1
+
+    def _has_capacity(self, job) -> bool:
+        limit = self.target_limits.get(job.server_target, self.default_target_limit)
+        return self._running_per_target[job.server_target] < max(1, limit)
+
+    def _dispatch(self):
+        while self.running < self.max_concurrent_jobs:
+            job = self.scheduler.pop(self._has_capacity)
+            if job is None:
+                return
+            self._running_per_target[job.server_target] += 1
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            task = self.loop.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job):
+        try:
+            await self.run_job(job, self.get_channel(job.server_target))
+        finally:
+            self._running_per_target[job.server_target] -= 1
+            with self._lock:
+                self.running -= 1
+            self._dispatch()
+
+    def get_channel(self, target: str) -> Optional['grpc.aio.Channel']:
+        """Return the long-lived channel to target, creating it on first use
+
+        Must be called on the executor's event loop. Returns None without grpc.
+        """
+        channel = self._channels.get(target)
+        if channel is None and grpc is not None:
+            channel = grpc.aio.insecure_channel(target, options=CHANNEL_OPTIONS)
+            self._channels[target] = channel
+        return channel
+
+    def stop(self, timeout: Optional[float] = None):
+        """Cancel outstanding jobs, close the channels and stop the loop"""
+        if self._thread is None:
+            return
+
+        async def shutdown():
+            while len(self.scheduler):
+                self.scheduler.pop()
+            current = asyncio.current_task()
+            tasks = [task for task in asyncio.all_tasks() if task is not current]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for channel in self._channels.values():
+                await channel.close()
+            self._channels.clear()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+async def wait_until_ready(channel: 'grpc.aio.Channel', timeout: float = CONNECT_TIMEOUT):
+    """Wait for channel to connect, returns at once on an established connection"""
+    try:
+        await asyncio.wait_for(channel.channel_ready(), timeout)
+    except asyncio.TimeoutError:
+        raise Exception("Failed to connect to Studio Voice server - timeout")
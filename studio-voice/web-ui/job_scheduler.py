@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Job Scheduler
+Shortest-expected-first ordering with aging, per-client fair share and interactive/batch lanes
+"""
+
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+LANE_INTERACTIVE = "interactive"
+LANE_BATCH = "batch"
+
+# Jobs started from each lane while both have work, interactive clips go first
+LANE_WEIGHTS = {LANE_INTERACTIVE: 4, LANE_BATCH: 1}
+
+# Jobs expected to take up to this many seconds go to the interactive lane
+INTERACTIVE_MAX_SECONDS = 60.0
+
+# Seconds of expected cost forgiven per second spent waiting, so long jobs still start
+AGING_RATE = 0.5
+
+# Relative processing cost per second of audio for each model
+MODEL_COST = {'48k-hq': 1.0, '48k-ll': 1.5, '16k-hq': 0.5}
+STREAMING_COST = 1.2
+
+# Bytes per second of audio assumed when the header cannot be read
+FALLBACK_BYTES_PER_SECOND = 48000 * 2
+
+def job_cost(duration: float, model_type: str = "48k-hq", streaming: bool = False) -> float:
+    """Expected processing cost of duration seconds of audio with the model"""
+    cost = duration * MODEL_COST.get(model_type, 1.0)
+    return cost * STREAMING_COST if streaming else cost
+
+def estimate_job_seconds(file_path: str, model_type: str = "48k-hq", streaming: bool = False) -> float:
+    """Expected processing cost of a file from its duration and the model"""
+    try:
+        duration = sf.info(file_path).duration
+    except Exception:
+        duration = os.path.getsize(file_path) / FALLBACK_BYTES_PER_SECOND
+    return job_cost(duration, model_type, streaming)
+
+def choose_lane(expected_seconds: float, requested: Optional[str] = None) -> str:
+    """Lane for a job, an explicitly requested lane wins"""
+    if requested in LANE_WEIGHTS:
+        return requested
+    return LANE_INTERACTIVE if expected_seconds <= INTERACTIVE_MAX_SECONDS else LANE_BATCH
+
+class FairShareScheduler:
+    """Picks the next job to start
+
+    A lane is chosen in proportion to LANE_WEIGHTS, then the client in that lane that
+    has been served the least expected work, then that client's job with the lowest
+    expected cost after aging. Aging subtracts AGING_RATE times the time waited, which
+    is the same as ordering by cost + AGING_RATE * enqueue time, so a heap per client
+    keeps the order without re-scoring. Clients that arrive later start at the
+    current virtual time instead of zero, so they cannot starve existing clients.
+    """
+
+    def __init__(self, lane_weights: Optional[Dict[str, int]] = None, aging_rate: float = AGING_RATE):
+        self.lane_weights = lane_weights if lane_weights is not None else dict(LANE_WEIGHTS)
+        self.aging_rate = aging_rate
+        self._queues: Dict[str, Dict[str, List]] = {lane: {} for lane in self.lane_weights}
+        self._client_usage: Dict[str, float] = {}
+        self._lane_served: Dict[str, float] = {lane: 0.0 for lane in self.lane_weights}
+        self._entries: Dict[str, List] = {}
+        self._virtual_time = 0.0
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, job, now: Optional[float] = None):
+        """Queue a job using its expected_seconds, lane and client_id attributes"""
+        now = time.monotonic() if now is None else now
+        expected = getattr(job, 'expected_seconds', None) or 0.0
+        lane = getattr(job, 'lane', None)
+        if lane not in self.lane_weights:
+            lane = choose_lane(expected)
+        client = getattr(job, 'client_id', None) or "anonymous"
+
+        lane_queue = self._queues[lane]
+        if not lane_queue:
+            # An idle lane does not bank credit while it is empty
+            busy = [self._lane_served[name] / self.lane_weights[name]
+                    for name, pending in self._queues.items() if pending]
+            if busy:
+                self._lane_served[lane] = max(self._lane_served[lane],
+                                              min(busy) * self.lane_weights[lane])
+        if client not in self._client_usage:
+            self._client_usage[client] = self._virtual_time
+
+        entry = [expected + self.aging_rate * now, next(self._counter), job, lane, client]
+        heapq.heappush(lane_queue.setdefault(client, []), entry)
+        self._entries[job.job_id] = entry
+
+    def remove(self, job_id: str) -> bool:
+        """Drop a queued job, e.g. when it is cancelled"""
+        entry = self._entries.pop(job_id, None)
+        if entry is None:
+            return False
+        _, _, _, lane, client = entry
+        heap = self._queues[lane][client]
+        heap.remove(entry)
+        heapq.heapify(heap)
+        self._forget_if_idle(lane, client)
+        return True
+
+    def pop(self, can_start: Optional[Callable[[object], bool]] = None):
+        """Remove and return the next job that can_start accepts, or None"""
+        lanes = sorted((lane for lane, pending in self._queues.items() if pending),
+                       key=lambda lane: self._lane_served[lane] / self.lane_weights[lane])
+        for lane in lanes:
+            clients = sorted(self._queues[lane], key=lambda client: self._client_usage[client])
+            for client in clients:
+                heap = self._queues[lane][client]
+                for entry in sorted(heap):
+                    job = entry[2]
+                    if can_start is not None and not can_start(job):
+                        continue
+
+                    heap.remove(entry)
+                    heapq.heapify(heap)
+                    del self._entries[job.job_id]
+
+                    self._lane_served[lane] += 1
+                    self._virtual_time = self._client_usage[client]
+                    self._client_usage[client] += getattr(job, 'expected_seconds', None) or 0.0
+                    self._forget_if_idle(lane, client)
+                    return job
+        return None
+
+    def _forget_if_idle(self, lane: str, client: str):
+        if not self._queues[lane][client]:
+            del self._queues[lane][client]
+        if not any(client in pending for pending in self._queues.values()):
+            self._client_usage.pop(client, None)
+
+class SchedulingQueue:
+    """Thread-safe queue.Queue replacement that hands out jobs in scheduler order"""
+
+    def __init__(self, scheduler: Optional[FairShareScheduler] = None):
+        self.scheduler = scheduler if scheduler is not None else FairShareScheduler()
+        self._condition = threading.Condition()
+
+    def put(self, job):
+        """Queue a job"""
+        with self._condition:
+            self.scheduler.add(job)
+            self._condition.notify()
+
+    def get(self, timeout: Optional[float] = None):
+        """Return the next job, waiting up to timeout seconds, raises queue.Empty"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self.scheduler) > 0, timeout):
+                raise queue.Empty
+            return self.scheduler.pop()
+
+    def remove(self, job_id: str) -> bool:
+        """Drop a queued job"""
+        with self._condition:
+            return self.scheduler.remove(job_id)
+
+    def qsize(self) -> int:
+        """Number of queued jobs"""
+        return len(self.scheduler)
+
+    def empty(self) -> bool:
+        """True if no job is queued"""
+        return len(self.scheduler) == 0
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Job Store
+SQLite-backed job persistence with indexed lookups, a bounded hot cache and retention
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Jobs that are not finished yet, kept in memory and resumed after a restart
+ACTIVE_STATUSES = ('queued', 'processing')
+
+# Finished jobs kept in memory for repeated lookups, e.g. downloads right after completion
+HOT_CACHE_SIZE = 1000
+
+# Finished jobs older than this are deleted, and at most MAX_HISTORY_JOBS are kept
+RETENTION_DAYS = 30
+MAX_HISTORY_JOBS = 100000
+
+# Seconds between retention passes
+PURGE_INTERVAL = 3600
+
+def _encode(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _decode(key, value):
+    if key.endswith('_at') and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+class JobStore:
+    """Stores jobs in SQLite, with unfinished and recently finished jobs in memory
+
+    Jobs are looked up by primary key, so lookups do not slow down as the history
+    grows. Queued and processing jobs live in memory because workers update them in
+    place; they are written on every state change and come back as queued jobs when
+    the web UI restarts. Finished jobs are kept in a bounded LRU cache. Attributes
+    starting with an underscore are transient and not persisted.
+    """
+
+    def __init__(self, db_path: str, job_class, cache_size: int = HOT_CACHE_SIZE,
+                 retention_days: int = RETENTION_DAYS, max_history: int = MAX_HISTORY_JOBS):
+        self.job_class = job_class
+        self.cache_size = cache_size
+        self.retention_days = retention_days
+        self.max_history = max_history
+
+        self._lock = threading.RLock()
+        self._active: Dict[str, object] = {}
+        self._cache: 'OrderedDict[str, object]' = OrderedDict()
+        self._history_cache = {}
+        self.history_version = 0
+        self._last_purge = 0.0
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        with self._db:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at TEXT NOT NULL, '
+                'completed_at TEXT, data TEXT NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS idx_jobs_completed_at ON jobs (completed_at)')
+
+        self.purge()
+
+    def _to_job(self, data: str):
+        job = self.job_class.__new__(self.job_class)
+        job.__dict__.update({key: _decode(key, value) for key, value in json.loads(data).items()})
+        return job
+
+    def _write(self, job):
+        record = {key: _encode(value) for key, value in vars(job).items() if not key.startswith('_')}
+        self._db.execute(
+            'INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?)',
+            (job.job_id, job.status, record.get('created_at'), record.get('completed_at'),
+             json.dumps(record))
+        )
+
+    def add(self, job):
+        """Store a new job"""
+        self.save(job)
+
+    def save(self, job):
+        """Persist the job's current state, call on every status change"""
+        with self._lock:
+            with self._db:
+                self._write(job)
+
+            if job.status in ACTIVE_STATUSES:
+                self._active[job.job_id] = job
+                self._cache.pop(job.job_id, None)
+            else:
+                self._active.pop(job.job_id, None)
+                self._remember(job)
+                self.history_version += 1
+
+        if time.monotonic() - self._last_purge > PURGE_INTERVAL:
+            self.purge()
+
+    def _remember(self, job):
+        self._cache[job.job_id] = job
+        self._cache.move_to_end(job.job_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get(self, job_id: str):
+        """Return the job with job_id, or None"""
+        with self._lock:
+            job = self._active.get(job_id)
+            if job is not None:
+                return job
+            job = self._cache.get(job_id)
+            if job is not None:
+                self._cache.move_to_end(job_id)
+                return job
+
+            row = self._db.execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._to_job(row[0])
+            self._remember(job)
+            return job
+
+    def active_jobs(self) -> List:
+        """Queued and processing jobs, oldest first"""
+        with self._lock:
+            return sorted(self._active.values(), key=lambda job: job.created_at)
+
+    def history(self, limit: int = 50) -> List[Dict]:
+        """The most recently finished jobs as dicts, oldest first
+
+        The serialized list is rebuilt only when a job has finished since the last call.
+        """
+        with self._lock:
+            cached = self._history_cache.get(limit)
+            if cached and cached[0] == self.history_version:
+                return cached[1]
+
+            version = self.history_version
+            rows = self._db.execute(
+                'SELECT job_id, data FROM jobs WHERE completed_at IS NOT NULL '
+                'ORDER BY completed_at DESC LIMIT ?', (limit,)
+            ).fetchall()
+            jobs = [self._cache.get(job_id) or self._to_job(data) for job_id, data in reversed(rows)]
+            history = [job.to_dict() for job in jobs]
+            self._history_cache = {limit: (version, history)}
+            return history
+
+    def restore_unfinished(self) -> List:
+        """Load the jobs a previous run left queued or processing, requeued oldest first"""
+        placeholders = ', '.join('?' for _ in ACTIVE_STATUSES)
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT data FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at',
+                ACTIVE_STATUSES
+            ).fetchall()
+
+        jobs = []
+        for (data,) in rows:
+            job = self._to_job(data)
+            if job.job_id in self._active:
+                continue
+            # Work interrupted by the restart starts over
+            job.status = ACTIVE_STATUSES[0]
+            job.started_at = None
+            job.progress = 0
+            self.save(job)
+            jobs.append(job)
+        return jobs
+
+    def purge(self):
+        """Apply the retention policy to finished jobs"""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        placeholders = ', '.join('?' for _ in ACTIVE_STATUSES)
+        with self._lock:
+            self._last_purge = time.monotonic()
+            with self._db:
+                self._db.execute(
+                    f'DELETE FROM jobs WHERE status NOT IN ({placeholders}) AND created_at < ?',
+                    (*ACTIVE_STATUSES, cutoff)
+                )
+                self._db.execute(
+                    'DELETE FROM jobs WHERE completed_at IS NOT NULL AND job_id NOT IN ('
+                    'SELECT job_id FROM jobs WHERE completed_at IS NOT NULL '
+                    'ORDER BY completed_at DESC LIMIT ?)', (self.max_history,)
+                )
+            self._history_cache = {}
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Output Cache
+Enhanced audio of recent in-memory jobs, served to downloads without reading it back from disk
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Total bytes of enhanced audio kept in memory
+OUTPUT_CACHE_BYTES = 256 * 1024 * 1024
+
+class OutputCache:
+    """LRU cache of job outputs bounded by their total size
+
+    Outputs larger than the whole budget are not cached, and the least recently
+    downloaded outputs are dropped first. Dropped outputs are still on disk.
+    """
+
+    def __init__(self, max_bytes: int = OUTPUT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._outputs: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, job_id: str, data: bytes):
+        """Cache the output of job_id"""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(job_id)
+            self._outputs[job_id] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._outputs)))
+
+    def get(self, job_id: str) -> Optional[bytes]:
+        """Return the cached output of job_id, or None"""
+        with self._lock:
+            data = self._outputs.get(job_id)
+            if data is not None:
+                self._outputs.move_to_end(job_id)
+            return data
+
+    def discard(self, job_id: str):
+        """Forget the output of job_id"""
+        with self._lock:
+            self._drop(job_id)
+
+    def _drop(self, job_id: str):
+        data = self._outputs.pop(job_id, None)
+        if data is not None:
+            self.size -= len(data)
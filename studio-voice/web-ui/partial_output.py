@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Partial Output
+Enhanced audio that can be read and played while a job is still writing it
+"""
+
+import struct
+import threading
+from typing import Iterator, Optional
+
+import numpy as np
+
+# Bytes read from a growing output at a time
+FOLLOW_READ_BLOCK = 256 * 1024
+
+# Seconds a reader waits for new data before checking the output again
+FOLLOW_WAIT_SECONDS = 1.0
+
+WAV_HEADER_SIZE = 44
+PCM_SAMPLE_BYTES = 2
+
+def wav_header(sample_rate: int, channels: int, data_size: int) -> bytes:
+    """Header of a 16-bit PCM WAV file with data_size bytes of samples"""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * channels * PCM_SAMPLE_BYTES,
+        channels * PCM_SAMPLE_BYTES, PCM_SAMPLE_BYTES * 8,
+        b'data', data_size
+    )
+
+class PartialOutput:
+    """An output file readable up to the first byte that has not been written yet
+
+    Writers report the byte ranges they completed with mark(). Readers only see the
+    contiguous prefix, so chunks of a large file written out of order become readable
+    once every chunk before them is done. total_size is the final size, when it is
+    known before the job ends.
+
+    The file may be moved into place when the job finishes, so readers open it by its
+    current path for every read instead of holding it open.
+    """
+
+    def __init__(self):
+        self.path = None
+        self.total_size = None
+        self.ready = 0
+        self.done = False
+        self.failed = False
+        self._ranges = []
+        self._changed = threading.Condition()
+
+    def begin(self, path: str, total_size: Optional[int] = None):
+        """Point readers at the file being written"""
+        with self._changed:
+            self.path = path
+            self.total_size = total_size
+            self.ready = 0
+            self._ranges = []
+            self._changed.notify_all()
+
+    def mark(self, start: int, end: int):
+        """Record that bytes start to end of the file are written"""
+        with self._changed:
+            self._ranges.append((start, end))
+            self._ranges.sort()
+            while self._ranges and self._ranges[0][0] <= self.ready:
+                self.ready = max(self.ready, self._ranges.pop(0)[1])
+            self._changed.notify_all()
+
+    def finish(self, path: str, size: int):
+        """The complete output is at path"""
+        with self._changed:
+            self.path = path
+            self.total_size = self.ready = size
+            self._ranges = []
+            self.done = True
+            self._changed.notify_all()
+
+    def fail(self):
+        """The job failed, readers stop at what they have"""
+        with self._changed:
+            self.failed = self.done = True
+            self._changed.notify_all()
+
+    def wait(self, position: int, timeout: float) -> bool:
+        """Wait up to timeout seconds for data past position, False if there is none"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.ready > position or self.done, timeout)
+            return self.ready > position
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Read up to size ready bytes at offset"""
+        while True:
+            with self._changed:
+                end = min(offset + size, self.ready)
+                if end <= offset or self.failed:
+                    return b''
+                path = self.path
+                done = self.done
+            # Writers mark ranges from the event loop, so the file is read without the lock
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    return f.read(end - offset)
+            except FileNotFoundError:
+                if done:
+                    raise
+            # The finished file is being moved into place
+            with self._changed:
+                self._changed.wait_for(lambda: self.path != path or self.done, FOLLOW_WAIT_SECONDS)
+
+    def follow(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield bytes start to end, or to the end of the output, as they are written"""
+        position = start
+        while end is None or position < end:
+            if not self.wait(position, FOLLOW_WAIT_SECONDS):
+                if self.done:
+                    return
+                continue
+            block_size = FOLLOW_READ_BLOCK if end is None else min(FOLLOW_READ_BLOCK, end - position)
+            block = self.read(position, block_size)
+            if not block:
+                return
+            position += len(block)
+            yield block
+
+class PartialWavWriter:
+    """Appends enhanced float samples to a 16-bit PCM WAV file that readers follow
+
+    The header declares expected_frames so players can start before the end. The
+    server pads the last frame, so close() rewrites the header with the frames that
+    actually arrived.
+    """
+
+    def __init__(self, path: str, sample_rate: int, channels: int, expected_frames: int,
+                 partial: Optional[PartialOutput] = None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.partial = partial
+        self.data_size = 0
+        self._file = open(path, 'wb')
+        self._file.write(wav_header(sample_rate, channels, expected_frames * channels * PCM_SAMPLE_BYTES))
+        self._file.flush()
+        if partial:
+            partial.begin(path)
+            partial.mark(0, WAV_HEADER_SIZE)
+
+    def write(self, samples: np.ndarray):
+        """Append float samples"""
+        data = np.clip(np.round(np.asarray(samples) * 32767), -32768, 32767).astype('<i2').tobytes()
+        start = WAV_HEADER_SIZE + self.data_size
+        self._file.write(data)
+        self._file.flush()
+        self.data_size += len(data)
+        if self.partial:
+            self.partial.mark(start, start + len(data))
+
+    def close(self) -> int:
+        """Write the final header and return the file size"""
+        self._file.seek(0)
+        self._file.write(wav_header(self.sample_rate, self.channels, self.data_size))
+        self._file.close()
+        return WAV_HEADER_SIZE + self.data_size
+
+    def abort(self):
+        """Close the file without finishing it"""
+        self._file.close()
+
+class PartialFileWriter:
+    """Appends bytes of an output the server sends as a whole file, e.g. a WAV in non-streaming mode"""
+
+    def __init__(self, path: str, partial: Optional[PartialOutput] = None):
+        self.partial = partial
+        self.size = 0
+        self._file = open(path, 'wb')
+        if partial:
+            partial.begin(path)
+
+    def write(self, data: bytes):
+        """Append data"""
+        start = self.size
+        self._file.write(data)
+        self._file.flush()
+        self.size += len(data)
+        if self.partial:
+            self.partial.mark(start, self.size)
+
+    def close(self) -> int:
+        """Close the file and return its size"""
+        self._file.close()
+        return self.size
+
+    def abort(self):
+        """Close the file without finishing it"""
+        self._file.close()
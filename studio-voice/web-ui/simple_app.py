@@ -11,26 +11,34 @@ import json
 import uuid
 import threading
 import time
-from pathlib import Path
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, session
 from werkzeug.utils import secure_filename
-import queue
 import shutil
 
+# Add the desktop-ui directory to the path to import the shared audio scanner
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'desktop-ui'))
+from audio_scanner import AudioLibraryIndex, FolderScan, scan_audio_files
+from job_scheduler import LANE_BATCH, SchedulingQueue, choose_lane, estimate_job_seconds
+from job_store import JobStore
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'studio-voice-simple-ui-secret'
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'outputs'
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+app.config['JOB_DATABASE'] = 'simple_jobs.sqlite'
 
-# Global variables for job management
-job_queue = queue.Queue()
-current_jobs = {}
-job_history = []
+# Global variables for job management, queued jobs are handed out by the fair-share scheduler
+job_queue = SchedulingQueue()
 processing_thread = None
 is_processing = False
 
+# Folder scans in progress or finished, read page by page through /api/scan-folder
+folder_scans = {}
+SCAN_PAGE_SIZE = 500
+MAX_FOLDER_SCANS = 20
+
 # Ensure upload and output directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
@@ -59,6 +67,10 @@ class ProcessingJob:
         # For proper file management like the original script
         self.original_path = None
         self.relative_path = None
+        # Scheduling inputs: expected processing cost, interactive or batch lane, submitter
+        self.expected_seconds = None
+        self.lane = None
+        self.client_id = None
 
     def to_dict(self):
         return {
@@ -75,6 +87,9 @@ class ProcessingJob:
             'output_path': self.output_path
         }
 
+# Jobs survive restarts, finished ones are kept according to the store's retention policy
+job_store = JobStore(app.config['JOB_DATABASE'], ProcessingJob)
+
 def process_jobs():
     """Background thread to process jobs from the queue"""
     global is_processing
@@ -83,12 +98,17 @@ def process_jobs():
         try:
             if not job_queue.empty():
                 job = job_queue.get()
+                
+                # Jobs cancelled while queued are dropped when they come up
+                if job.status == JobStatus.CANCELLED:
+                    continue
+                
                 is_processing = True
                 
                 # Update job status
                 job.status = JobStatus.PROCESSING
                 job.started_at = datetime.now()
-                current_jobs[job.job_id] = job
+                job_store.save(job)
                 
                 try:
                     # Process the audio file with proper file management
@@ -138,9 +158,7 @@ def process_jobs():
                             pass  # Don't fail the whole process if restore fails
                 
                 # Move job to history
-                job_history.append(job)
-                if job.job_id in current_jobs:
-                    del current_jobs[job.job_id]
+                job_store.save(job)
                 
                 is_processing = False
             else:
@@ -150,6 +168,12 @@ def process_jobs():
             print(f"Error in processing thread: {e}")
             is_processing = False
 
+def client_id():
+    """Identify the submitter for fair sharing, one id per browser session"""
+    if 'client_id' not in session:
+        session['client_id'] = str(uuid.uuid4())
+    return session['client_id']
+
 @app.route('/')
 def index():
     """Main dashboard page"""
@@ -157,9 +181,25 @@ def index():
 
 @app.route('/api/scan-folder', methods=['POST'])
 def scan_folder():
-    """Scan a folder for audio files"""
+    """Scan a folder for audio files, returning results page by page while the scan runs
+    
+    The first request starts a background scan and returns its scan_id. Later requests
+    pass scan_id and the next_offset of the previous page until complete is true.
+    """
     data = request.get_json()
     folder_path = data.get('folder_path', '').strip()
+    scan_id = data.get('scan_id')
+    try:
+        offset = max(0, int(data.get('offset', 0)))
+        limit = max(1, min(int(data.get('limit', SCAN_PAGE_SIZE)), 10 * SCAN_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'offset and limit must be whole numbers'}), 400
+    
+    if scan_id:
+        scan = folder_scans.get(scan_id)
+        if not scan:
+            return jsonify({'error': 'Scan not found'}), 404
+        return jsonify({'scan_id': scan_id, 'folder_path': scan.folder, **scan.page(offset, limit)})
     
     if not folder_path:
         return jsonify({'error': 'No folder path provided'}), 400
@@ -171,20 +211,15 @@ def scan_folder():
         return jsonify({'error': 'Path is not a directory'}), 400
     
     try:
-        audio_extensions = {'.wav', '.mp3', '.flac', '.m4a'}
-        files = []
+        # Forget the oldest scans so the registry stays bounded
+        while len(folder_scans) >= MAX_FOLDER_SCANS:
+            folder_scans.pop(next(iter(folder_scans)))
         
-        # Walk through all subdirectories
-        for root, dirs, filenames in os.walk(folder_path):
-            for filename in filenames:
-                if Path(filename).suffix.lower() in audio_extensions:
-                    files.append(os.path.join(root, filename))
+        scan_id = str(uuid.uuid4())
+        scan = FolderScan(folder_path, index=AudioLibraryIndex())
+        folder_scans[scan_id] = scan
         
-        return jsonify({
-            'files': files,
-            'count': len(files),
-            'folder_path': folder_path
-        })
+        return jsonify({'scan_id': scan_id, 'folder_path': folder_path, **scan.page(offset, limit)})
         
     except Exception as e:
         return jsonify({'error': f'Error scanning folder: {str(e)}'}), 500
@@ -198,6 +233,7 @@ def upload_files():
     mode = request.form.get('mode', 'files')
     model_type = request.form.get('model_type', '48k-hq')
     streaming = request.form.get('streaming', 'false').lower() == 'true'
+    submitter = client_id()
     
     uploaded_jobs = []
     
@@ -209,17 +245,14 @@ def upload_files():
             return jsonify({'error': 'Invalid folder path'}), 400
         
         # Scan folder for audio files
-        audio_extensions = {'.wav', '.mp3', '.flac', '.m4a'}
         files_to_process = []
         
-        for root, dirs, filenames in os.walk(folder_path):
-            for filename in filenames:
-                if Path(filename).suffix.lower() in audio_extensions:
-                    files_to_process.append({
-                        'path': os.path.join(root, filename),
-                        'filename': filename,
-                        'relative_path': os.path.relpath(os.path.join(root, filename), folder_path)
-                    })
+        for path in scan_audio_files(folder_path, index=AudioLibraryIndex()):
+            files_to_process.append({
+                'path': path,
+                'filename': os.path.basename(path),
+                'relative_path': os.path.relpath(path, folder_path)
+            })
         
         # Create jobs for each file
         for file_info in files_to_process:
@@ -232,8 +265,12 @@ def upload_files():
             job = ProcessingJob(job_id, upload_path, file_info['filename'], model_type, streaming)
             job.original_path = file_info['path']  # Store original path for proper file management
             job.relative_path = file_info['relative_path']
+            # Folder runs are background work and go to the batch lane
+            job.expected_seconds = estimate_job_seconds(upload_path, model_type, streaming)
+            job.lane = LANE_BATCH
+            job.client_id = submitter
+            job_store.add(job)
             job_queue.put(job)
-            current_jobs[job_id] = job
             uploaded_jobs.append(job.to_dict())
     
     else:
@@ -255,8 +292,11 @@ def upload_files():
                 
                 # Create processing job
                 job = ProcessingJob(job_id, file_path, filename, model_type, streaming)
+                job.expected_seconds = estimate_job_seconds(file_path, model_type, streaming)
+                job.lane = choose_lane(job.expected_seconds, request.form.get('lane'))
+                job.client_id = submitter
+                job_store.add(job)
                 job_queue.put(job)
-                current_jobs[job_id] = job
                 uploaded_jobs.append(job.to_dict())
     
     return redirect(url_for('dashboard'))
@@ -270,8 +310,8 @@ def dashboard():
 def get_status():
     """Get current status via polling"""
     return jsonify({
-        'current_jobs': [job.to_dict() for job in current_jobs.values()],
-        'job_history': [job.to_dict() for job in job_history[-20:]],  # Last 20 jobs
+        'current_jobs': [job.to_dict() for job in job_store.active_jobs()],
+        'job_history': job_store.history(20),  # Last 20 jobs
         'queue_size': job_queue.qsize(),
         'is_processing': is_processing
     })
@@ -279,13 +319,13 @@ def get_status():
 @app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
 def cancel_job(job_id):
     """Cancel a specific job"""
-    if job_id in current_jobs:
-        job = current_jobs[job_id]
+    job = job_store.get(job_id)
+    if job is not None:
         if job.status == JobStatus.QUEUED:
             job.status = JobStatus.CANCELLED
             job.completed_at = datetime.now()
-            job_history.append(job)
-            del current_jobs[job_id]
+            job_store.save(job)
+            job_queue.remove(job_id)
             return jsonify({'message': 'Job cancelled'})
         else:
             return jsonify({'error': 'Job cannot be cancelled'}), 400
@@ -295,12 +335,7 @@ def cancel_job(job_id):
 @app.route('/download/<job_id>')
 def download_result(job_id):
     """Download processed audio file"""
-    # Look for job in history
-    job = None
-    for hist_job in job_history:
-        if hist_job.job_id == job_id:
-            job = hist_job
-            break
+    job = job_store.get(job_id)
     
     if job and job.output_path and os.path.exists(job.output_path):
         return send_file(job.output_path, as_attachment=True)
@@ -317,6 +352,16 @@ if __name__ == '__main__':
     processing_thread = threading.Thread(target=process_jobs, daemon=True)
     processing_thread.start()
     
+    # Requeue the jobs that were queued or interrupted when the UI last stopped
+    for job in job_store.restore_unfinished():
+        if os.path.exists(job.file_path):
+            job_queue.put(job)
+        else:
+            job.status = JobStatus.FAILED
+            job.error_message = "Uploaded file is missing after restart"
+            job.completed_at = datetime.now()
+            job_store.save(job)
+    
     # Run the Flask app
     print("Starting Studio Voice Simple Web UI...")
     print("Open your browser to: http://127.0.0.1:5000")
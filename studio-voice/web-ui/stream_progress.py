@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Stream Progress
+Counts the bytes a job sends and the samples it gets back, with throughput and an ETA
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Dict, Optional
+
+# Seconds between progress events while data is moving
+REPORT_INTERVAL = 0.5
+
+# Seconds between progress events while nothing is moving, so a stall is visible
+HEARTBEAT_INTERVAL = 2.0
+
+# Seconds without data in either direction after which a job is reported as stalled
+STALL_SECONDS = 15.0
+
+class StreamProgress:
+    """Measures how far a job's request and response streams have got
+
+    Progress is half request bytes sent and half samples returned, because in
+    non-streaming mode the server only answers once the whole file has arrived. The
+    ETA extrapolates the rate measured so far. Several streams of one job, e.g. the
+    chunks of a large file, can share one instance.
+
+    Used as an async context manager it also reports every HEARTBEAT_INTERVAL while
+    no data moves, so idle_seconds keeps growing for a stuck job instead of the last
+    event going stale.
+    """
+
+    def __init__(self, total_bytes: int, total_samples: int, response_sample_bytes: int,
+                 report: Optional[Callable[[Dict], None]] = None,
+                 interval: float = REPORT_INTERVAL):
+        self.total_bytes = total_bytes
+        self.total_samples = total_samples
+        self.response_sample_bytes = response_sample_bytes
+        self.report = report
+        self.interval = interval
+
+        self.sent_bytes = 0
+        self.returned_bytes = 0
+        self.started_at = time.monotonic()
+        self.last_activity = self.started_at
+        self._last_report = 0.0
+        self._heartbeat = None
+
+    @property
+    def returned_samples(self) -> int:
+        return self.returned_bytes // self.response_sample_bytes
+
+    def fraction(self) -> float:
+        """Share of the job done, from 0 to 1"""
+        sent = min(1.0, self.sent_bytes / self.total_bytes) if self.total_bytes else 1.0
+        returned = min(1.0, self.returned_samples / self.total_samples) if self.total_samples else 0.0
+        return (sent + returned) / 2
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        """Counters, rates and ETA as a JSON-serializable dict"""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.started_at
+        fraction = self.fraction()
+        eta = elapsed * (1 - fraction) / fraction if fraction > 0 else None
+        idle = now - self.last_activity
+        return {
+            'fraction': round(fraction, 4),
+            'bytes_sent': self.sent_bytes,
+            'total_bytes': self.total_bytes,
+            'samples_returned': self.returned_samples,
+            'total_samples': self.total_samples,
+            'send_rate': round(self.sent_bytes / elapsed) if elapsed > 0 else 0,
+            'return_rate': round(self.returned_samples / elapsed) if elapsed > 0 else 0,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'idle_seconds': round(idle, 1),
+            'stalled': idle >= STALL_SECONDS
+        }
+
+    def _emit(self, now: float):
+        self._last_report = now
+        if self.report:
+            self.report(self.snapshot(now))
+
+    def _activity(self):
+        now = time.monotonic()
+        self.last_activity = now
+        if now - self._last_report >= self.interval:
+            self._emit(now)
+
+    async def requests(self, request_iterator) -> AsyncIterator:
+        """Pass a sync or async request iterator through, counting audio bytes sent"""
+        if hasattr(request_iterator, '__aiter__'):
+            async for request in request_iterator:
+                self.sent_bytes += len(request.audio_stream_data)
+                self._activity()
+                yield request
+        else:
+            for request in request_iterator:
+                self.sent_bytes += len(request.audio_stream_data)
+                self._activity()
+                yield request
+
+    async def responses(self, call) -> AsyncIterator:
+        """Pass a response stream through, counting audio returned"""
+        async for response in call:
+            self.returned_bytes += len(response.audio_stream_data)
+            self._activity()
+            yield response
+
+    async def _beat(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            now = time.monotonic()
+            if now - self._last_report >= HEARTBEAT_INTERVAL:
+                self._emit(now)
+
+    async def __aenter__(self) -> 'StreamProgress':
+        self._heartbeat = asyncio.create_task(self._beat())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._heartbeat.cancel()
+        await asyncio.gather(self._heartbeat, return_exceptions=True)
+        self._emit(time.monotonic())
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Studio Voice Web UI Upload Budget
+Bounds the memory held by small uploads while their jobs wait in the queue
+"""
+
+import threading
+from typing import Dict
+
+# Total bytes of queued uploads kept in memory, further uploads go to uploads/
+UPLOAD_MEMORY_BYTES = 128 * 1024 * 1024
+
+class UploadBudget:
+    """Bytes of in-memory uploads by job, bounded by their total size
+
+    reserve() refuses an upload that would exceed the budget, so the caller writes
+    it to disk instead. release() may be called more than once for the same job,
+    so every path that ends a job can return its bytes.
+    """
+
+    def __init__(self, max_bytes: int = UPLOAD_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._reserved: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, job_id: str, size: int) -> bool:
+        """Reserve size bytes for job_id, False if they do not fit the budget"""
+        with self._lock:
+            if self.size + size > self.max_bytes:
+                return False
+            self.size += size
+            self._reserved[job_id] = size
+            return True
+
+    def release(self, job_id: str):
+        """Return the bytes reserved for job_id"""
+        with self._lock:
+            self.size -= self._reserved.pop(job_id, 0)